@@ -2,3 +2,10 @@
 from .construct import construct_records
 from .preprocess import preprocess_event_data, build_record_list
 from .interpolate import interpolate
+from .loading import load_record_dicts, clear_document_cache, clear_info_cache, read_info, expand_info, \
+    expand_info_many
+from .window import prune_to_window, record_dependencies
+from .incremental import constraint_key, update_records, add_records
+from .event_log import parse_timestamps, read_event_log
+from .layout import assign_lanes
+from .ticks import calendar_ticks
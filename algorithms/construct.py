@@ -1,14 +1,19 @@
 
 import re
 import math
-from typing import Dict, List
+from typing import Callable, Dict, List
 from collections import deque
 
 from data_types import EventRecord, EventData, TimeReference, TimePoint, InconsistentTimeReferenceError, UnknownEventRecordError, TimeSpan
 from logs import get_logger
 
+# How many newly resolved records construct_records gathers before reporting them to an on_resolved callback.
+RESOLVED_BATCH_SIZE = 2000
 
-def construct_records(event_datas: Dict[str, EventData]) -> Dict[str, EventRecord]:
+
+def construct_records(event_datas: Dict[str, EventData],
+                      release: bool = False,
+                      on_resolved: Callable[[Dict[str, EventRecord], int, int], None] = None) -> Dict[str, EventRecord]:
     """
     Convert all the EventData objects into EventRecords with resolved boundaries.
     Populate the min and max field for the start and end TimeReference for each EventRecord, using
@@ -16,6 +21,11 @@ def construct_records(event_datas: Dict[str, EventData]) -> Dict[str, EventRecor
 
     Args:
         event_datas: A List of preprocessed EventData objects
+        release: If True, each record drops its EventData and unresolved constraints once everything is resolved,
+            or before it is passed to on_resolved.
+        on_resolved: Called every RESOLVED_BATCH_SIZE records, and once at the end, with the records resolved
+            since the previous call (mapped by id), the number resolved so far, and the total. The records are
+            final, so they can be displayed before the rest are done.
 
     Returns:
         The record list after all dates have been made concrete to the extent possible.
@@ -25,7 +35,8 @@ def construct_records(event_datas: Dict[str, EventData]) -> Dict[str, EventRecor
     # Construct EventRecords from the EventData objects, then reconcile their start/end bounds.
     records: Dict[str, EventRecord] = {evt_id: EventRecord(evt_dat) for evt_id, evt_dat in event_datas.items()}
 
-    resolved = []
+    resolved = set()
+    unreported: Dict[str, EventRecord] = {}
     for rec_id in records:
         if rec_id in resolved:
             # If this record was already done on a previous pass (because another record
@@ -33,7 +44,24 @@ def construct_records(event_datas: Dict[str, EventData]) -> Dict[str, EventRecor
             continue
         algo_logger.debug(f"Normalizing `{rec_id}`")
         dones = reconcile_record_bounds(rec_id=rec_id, records=records)
-        resolved.extend(dones)
+        if on_resolved:
+            for done in dones:
+                if done not in resolved and done not in unreported:
+                    # Reported records may be shown straight away, and must not change after that. Resolving
+                    # the rest only reads their bounds, so they can be released now instead of at the end.
+                    if release:
+                        records[done].release()
+                    unreported[done] = records[done]
+        resolved.update(dones)
+        if on_resolved and len(unreported) >= RESOLVED_BATCH_SIZE:
+            on_resolved(unreported, len(resolved), len(records))
+            unreported = {}
+    if on_resolved and unreported:
+        on_resolved(unreported, len(resolved), len(records))
+
+    if release and not on_resolved:
+        for rec in records.values():
+            rec.release()
 
     return records
 
@@ -96,37 +124,72 @@ def reconcile_record_bounds(rec_id: str, records: Dict[str, EventRecord]) -> Lis
         if not date_found:
             continue  # We didn't have enough info to pin this down, but stack should be updated. Loop again.
 
-        # We've set start min/max and end min/max. Now enforce internal consistency.
-        # We can't define these relations in advance because that would create recursive dependencies.
-        cur = records[cid]
+        enforce_own_bounds(records[cid])
 
-        # Make sure the start can't be later than the end.
-        if type(cur.start.max) is float or\
-                (type(cur.start.max) is TimePoint and type(cur.end.max) is TimePoint and cur.start.max > cur.end.max):
-            cur.start.max = cur.end.max  # Can't start later than the latest possible end time (could still be inf).
-            algo_logger.debug(f"Setting `{cid}` start.max to respect `{cid}` end.max ({cur.start.max}).")
+        # This record is now done; we don't have to redo it on a future pass.
+        resolved.append(cid)
+        algo_logger.debug(f"Finished normalizing `{cid}`")
 
-        if type(cur.start.min) is TimePoint and type(cur.start.max) is TimePoint and cur.start.min > cur.start.max:
-            raise InconsistentTimeReferenceError(f"start.min of `{cid}` ({cur.start.min}) is after start.max ({cur.start.max}).")
+    return resolved
 
-        # Make sure the end can't be earlier than the start.
-        if not cur.end.has_min() or \
-                (cur.end.has_min() and cur.start.has_min() and cur.end.min < cur.start.min):
-            cur.end.min = cur.start.min  # End can't be before the earliest possible start time (could still be -inf).
-            algo_logger.debug(f"Setting `{cid}` end.min to respect `{cid}` start.min ({cur.end.min}).")
 
-        # We can't handle duration in bind_reference_boundary because it is a self-referential dependency. Do it here.
-        if cur.duration:
-            bind_duration(cur)
+def is_self_contained(rec: EventRecord) -> bool:
+    """
+    Returns:
+        Whether every constraint on the record's bounds is a date, so resolving it doesn't involve any other record.
+    """
+    return all(type(constraint) is TimePoint
+               for cref in (rec.start, rec.end)
+               for constraint in (*cref._older_refs, *cref._later_refs))
 
-        if cur.end.has_min() and cur.end.has_max() and cur.end.min > cur.end.max:
-            raise InconsistentTimeReferenceError(f"end.min of `{cid}` ({cur.end.min}) is after end.max ({cur.end.max}).")
 
-        # This record is now done; we don't have to redo it on a future pass.
-        resolved.append(cid)
-        algo_logger.debug(f"Finished normalizing `{cid}`")
+def resolve_own_bounds(rec: EventRecord):
+    """
+    Resolve a record whose constraints are all dates (see is_self_contained) directly, with the same result
+        as reconcile_record_bounds but without its bookkeeping for references between records.
+    """
+    for cref in (rec.start, rec.end):
+        if cref.min is None:
+            cref.min = max(cref._older_refs) if cref._older_refs else -math.inf
+        if cref.max is None:
+            cref.max = min(cref._later_refs) if cref._later_refs else math.inf
+    enforce_own_bounds(rec)
 
-    return resolved
+
+def enforce_own_bounds(cur: EventRecord):
+    """
+    Make a record's four bounds, once each is known, consistent with each other and with its duration.
+
+    Raises:
+        InconsistentTimeReferenceError if the bounds contradict each other.
+    """
+    algo_logger = get_logger()
+    cid = cur.id
+
+    # We've set start min/max and end min/max. Now enforce internal consistency.
+    # We can't define these relations in advance because that would create recursive dependencies.
+
+    # Make sure the start can't be later than the end.
+    if type(cur.start.max) is float or\
+            (type(cur.start.max) is TimePoint and type(cur.end.max) is TimePoint and cur.start.max > cur.end.max):
+        cur.start.max = cur.end.max  # Can't start later than the latest possible end time (could still be inf).
+        algo_logger.debug(f"Setting `{cid}` start.max to respect `{cid}` end.max ({cur.start.max}).")
+
+    if type(cur.start.min) is TimePoint and type(cur.start.max) is TimePoint and cur.start.min > cur.start.max:
+        raise InconsistentTimeReferenceError(f"start.min of `{cid}` ({cur.start.min}) is after start.max ({cur.start.max}).")
+
+    # Make sure the end can't be earlier than the start.
+    if not cur.end.has_min() or \
+            (cur.end.has_min() and cur.start.has_min() and cur.end.min < cur.start.min):
+        cur.end.min = cur.start.min  # End can't be before the earliest possible start time (could still be -inf).
+        algo_logger.debug(f"Setting `{cid}` end.min to respect `{cid}` start.min ({cur.end.min}).")
+
+    # We can't handle duration in bind_reference_boundary because it is a self-referential dependency. Do it here.
+    if cur.duration:
+        bind_duration(cur)
+
+    if cur.end.has_min() and cur.end.has_max() and cur.end.min > cur.end.max:
+        raise InconsistentTimeReferenceError(f"end.min of `{cid}` ({cur.end.min}) is after end.max ({cur.end.max}).")
 
 
 def bind_reference_boundary(cid: str,
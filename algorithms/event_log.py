@@ -0,0 +1,121 @@
+import os
+import io
+import csv
+import json
+import warnings
+from operator import itemgetter
+from datetime import date
+from typing import IO, List, Optional, Sequence, Tuple
+import numpy as np
+
+from data_types import EventLog
+from .loading import COMPRESSED_OPENERS
+
+UNIX_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+SECONDS_PER_DAY = 86400
+
+# Extensions read as one JSON object per line; anything else is read as CSV with a header row.
+JSON_LINES_EXTENSIONS = ('.jsonl', '.ndjson', '.json')
+
+
+def parse_timestamps(values: Sequence) -> np.ndarray:
+    """
+    Convert a column of timestamps to ordinal days, with the time of day as the fraction, all at once.
+    Every value in the column must be in the same form: either seconds since the Unix epoch, or ISO 8601
+    dates and times such as "2024-03-01T09:30:00.25". Times with a UTC offset are converted to UTC.
+
+    Args:
+        values: The timestamps, as strings or numbers.
+
+    Returns:
+        A float64 array of ordinal days, one per value.
+
+    Raises:
+        ValueError if a value can't be read.
+    """
+    values = list(values)
+    try:
+        seconds = np.array(values, dtype=np.float64)
+    except ValueError:
+        with warnings.catch_warnings():
+            # numpy warns that it converts times with an explicit offset to UTC, which is what we want.
+            warnings.simplefilter('ignore', UserWarning)
+            stamps = np.array(values, dtype='datetime64[us]')
+        if np.isnat(stamps).any():
+            raise ValueError(f"Missing timestamp on row {np.nonzero(np.isnat(stamps))[0][0]}.")
+        seconds = stamps.astype(np.int64) / 1e6
+    return UNIX_EPOCH_ORDINAL + seconds / SECONDS_PER_DAY
+
+
+def read_event_log(filename: str,
+                   start_column: str = 'start',
+                   end_column: str = 'end',
+                   name_column: str = 'name',
+                   id_column: str = 'id') -> EventLog:
+    """
+    Read an event log straight into columns, without building EventData or resolving anything.
+    The file is CSV with a header row, or JSON Lines if its extension is one of JSON_LINES_EXTENSIONS,
+    and may be compressed with any format in COMPRESSED_OPENERS.
+
+    Args:
+        filename: The log to read.
+        start_column: The field holding each event's start time. Required on every row.
+        end_column: The field holding each event's end time. An event without one is instantaneous.
+        name_column: The field holding each event's name. Optional.
+        id_column: The field holding each event's id. Events are numbered by row if the log has none.
+
+    Returns:
+        The events, as an EventLog.
+
+    Raises:
+        ValueError if a row has no start, or a time can't be read.
+    """
+    base, ext = os.path.splitext(filename.lower())
+    opener = COMPRESSED_OPENERS.get(ext)
+    if opener is not None:
+        ext = os.path.splitext(base)[1]
+    with (opener or open)(filename, 'rb') as raw:
+        stream = io.TextIOWrapper(raw, encoding='utf-8', newline='')
+        columns = (start_column, end_column, name_column, id_column)
+        if ext in JSON_LINES_EXTENSIONS:
+            starts, ends, names, ids = _read_json_lines(stream, columns)
+        else:
+            starts, ends, names, ids = _read_csv(stream, columns)
+
+    if None in starts or '' in starts:
+        raise ValueError(f"Every event in {filename} needs a '{start_column}'.")
+    start_days = parse_timestamps(starts)
+    end_days = start_days.copy()
+    has_end = [row for row, value in enumerate(ends) if value is not None and value != '']
+    if has_end:
+        end_days[has_end] = parse_timestamps([ends[row] for row in has_end])
+
+    names = ['' if name is None else str(name) for name in names]
+    if ids is not None:
+        ids = [str(row) if rec_id is None else str(rec_id) for row, rec_id in enumerate(ids)]
+    return EventLog(start_days, end_days, names, ids)
+
+
+def _read_csv(stream: IO[str], columns: Tuple[str, str, str, str]) -> Tuple[List, List, List, Optional[List]]:
+    reader = csv.reader(stream)
+    header = next(reader, [])
+    rows = list(filter(None, reader))  # Skips blank lines.
+    if set(map(len, rows)) - {len(header)}:
+        row = next(row for row in rows if len(row) != len(header))
+        raise ValueError(f"A row has {len(row)} fields, but the header has {len(header)}: {row}")
+
+    # Each column is picked out of the rows in C, rather than field by field.
+    starts, ends, names, ids = (list(map(itemgetter(header.index(column)), rows)) if column in header else None
+                                for column in columns)
+    blank = [None] * len(rows)
+    return (starts or blank, ends or blank, names or blank, ids)
+
+
+def _read_json_lines(stream: IO[str], columns: Tuple[str, str, str, str]) -> Tuple[List, List, List, Optional[List]]:
+    start_column, end_column, name_column, id_column = columns
+    objs = [json.loads(line) for line in stream if line.strip()]
+    ids = [obj.get(id_column) for obj in objs]
+    return ([obj.get(start_column) for obj in objs],
+            [obj.get(end_column) for obj in objs],
+            [obj.get(name_column) for obj in objs],
+            ids if any(rec_id is not None for rec_id in ids) else None)
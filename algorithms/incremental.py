@@ -0,0 +1,112 @@
+import copy
+from collections import ChainMap, deque
+from typing import Dict, Iterable, Mapping, Set, Tuple
+
+from data_types import EventRecord, EventData
+from .construct import reconcile_record_bounds, is_self_contained, resolve_own_bounds
+from .window import record_dependencies
+
+
+def constraint_key(data: EventData) -> Tuple:
+    """
+    Summarize the parts of a preprocessed EventData that determine its resolved bounds.
+    Two records with equal keys resolve identically, given identical dependencies; name and info are ignored.
+    """
+    return (tuple(data.start), tuple(data.end),
+            tuple(data.start_before), tuple(data.start_after),
+            tuple(data.end_before), tuple(data.end_after),
+            data.duration or '')
+
+
+def update_records(records: Mapping[str, EventRecord],
+                   event_datas: Dict[str, EventData],
+                   changed_ids: Iterable[str],
+                   release: bool = False) -> Tuple[Dict[str, EventRecord], Set[str]]:
+    """
+    Re-resolve a timeline after some of its records were added, removed or edited.
+    Only the changed records and the records that depend on them, directly or indirectly, are rebuilt;
+        every other record is reused, so its bounds are not recomputed. A reused record whose name or info
+        changed is replaced by a copy sharing its bounds.
+
+    Args:
+        records: The currently resolved EventRecords, mapped by id. Not modified.
+        event_datas: The new preprocessed EventData objects, mapped by id.
+        changed_ids: IDs whose constraints differ from those `records` were resolved with, including
+            added and removed records.
+        release: If True, rebuilt records drop their construction state once resolved.
+
+    Returns:
+        A tuple of (the new records mapped by id in event_datas order, the IDs of the records that were rebuilt).
+    """
+    dependents: Dict[str, Set[str]] = {}
+    for rec_id, data in event_datas.items():
+        for dep_id in record_dependencies(data):
+            dependents.setdefault(dep_id, set()).add(rec_id)
+
+    # Anything downstream of a change (or of a removed record) has to be resolved again.
+    stale = set(changed_ids)
+    pending = deque(stale)
+    while pending:
+        for dependent_id in dependents.get(pending.pop(), ()):
+            if dependent_id not in stale:
+                stale.add(dependent_id)
+                pending.append(dependent_id)
+    rebuilt = {rec_id for rec_id in event_datas if rec_id in stale or rec_id not in records}
+
+    new_records: Dict[str, EventRecord] = {}
+    for rec_id, data in event_datas.items():
+        if rec_id in rebuilt:
+            new_records[rec_id] = EventRecord(data)
+            continue
+        rec = records[rec_id]
+        if rec.name != data.name or rec.info != data.info:
+            rec = copy.copy(rec)
+            rec.name = data.name
+            rec.info = data.info
+        new_records[rec_id] = rec
+
+    # Reused records already have all four bounds, so resolving a rebuilt record never descends into them.
+    resolved = set()
+    for rec_id in new_records:
+        if rec_id in rebuilt and rec_id not in resolved:
+            resolved.update(reconcile_record_bounds(rec_id=rec_id, records=new_records))
+
+    if release:
+        for rec_id in rebuilt:
+            new_records[rec_id].release()
+    return new_records, rebuilt
+
+
+def add_records(records: Mapping[str, EventRecord],
+                event_datas: Dict[str, EventData],
+                release: bool = False) -> Dict[str, EventRecord]:
+    """
+    Resolve new records against an already-resolved timeline. The new records may refer to each other and to
+        existing records; existing records are only read, so the cost depends on the number of new records.
+
+    Args:
+        records: The currently resolved EventRecords, mapped by id. Not modified.
+        event_datas: Preprocessed EventData objects for the new records, mapped by id. None of the ids may be
+            in `records`.
+        release: If True, the new records drop their construction state once resolved.
+
+    Returns:
+        The new records, resolved and mapped by id in event_datas order.
+    """
+    new_records: Dict[str, EventRecord] = {rec_id: EventRecord(data) for rec_id, data in event_datas.items()}
+    # Records fixed by dates alone, typically most of a stream, don't need the reference-following resolver.
+    resolved = set()
+    for rec_id, rec in new_records.items():
+        if is_self_contained(rec):
+            resolve_own_bounds(rec)
+            resolved.add(rec_id)
+
+    lookup = ChainMap(new_records, records)
+    for rec_id in new_records:
+        if rec_id not in resolved:
+            resolved.update(reconcile_record_bounds(rec_id=rec_id, records=lookup))
+
+    if release:
+        for rec in new_records.values():
+            rec.release()
+    return new_records
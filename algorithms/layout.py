@@ -0,0 +1,36 @@
+import heapq
+from typing import List, Tuple
+import numpy as np
+
+
+def assign_lanes(lefts: np.ndarray, rights: np.ndarray) -> Tuple[np.ndarray, int]:
+    """
+    Stack horizontal extents into lanes so that no two extents in the same lane overlap, using as few lanes as
+    possible. Extents are swept in order of their left edge, and each goes into the lowest-numbered lane that has
+    come free by then. This greedy colouring of the interval graph needs exactly as many lanes as the most
+    extents overlapping at any one point, which is the minimum. Runs in O(n log n).
+
+    Args:
+        lefts: The left edge of each extent.
+        rights: The right edge of each extent. Extents are half-open, so one ending where another begins
+            doesn't overlap it.
+
+    Returns:
+        A tuple of (the lane of each extent, the number of lanes used).
+    """
+    order = np.argsort(lefts, kind='stable')  # Extents starting together keep their given order.
+    lanes = np.empty(len(order), dtype=np.int64)
+    busy: List[Tuple[float, int]] = []  # (right edge, lane) of the extent last placed in each occupied lane.
+    free: List[int] = []  # Lanes whose last extent ended before the sweep line.
+    lane_count = 0
+    for row, left, right in zip(order.tolist(), np.asarray(lefts)[order].tolist(), np.asarray(rights)[order].tolist()):
+        while busy and busy[0][0] <= left:
+            heapq.heappush(free, heapq.heappop(busy)[1])
+        if free:
+            lane = heapq.heappop(free)
+        else:
+            lane = lane_count
+            lane_count += 1
+        lanes[row] = lane
+        heapq.heappush(busy, (right, lane))
+    return lanes, lane_count
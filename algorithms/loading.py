@@ -0,0 +1,444 @@
+import os
+import io
+import codecs
+import gzip
+import hashlib
+import lzma
+import bz2
+import tarfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Callable, Dict, IO, Iterable, List, Optional, Set, Tuple, Union
+import yaml
+
+from data_types import CircularIncludeError, InfoRef, StaleSourceError
+from logs import get_logger
+
+# Single-file compression formats, mapped to the function that opens them as a binary stream.
+COMPRESSED_OPENERS = {
+    '.gz': gzip.open,
+    '.xz': lzma.open,
+    '.bz2': bz2.open,
+}
+
+# Extensions which mark a multi-file archive. Compressed tarballs are handled by tarfile directly.
+TAR_EXTENSIONS = ('.tar', '.tar.gz', '.tgz', '.tar.xz', '.txz', '.tar.bz2', '.tbz2')
+ZIP_EXTENSIONS = ('.zip',)
+
+# Archive members with these extensions are treated as timeline files; everything else is skipped.
+YAML_EXTENSIONS = ('.yaml', '.yml')
+
+# Parsed documents for the files of loads that asked to keep them, keyed by real path. Each entry holds the file's
+# (size, modification time) when it was read, so it is only read again once it changes, and a SHA-256 of its raw
+# bytes, so a file whose contents were already merged into a load can be skipped.
+_document_cache: Dict[str, Tuple[Tuple[int, int], str, List[Dict]]] = {}
+
+
+def load_record_dicts(filenames: List[str],
+                      sources: List[str] = None,
+                      progress: Callable[[int, int], None] = None,
+                      keep_documents: bool = True) -> List[Dict]:
+    """
+    Read the raw record dictionaries from each of the given files, in order.
+    Plain YAML files are read directly. Compressed files (.gz, .xz, .bz2) are decompressed as they are
+        read, and zip/tar archives have each of their YAML members parsed in parallel, in archive order.
+        Nothing is extracted to disk.
+    Any files named under a document's `Includes` key (relative to that document's file) are loaded
+        first, recursively. A file whose contents were already loaded is skipped, so shared base files
+        only contribute their records once no matter how many files include them.
+    A document with neither a `Records` nor an `Includes` key is skipped with a warning.
+
+    Args:
+        filenames: A list of paths to timeline files or bundles.
+        sources: If given, the real path of every file read, including included files, is appended to it.
+        progress: Called with (files done, total files) after each of `filenames` is loaded.
+        keep_documents: If True, keep each file's parsed documents so loading it again before it changes
+            doesn't parse it again. They take about as much memory as the records built from them, so only
+            keep them if the files will be loaded again.
+
+    Returns:
+        A list of every record dictionary found in the files' `Records` lists.
+
+    Raises:
+        CircularIncludeError if a file includes itself, directly or indirectly.
+    """
+    dict_list = []
+    loaded_hashes = set()
+    for done, filename in enumerate(filenames, start=1):
+        _load_file(filename, dict_list, loaded_hashes, include_stack=[], sources=sources,
+                   keep_documents=keep_documents)
+        if progress:
+            progress(done, len(filenames))
+    return dict_list
+
+
+def clear_document_cache():
+    """
+    Forget every parsed file, so the next load re-reads everything from scratch.
+    """
+    _document_cache.clear()
+    clear_info_cache()
+
+
+def clear_info_cache():
+    """
+    Forget every info entry read so far, e.g. once their source files were loaded again.
+    """
+    _read_info_span.cache_clear()
+
+
+def _load_file(filename: str, dict_list: List[Dict], loaded_hashes: Set[str], include_stack: List[str],
+               sources: List[str] = None, keep_documents: bool = True):
+    path = os.path.realpath(filename)
+    if path in include_stack:
+        chain = " -> ".join(include_stack[include_stack.index(path):] + [path])
+        raise CircularIncludeError(f"Timeline files include each other in a loop: {chain}")
+    if sources is not None and path not in sources:
+        sources.append(path)
+
+    signature = _stamp(path)
+    cached = _document_cache.get(path)
+    if cached is not None and cached[0] == signature:
+        _, digest, documents = cached
+    else:
+        documents, digest = _read_documents_hashed(path, signature)
+        if keep_documents:
+            _document_cache[path] = (signature, digest, documents)
+        else:
+            _document_cache.pop(path, None)  # Drop any outdated copy too.
+
+    if digest in loaded_hashes:
+        return  # Already merged into this load, e.g. a base file included by several others.
+    loaded_hashes.add(digest)
+
+    include_stack.append(path)
+    base_dir = os.path.dirname(path)
+    for document in documents:
+        if 'Records' not in document and 'Includes' not in document:
+            # Most likely a misspelled key, which would otherwise silently load nothing.
+            get_logger().warning(f"Skipping a document in {path} with neither a `Records` nor an `Includes` key.")
+            continue
+        includes = document.get('Includes') or []
+        includes = [includes] if not isinstance(includes, list) else includes
+        for include in includes:
+            _load_file(os.path.join(base_dir, include), dict_list, loaded_hashes, include_stack, sources,
+                       keep_documents)
+        dict_list.extend(document.get('Records') or [])
+    include_stack.pop()
+
+
+def read_documents(filename: str) -> List[Dict]:
+    """
+    Parse every timeline document contained in a file, which may be plain, compressed, or an archive.
+
+    Args:
+        filename: The path of the file to read. Its extension determines how the contents are decoded.
+
+    Returns:
+        A list of parsed YAML documents; one per archive member, or a single entry for non-archives.
+    """
+    return _read_documents_hashed(filename, _stamp(filename))[0]
+
+
+def _stamp(filename: str) -> Tuple[int, int]:
+    # A file's (size, modification time), which change whenever its contents do.
+    stat = os.stat(filename)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _read_documents_hashed(filename: str, stamp: Tuple[int, int]) -> Tuple[List[Dict], str]:
+    # Parse a file's documents as it is streamed from disk, hashing its raw bytes on the way through.
+    lower = filename.lower()
+    with open(filename, 'rb') as file:
+        reader = _HashingReader(file)
+        if lower.endswith(ZIP_EXTENSIONS):
+            # Zip members are found through the directory at the end of the archive, so the archive is read out
+            # of order; it is hashed in a pass of its own.
+            digest = reader.hexdigest()
+            return _parse_in_parallel(filename, _read_zip_members(filename), stamp), digest
+        if lower.endswith(TAR_EXTENSIONS):
+            documents = _parse_in_parallel(filename, _read_tar_members(reader), stamp)
+        else:
+            with open_stream(filename, reader) as stream:
+                documents = [parse_document(stream, source=filename, stamp=stamp)]
+        return documents, reader.hexdigest()
+
+
+class _HashingReader(io.RawIOBase):
+    """
+    A read-only binary stream over another, which feeds every byte read through it to a SHA-256 hash.
+    """
+
+    def __init__(self, raw: IO[bytes]):
+        self.raw = raw
+        self.hash = hashlib.sha256()
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        count = self.raw.readinto(buffer)
+        self.hash.update(memoryview(buffer)[:count])
+        return count
+
+    def hexdigest(self) -> str:
+        # Readers may stop before the end, e.g. at a tar archive's end marker, so the rest is hashed too.
+        for chunk in iter(lambda: self.raw.read(1024 * 1024), b''):
+            self.hash.update(chunk)
+        return self.hash.hexdigest()
+
+
+def open_stream(filename: str, fileobj: IO[bytes] = None) -> IO[bytes]:
+    """
+    Open a single (non-archive) timeline file as a binary stream, decompressing on the fly if needed.
+
+    Args:
+        filename: The path of the file. Its extension determines the decompression applied.
+        fileobj: An already-open binary stream of the file's raw contents, to read instead of the path.
+    """
+    _, ext = os.path.splitext(filename.lower())
+    opener = COMPRESSED_OPENERS.get(ext)
+    if opener:
+        return opener(fileobj or filename, 'rb')
+    return fileobj or open(filename, 'rb')
+
+
+def parse_document(stream, source: str = None, member: str = None, stamp: Tuple[int, int] = None) -> Dict:
+    """
+    Parse one YAML timeline document. All scalars are kept as strings for EventData.parse.
+
+    Args:
+        stream: The document's bytes, or a binary stream of them.
+        source: The path the document was read from. If given, record `info` entries are not parsed;
+            each is replaced by an InfoRef to where it lies in the document, to be read later by read_info.
+        member: The name of the document within its archive, if the source is an archive.
+        stamp: The source file's (size, modification time), recorded in each InfoRef.
+    """
+    data = stream if isinstance(stream, bytes) else stream.read()
+    if source is None:
+        return yaml.load(data, Loader=yaml.BaseLoader) or {}
+
+    # Decode up front, so info offsets can be converted from characters to bytes as they are found.
+    bom = len(codecs.BOM_UTF8) if data.startswith(codecs.BOM_UTF8) else 0
+    loader = _LazyInfoLoader(data[bom:].decode('utf-8'), source, member, bom, stamp)
+    try:
+        return loader.get_single_data() or {}
+    finally:
+        loader.dispose()
+
+
+class _LazyInfoLoader(yaml.BaseLoader):
+    """
+    A BaseLoader which leaves the value of every `info` key unconstructed, recording an InfoRef to it instead.
+    An empty `info` value is just an empty list.
+    """
+
+    def __init__(self, text: str, source: str, member: str, byte_base: int, stamp: Optional[Tuple[int, int]]):
+        super().__init__(text)
+        self.text = text
+        self.source = source
+        self.member = member
+        self.stamp = stamp
+        # Running conversion from character index to byte offset. Info values are met in document order.
+        self.char_pos = 0
+        self.byte_pos = byte_base
+
+    def _byte_offset(self, char_index: int) -> int:
+        self.byte_pos += len(self.text[self.char_pos:char_index].encode('utf-8'))
+        self.char_pos = char_index
+        return self.byte_pos
+
+    def construct_mapping(self, node, deep=False):
+        mapping = {}
+        for key_node, value_node in node.value:
+            key = self.construct_object(key_node, deep=deep)
+            if key == 'info' and isinstance(value_node, yaml.ScalarNode) and value_node.value == '' \
+                    and value_node.style is None:
+                mapping[key] = []
+            elif key == 'info':
+                start = self._byte_offset(value_node.start_mark.index)
+                end = self._byte_offset(value_node.end_mark.index)
+                mapping[key] = InfoRef(source=self.source, member=self.member,
+                                       start=start, end=end, column=value_node.start_mark.column, stamp=self.stamp)
+            else:
+                mapping[key] = self.construct_object(value_node, deep=deep)
+        return mapping
+
+
+def read_info(ref: InfoRef) -> List[str]:
+    """
+    Read and parse one record's `info` entry from its source file. Recently-read entries are cached.
+    Reading an entry from a compressed file or a tar bundle decompresses everything before it, so use
+    expand_info_many to read many entries at once.
+
+    Args:
+        ref: The location of the entry, as recorded when the file was loaded.
+
+    Returns:
+        The list of info strings.
+
+    Raises:
+        StaleSourceError if the source file changed since the entry was found, so its offsets no longer hold.
+            The file must be loaded again to read the entry.
+    """
+    _check_stamp(ref)
+    return _read_info_span(ref)
+
+
+def _check_stamp(ref: InfoRef):
+    if ref.stamp is not None and _stamp(ref.source) != ref.stamp:
+        raise StaleSourceError(f"{ref.source} changed since it was loaded; reload it to read its info.")
+
+
+@lru_cache(maxsize=256)
+def _read_info_span(ref: InfoRef) -> List[str]:
+    lower = ref.source.lower()
+    if lower.endswith(TAR_EXTENSIONS):
+        with tarfile.open(ref.source, 'r:*') as archive:
+            data = _read_span(archive.extractfile(ref.member), ref)
+    elif lower.endswith(ZIP_EXTENSIONS):
+        with zipfile.ZipFile(ref.source) as archive, archive.open(ref.member) as member:
+            data = _read_span(member, ref)
+    else:
+        with open_stream(ref.source) as stream:
+            data = _read_span(stream, ref)
+    return _parse_info(data, ref)
+
+
+def _parse_info(data: bytes, ref: InfoRef) -> List[str]:
+    # Indent the fragment as it was in the document, so any following lines of a block value still line up.
+    info = yaml.load(' ' * ref.column + data.decode('utf-8'), Loader=yaml.BaseLoader)
+    if info is None:
+        return []
+    return info if isinstance(info, list) else [info]
+
+
+def expand_info(items: List[Union[str, InfoRef]]) -> List[str]:
+    """
+    Replace every InfoRef in a record's info list with the strings it refers to.
+    """
+    expanded = []
+    for item in items or []:
+        if type(item) is InfoRef:
+            expanded.extend(read_info(item))
+        else:
+            expanded.append(item)
+    return expanded
+
+
+def expand_info_many(info_lists: List[List[Union[str, InfoRef]]]) -> List[List[str]]:
+    """
+    Expand the info lists of many records at once, e.g. to export them. Each source file is read through once,
+    taking its records' entries in the order they lie in it, so a compressed file or a tar bundle is only
+    decompressed once rather than once per record.
+
+    Args:
+        info_lists: Each record's info list, of strings and InfoRefs.
+
+    Returns:
+        The expanded info lists, in the same order.
+
+    Raises:
+        StaleSourceError if a source file changed since it was loaded.
+    """
+    by_source: Dict[str, Set[InfoRef]] = {}
+    for items in info_lists:
+        for item in items or []:
+            if type(item) is InfoRef:
+                by_source.setdefault(item.source, set()).add(item)
+
+    parsed: Dict[InfoRef, List[str]] = {}
+    for source, refs in by_source.items():
+        for ref in refs:
+            _check_stamp(ref)
+        for ref, data in _read_source_spans(source, refs).items():
+            parsed[ref] = _parse_info(data, ref)
+
+    expanded = []
+    for items in info_lists:
+        expanded.append([line for item in items or []
+                         for line in (parsed[item] if type(item) is InfoRef else [item])])
+    return expanded
+
+
+def _read_source_spans(source: str, refs: Set[InfoRef]) -> Dict[InfoRef, bytes]:
+    # Read the bytes of every entry in one source, in a single pass through it.
+    lower = source.lower()
+    by_member: Dict[Optional[str], List[InfoRef]] = {}
+    for ref in refs:
+        by_member.setdefault(ref.member, []).append(ref)
+
+    spans = {}
+    if lower.endswith(TAR_EXTENSIONS):
+        with tarfile.open(source, 'r|*') as archive:
+            for info in archive:
+                if info.name in by_member:
+                    spans.update(_read_spans(archive.extractfile(info), by_member[info.name]))
+    elif lower.endswith(ZIP_EXTENSIONS):
+        with zipfile.ZipFile(source) as archive:
+            for member, member_refs in by_member.items():
+                with archive.open(member) as stream:
+                    spans.update(_read_spans(stream, member_refs))
+    else:
+        with open_stream(source) as stream:
+            spans.update(_read_spans(stream, refs))
+    return spans
+
+
+def _read_spans(stream: IO[bytes], refs: Iterable[InfoRef]) -> Dict[InfoRef, bytes]:
+    # Read forward through the stream only, skipping the bytes between entries, since it may not be seekable.
+    spans = {}
+    position = 0
+    for ref in sorted(refs, key=lambda ref: ref.start):
+        while position < ref.start:
+            skipped = len(stream.read(min(ref.start - position, 1024 * 1024)))
+            if not skipped:
+                break
+            position += skipped
+        spans[ref] = stream.read(ref.end - ref.start)
+        position = ref.end
+    return spans
+
+
+def _read_span(stream: IO[bytes], ref: InfoRef) -> bytes:
+    stream.seek(ref.start)
+    return stream.read(ref.end - ref.start)
+
+
+def _read_tar_members(fileobj: IO[bytes]) -> List[Tuple[str, bytes]]:
+    members = []
+    # Stream mode: the archive (and any outer compression) is read front to back exactly once.
+    with tarfile.open(fileobj=fileobj, mode='r|*') as archive:
+        for info in archive:
+            if info.isfile() and info.name.lower().endswith(YAML_EXTENSIONS):
+                members.append((info.name, archive.extractfile(info).read()))
+    return members
+
+
+def _read_zip_members(filename: str) -> List[Tuple[str, bytes]]:
+    members = []
+    with zipfile.ZipFile(filename) as archive:
+        for info in archive.infolist():
+            if not info.is_dir() and info.filename.lower().endswith(YAML_EXTENSIONS):
+                members.append((info.filename, archive.read(info)))
+    return members
+
+
+def _parse_member(member: Tuple[str, str, bytes, Tuple[int, int]]) -> Dict:
+    source, name, data, stamp = member
+    return parse_document(data, source=source, member=name, stamp=stamp)
+
+
+def _parse_in_parallel(source: str, members: List[Tuple[str, bytes]], stamp: Tuple[int, int]) -> List[Dict]:
+    """
+    Parse archive members across worker processes, since YAML parsing is CPU bound.
+    Results are returned in the same order as the members were given.
+    """
+    members = [(source, name, data, stamp) for name, data in members]
+    if len(members) <= 1:
+        return [_parse_member(member) for member in members]
+
+    workers = min(len(members), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_parse_member, members))
@@ -1,63 +1,126 @@
 
-from typing import Dict, List
-from data_types import EventRecord, EventData
+from typing import Callable, Collection, Dict, List, Tuple
+from data_types import EventRecord, EventData, TimePoint
 from .construct import construct_records
-from logs import get_logger
+from .incremental import constraint_key
+from .window import prune_to_window
 
 
-def preprocess_event_data(data_list: List[EventData]) -> Dict[str, EventData]:
+def preprocess_event_data(data_list: List[EventData],
+                          existing_ids: Collection[str] = (),
+                          next_suffix: Dict[str, int] = None,
+                          generated_ids: Dict[Tuple, List[str]] = None) -> Dict[str, EventData]:
     """
     Auto-generate an event ID for any entry that lacks one.
     If multiple events are given the same explicit id, merge them together.
 
     Args:
         data_list: A list of EventData objects.
+        existing_ids: IDs already in use elsewhere, e.g. by records added earlier. Generated IDs avoid them.
+        next_suffix: The next numeric suffix to try for each generated ID prefix. Updated in place, so passing
+            the same dict with each batch of records keeps later batches from rescanning earlier batches' IDs.
+        generated_ids: The IDs generated by an earlier load of the same files, keyed by each record's name and
+            constraints. A record with the same name and constraints gets the same ID back, if it is still free,
+            so a record added or removed in a file doesn't renumber the records after it. Replaced in place by the
+            IDs generated now.
 
     Returns:
         The final list of preprocessed EventData objects, mapped by id.
+
+    Raises:
+        ValueError listing every record whose duplicate definitions could not be merged.
     """
-    # Put all records with explicit IDs at the start of the list.
-    # This will ensure that auto-generated IDs don't interfere.
-    records_with_ids = [rec for rec in data_list if rec.id]
-    records_without_ids = [rec for rec in data_list if not rec.id]
-    ordered_list = records_with_ids + records_without_ids
-
-    # Loop through all EventData objects and ensure they all have an id, merging duplicates.
-    _logger = get_logger()
-    processed_records: Dict[str, EventData] = {}
-    for rr in ordered_list:
-        # If the record has no 'id' specified, generate one.
+    # Records with explicit IDs are registered first so auto-generated IDs don't interfere.
+    # Records without one are set aside (in order) until all explicit IDs are known.
+    # Every fragment of an explicit ID is gathered before merging, so each group is merged in one pass.
+    groups: Dict[str, List[EventData]] = {}
+    records_without_ids: List[EventData] = []
+    for rr in data_list:
         if not rr.id:
-            name_tokens = rr.name.split()
-            rid = ''.join([tok[0].lower() for tok in name_tokens])
+            records_without_ids.append(rr)
+        elif rr.id in groups:
+            groups[rr.id].append(rr)
+        else:
+            groups[rr.id] = [rr]
 
-            # Make sure we don't already have a record with that ID.
-            final_id = rid
-            deconflict = 2
-            while final_id in processed_records:
-                final_id = rid + str(deconflict)
-                deconflict += 1
+    # Merge duplicates, collecting every conflict so they can all be reported at once.
+    processed_records: Dict[str, EventData] = {}
+    conflicts = []
+    for rec_id, fragments in groups.items():
+        try:
+            processed_records[rec_id] = EventData.merge_all(fragments) if len(fragments) > 1 else fragments[0]
+        except ValueError as err:
+            conflicts.append(str(err))
+    if conflicts:
+        raise ValueError(f"Failed to merge {len(conflicts)} records:\n  " + "\n  ".join(conflicts))
 
-            rr.id = final_id
+    # Give back the IDs generated for the same records last time, before any new IDs are handed out.
+    keys = [(rr.name,) + constraint_key(rr) for rr in records_without_ids]
+    remembered = {key: list(ids) for key, ids in (generated_ids or {}).items()}
+    unmatched = []
+    for rr, key in zip(records_without_ids, keys):
+        candidates = remembered.get(key)
+        while candidates and (candidates[0] in processed_records or candidates[0] in existing_ids):
+            candidates.pop(0)
+        if candidates:
+            rr.id = candidates.pop(0)
             processed_records[rr.id] = rr
         else:
-            # If there is an explicit id, and it already
-            # exists, then merge the two event records.
-            if rr.id in processed_records:
-                rr.merge(processed_records[rr.id])
+            unmatched.append(rr)
 
-            processed_records[rr.id] = rr
+    # Generate an ID from the name's initials for any other entry that lacks one, deconflicting
+    # with a numeric suffix (rid, rid2, rid3, ...). Each prefix remembers the next suffix to
+    # try, so a run of similar names never rescans the suffixes that were already taken.
+    next_suffix = next_suffix if next_suffix is not None else {}
+    for rr in unmatched:
+        name_tokens = rr.name.split()
+        rid = ''.join([tok[0].lower() for tok in name_tokens])
+
+        suffix = next_suffix.get(rid, 1)
+        final_id = rid if suffix == 1 else rid + str(suffix)
+        while final_id in processed_records or final_id in existing_ids:
+            suffix += 1
+            final_id = rid + str(suffix)
+        next_suffix[rid] = suffix + 1
+
+        rr.id = final_id
+        processed_records[rr.id] = rr
+
+    if generated_ids is not None:
+        generated_ids.clear()
+        for rr, key in zip(records_without_ids, keys):
+            generated_ids.setdefault(key, []).append(rr.id)
+    return processed_records
 
-    # Filter the processed records into a final list to prune
-    # duplicates and maintain the initial ordering.
-    final_dict = {}
-    for rec_id, rec in processed_records.items():
-        if rec_id not in final_dict:
-            final_dict[rec_id] = rec
-    return final_dict
 
+def build_record_list(data_list: List[EventData],
+                      window: Tuple[TimePoint, TimePoint] = None,
+                      release: bool = False,
+                      on_resolved: Callable[[Dict[str, EventRecord], int, int], None] = None,
+                      generated_ids: Dict[Tuple, List[str]] = None) -> Dict[str, EventRecord]:
+    """
+    Preprocess and resolve a list of EventData objects into EventRecords.
+
+    Args:
+        data_list: A list of EventData objects.
+        window: An optional (min, max) date range. If given, records which can't overlap it are
+            pruned before their bounds are resolved, and only records that may overlap it are returned.
+        release: If True, drop each record's parsing and constraint state once its bounds are resolved.
+        on_resolved: Passed to construct_records, to hear about records as they are resolved. With a window,
+            only records that may overlap it are passed on.
+        generated_ids: Passed to preprocess_event_data, to keep the IDs generated by an earlier load.
+
+    Returns:
+        The resolved EventRecords, mapped by id.
+    """
+    pre_datas = preprocess_event_data(data_list, generated_ids=generated_ids)
+    if window is None:
+        return construct_records(pre_datas, release=release, on_resolved=on_resolved)
 
-def build_record_list(data_list: List[EventData]) -> Dict[str, EventRecord]:
-    pre_datas = preprocess_event_data(data_list)
-    records = construct_records(pre_datas)
-    return records
+    pre_datas, in_window = prune_to_window(pre_datas, *window)
+    report_in_window = None
+    if on_resolved:
+        def report_in_window(batch: Dict[str, EventRecord], done: int, total: int):
+            on_resolved({rec_id: rec for rec_id, rec in batch.items() if rec_id in in_window}, done, total)
+    records = construct_records(pre_datas, release=release, on_resolved=report_in_window)
+    return {rec_id: rec for rec_id, rec in records.items() if rec_id in in_window}
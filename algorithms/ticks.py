@@ -0,0 +1,116 @@
+import calendar
+import math
+from collections import namedtuple
+from typing import List
+
+from data_types import TimePoint
+
+SECONDS_PER_DAY = 86400
+DAYS_PER_YEAR = 365.2425
+DAYS_PER_MONTH = DAYS_PER_YEAR / 12
+
+# A guideline to draw: the point in time it marks, and its caption.
+Tick = namedtuple("Tick", "time caption")
+
+# The steps finer than a year to choose from, each in its own unit, finest first.
+SECOND_STEPS = (1, 5, 15, 30, 60, 5*60, 15*60, 30*60, 3600, 3*3600, 6*3600, 12*3600)
+DAY_STEPS = (1, 2, 5, 10, 15)
+MONTH_STEPS = (1, 3, 6)
+
+
+def calendar_ticks(min_date: TimePoint, max_date: TimePoint, max_ticks: int = 10) -> List[Tick]:
+    """
+    Choose where to draw guidelines between two dates, at the finest calendar step that keeps to about
+    `max_ticks` of them: seconds, minutes or hours, days of the month, months, or 1, 2 or 5 times a power of
+    ten years, from single years through centuries and millennia. The step is found directly from the span,
+    and only the ticks on it are built, so the cost depends on `max_ticks`, not on how much time is in view.
+
+    Args:
+        min_date: The beginning of the visible time range.
+        max_date: The end of the visible time range.
+        max_ticks: About the most ticks to return. The uneven lengths of months can add one or two.
+
+    Returns:
+        The ticks within [min_date, max_date], in order.
+    """
+    lo = min_date.ordinal()
+    hi = max_date.ordinal()
+    if hi <= lo or max_ticks < 1:
+        return []
+    least_days = (hi - lo) / max_ticks  # Any shorter step would give too many ticks.
+
+    for step in SECOND_STEPS:
+        if step / SECONDS_PER_DAY >= least_days:
+            return _second_ticks(lo, hi, step)
+    for step in DAY_STEPS:
+        if step >= least_days:
+            return _day_ticks(min_date, max_date, step)
+    for step in MONTH_STEPS:
+        if step * DAYS_PER_MONTH >= least_days:
+            return _month_ticks(min_date, max_date, step)
+    return _year_ticks(min_date, max_date, _nice_years(least_days / DAYS_PER_YEAR))
+
+
+def _nice_years(least_years: float) -> int:
+    # The smallest of 1, 2 or 5 times a power of ten that is at least least_years.
+    power = 10 ** max(0, math.floor(math.log10(least_years)))
+    for multiple in (1, 2, 5, 10):
+        if multiple * power >= least_years:
+            return multiple * power
+
+
+def _date_caption(tp: TimePoint) -> str:
+    if tp.month == 1 and tp.day == 1:
+        return str(tp.year)
+    if tp.day == 1:
+        return f"{calendar.month_abbr[tp.month]} {tp.year}"
+    return f"{tp.day} {calendar.month_abbr[tp.month]}"
+
+
+def _second_ticks(lo: float, hi: float, step: int) -> List[Tick]:
+    ticks = []
+    for index in range(math.ceil(lo * SECONDS_PER_DAY / step), math.floor(hi * SECONDS_PER_DAY / step) + 1):
+        tp = TimePoint.from_ordinal(index * step / SECONDS_PER_DAY)
+        seconds = round(tp.seconds)
+        if not seconds:
+            caption = _date_caption(tp)  # Midnight; the date is more telling than 00:00.
+        elif step < 60:
+            caption = f"{seconds // 3600:02}:{seconds // 60 % 60:02}:{seconds % 60:02}"
+        else:
+            caption = f"{seconds // 3600:02}:{seconds // 60 % 60:02}"
+        ticks.append(Tick(tp, caption))
+    return ticks
+
+
+def _day_ticks(min_date: TimePoint, max_date: TimePoint, step: int) -> List[Tick]:
+    # Days restart from the 1st each month, leaving out days too close to the next month's 1st.
+    ticks = []
+    year, month = min_date.year, min_date.month
+    while True:
+        month_len = calendar.monthrange(year, month)[1]
+        for day in range(1, month_len - step // 2 + 1, step):
+            tp = TimePoint(year, month, day)
+            if tp > max_date:
+                return ticks
+            if tp >= min_date:
+                ticks.append(Tick(tp, _date_caption(tp)))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def _month_ticks(min_date: TimePoint, max_date: TimePoint, step: int) -> List[Tick]:
+    ticks = []
+    index = -(-(min_date.year * 12 + min_date.month - 1) // step) * step  # Months since year 0, rounded up.
+    while True:
+        tp = TimePoint(index // 12, index % 12 + 1, 1)
+        if tp > max_date:
+            return ticks
+        if tp >= min_date:
+            ticks.append(Tick(tp, _date_caption(tp)))
+        index += step
+
+
+def _year_ticks(min_date: TimePoint, max_date: TimePoint, step: int) -> List[Tick]:
+    first = -(-min_date.year // step) * step
+    if TimePoint(first, 1, 1) < min_date:
+        first += step
+    return [Tick(TimePoint(year, 1, 1), str(year)) for year in range(first, max_date.year + 1, step)]
@@ -0,0 +1,89 @@
+import re
+from collections import deque
+from typing import Dict, Optional, Set, Tuple
+
+from data_types import EventData, TimeReference, TimePoint
+from data_types.time_reference import is_event_ref
+from logs import get_logger
+
+
+def record_dependencies(data: EventData) -> Set[str]:
+    """
+    Find the IDs of every other record that this record's constraints refer to.
+
+    Args:
+        data: A preprocessed EventData object.
+
+    Returns:
+        A set of referenced record IDs, with any ^/$ modifiers and offsets removed.
+    """
+    dependencies = set()
+    for field in (data.start, data.end, data.start_before, data.start_after, data.end_before, data.end_after):
+        for constraint in field or []:
+            tokens = constraint.split()
+            if tokens and is_event_ref(tokens):
+                # Same splitting as bind_reference_boundary: drop any +/- offset, then the justification.
+                ref = re.split('[+-]+', constraint)[0]
+                dependencies.add(ref.strip().strip('^$'))
+    return dependencies
+
+
+def absolute_extent(data: EventData) -> Tuple[Optional[TimePoint], Optional[TimePoint]]:
+    """
+    Determine the earliest possible start and latest possible end of a record using only its absolute dates.
+    References to other records are ignored, so the extent may be looser than the resolved bounds, never tighter.
+
+    Args:
+        data: A preprocessed EventData object.
+
+    Returns:
+        A tuple of (start lower bound, end upper bound). Either may be None if no absolute date constrains it.
+    """
+    start = TimeReference(absolutes=data.start, older=data.start_after, later=data.start_before)
+    end = TimeReference(absolutes=data.end, older=data.end_after, later=data.end_before)
+    start_mins = [c for c in start._older_refs if type(c) is TimePoint]
+    end_maxes = [c for c in end._later_refs if type(c) is TimePoint]
+    earliest_start = max(start_mins) if start_mins else None
+    latest_end = min(end_maxes) if end_maxes else None
+    return earliest_start, latest_end
+
+
+def prune_to_window(event_datas: Dict[str, EventData],
+                    window_min: TimePoint,
+                    window_max: TimePoint) -> Tuple[Dict[str, EventData], Set[str]]:
+    """
+    Drop records whose absolute dates already place them entirely outside the given window.
+    Records that a kept record depends on are retained, since they are needed to resolve its bounds.
+
+    Args:
+        event_datas: Preprocessed EventData objects, mapped by id.
+        window_min: The earliest date of interest.
+        window_max: The latest date of interest.
+
+    Returns:
+        A tuple of (the EventData objects that must be resolved, in their original order,
+                    the IDs of the records which may fall inside the window).
+    """
+    in_window = set()
+    for rec_id, data in event_datas.items():
+        earliest_start, latest_end = absolute_extent(data)
+        if earliest_start is not None and earliest_start > window_max:
+            continue  # Starts after the window closes.
+        if latest_end is not None and latest_end < window_min:
+            continue  # Ends before the window opens.
+        in_window.add(rec_id)
+
+    # Walk the dependency graph from the kept records so their constraints can still be bound.
+    required = set(in_window)
+    pending = deque(in_window)
+    while pending:
+        rec_id = pending.pop()
+        for dep_id in record_dependencies(event_datas[rec_id]):
+            if dep_id in event_datas and dep_id not in required:
+                required.add(dep_id)
+                pending.append(dep_id)
+
+    get_logger().debug(f"Date window kept {len(in_window)} of {len(event_datas)} records"
+                       f" ({len(required) - len(in_window)} more needed as dependencies).")
+    pruned = {rec_id: data for rec_id, data in event_datas.items() if rec_id in required}
+    return pruned, in_window
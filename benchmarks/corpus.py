@@ -0,0 +1,41 @@
+import random
+from typing import Dict, List
+
+from data_types import EventData
+
+NAME_PREFIXES = ["Life of", "Reign of", "Siege of", "Founding of", "Exile of"]
+SOURCES = ["Genesis 5:3", "Genesis 11:10", "Annals, book 2", "Chronicle fragment B"]
+
+
+def synthetic_record_dicts(count: int, seed: int = 0) -> List[Dict]:
+    """
+    Generate a reproducible corpus of record dictionaries, shaped like the hand-written data files.
+    Roughly half the records are pinned to absolute dates; the rest are defined relative to an earlier record.
+
+    Args:
+        count: The number of records to generate.
+        seed: Random seed, so repeated runs measure the same data.
+
+    Returns:
+        A list of record dictionaries, as they would be read from a YAML file.
+    """
+    rng = random.Random(seed)
+    records = []
+    for ii in range(count):
+        rec = {'name': f"{rng.choice(NAME_PREFIXES)} Person {ii}",
+               'id': f"rec{ii}",
+               'info': [rng.choice(SOURCES), f"Note about record {ii}"]}
+        if ii == 0 or rng.random() < 0.5:
+            start_year = rng.randrange(-4000, 2000)
+            rec['start'] = str(start_year)
+            rec['end'] = str(start_year + rng.randrange(0, 80))
+        else:
+            other = rng.randrange(0, ii)
+            rec['start_after'] = f"^rec{other}"
+            rec['duration'] = f"{rng.randrange(1, 80)}y"
+        records.append(rec)
+    return records
+
+
+def synthetic_event_datas(count: int, seed: int = 0) -> List[EventData]:
+    return [EventData.parse(rec) for rec in synthetic_record_dicts(count, seed)]
@@ -0,0 +1,49 @@
+"""
+Measure how fast streamed records can be added to a running timeline.
+
+Usage: python -m benchmarks.ingest [count] [batch_size]
+batch_size may be 'auto' to size each batch from the time the last one took, as a RecordStream does.
+"""
+import sys
+import json
+import time
+import logging
+
+from benchmarks.corpus import synthetic_record_dicts
+from data_types import Timeline
+from logs import get_logger
+from record_stream import RecordStream, parse_record_line
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    batch_arg = sys.argv[2] if len(sys.argv) > 2 else '5000'
+    auto = batch_arg == 'auto'
+    batch_size = RecordStream.FIRST_BATCH_SIZE if auto else int(batch_arg)
+    batching = f"batches taking up to {RecordStream.BATCH_TIME * 1000:.0f} ms" if auto else f"batches of {batch_size}"
+    get_logger().setLevel(logging.INFO)  # Keep debug logging out of the measurement.
+    lines = [json.dumps(rec).encode() + b'\n' for rec in synthetic_record_dicts(count)]
+
+    timeline = Timeline(compact=True)
+    started = time.perf_counter()
+    slowest = 0.0
+    first = 0
+    while first < count:
+        batch_started = time.perf_counter()
+        batch = [parse_record_line(line) for line in lines[first:first + batch_size]]
+        timeline.ingest(batch)
+        batch_time = time.perf_counter() - batch_started
+        slowest = max(slowest, batch_time)
+        first += len(batch)
+        if auto:
+            batch_size = RecordStream.next_batch_size(batch_size, len(batch), batch_time)
+    elapsed = time.perf_counter() - started
+
+    assert len(timeline.records) == count
+    print(f"{count} records in {batching}")
+    print(f"  throughput:    {count / elapsed:10.0f} records/s")
+    print(f"  slowest batch: {slowest * 1000:10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
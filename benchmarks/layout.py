@@ -0,0 +1,71 @@
+"""
+Measure how long laying out the visible records takes, comparing lane packing with the collidelist
+deconfliction it replaced.
+
+Usage: python -m benchmarks.layout [count ...]
+"""
+import sys
+import time
+import logging
+
+import numpy as np
+import pygame
+
+from algorithms import assign_lanes
+from logs import get_logger
+
+# The old deconfliction is quadratic, so it is only timed up to this many records.
+MAX_COLLIDELIST_COUNT = 10000
+
+
+def synthetic_extents(count: int, width_px: int = 1920, seed: int = 0):
+    """
+    Returns:
+        (lefts, rights) of `count` label extents across a window, most of them short and a few long.
+    """
+    rng = np.random.default_rng(seed)
+    lefts = rng.uniform(0, width_px, count).round()
+    rights = lefts + np.maximum(rng.lognormal(4, 1, count), 30).round()
+    return lefts, rights
+
+
+def collidelist_layout(lefts: np.ndarray, rights: np.ndarray, height: int = 16) -> int:
+    """
+    The deconfliction Timeview used before lane packing: each rect starts below the last one placed
+    and moves down past every rect it collides with.
+
+    Returns:
+        The number of rows used.
+    """
+    placed = []
+    min_top = 0
+    for left, right in zip(lefts.tolist(), rights.tolist()):
+        lr = pygame.Rect(left, min_top, right - left, height)
+        idx = lr.collidelist(placed)
+        while idx != -1:
+            lr.top = placed[idx].bottom
+            idx = lr.collidelist(placed)
+        min_top = lr.bottom
+        placed.append(lr)
+    return (max(rect.bottom for rect in placed) - min(rect.top for rect in placed)) // height
+
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or [10000, 100000]
+    get_logger().setLevel(logging.INFO)  # Keep debug logging out of the measurement.
+    for count in counts:
+        lefts, rights = synthetic_extents(count)
+        started = time.perf_counter()
+        lanes, lane_count = assign_lanes(lefts, rights)
+        elapsed = time.perf_counter() - started
+        print(f"{count} records")
+        print(f"  lane packing: {elapsed * 1000:10.1f} ms, {lane_count} lanes")
+        if count <= MAX_COLLIDELIST_COUNT:
+            started = time.perf_counter()
+            rows = collidelist_layout(lefts, rights)
+            elapsed = time.perf_counter() - started
+            print(f"  collidelist:  {elapsed * 1000:10.1f} ms, {rows} rows")
+
+
+if __name__ == "__main__":
+    main()
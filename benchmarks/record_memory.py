@@ -0,0 +1,41 @@
+"""
+Measure the memory held per resolved record.
+
+Usage: python -m benchmarks.record_memory [count]
+"""
+import gc
+import sys
+import logging
+import tracemalloc
+
+from algorithms import build_record_list
+from benchmarks.corpus import synthetic_record_dicts
+from data_types import EventData
+from logs import get_logger
+
+
+def measure(count: int, release: bool) -> float:
+    dicts = synthetic_record_dicts(count)
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    datas = [EventData.parse(rec) for rec in dicts]
+    records = build_record_list(datas, release=release)
+    del datas
+    gc.collect()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(records) == count
+    return (after - before) / count
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    get_logger().setLevel(logging.INFO)  # Keep debug logging out of the measurement.
+    print(f"{count} records")
+    print(f"  retained:  {measure(count, release=False):8.0f} bytes/record")
+    print(f"  released:  {measure(count, release=True):8.0f} bytes/record")
+
+
+if __name__ == "__main__":
+    main()
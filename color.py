@@ -5,3 +5,5 @@ WHITE = (255, 255, 255)
 white = WHITE
 LIGHT_GRAY = (175, 175, 175)
 light_gray = LIGHT_GRAY
+STEEL_BLUE = (140, 160, 200)
+steel_blue = STEEL_BLUE
@@ -2,9 +2,18 @@
 from .time_span import TimeSpan
 from .time_point import TimePoint
 from .time_reference import TimeReference
-from .event_data import EventData
+from .event_data import EventData, InfoRef
 from .event_record import EventRecord
-from .exceptions import InconsistentTimeReferenceError, UnknownEventRecordError, IncoherentTimelineError
+from .exceptions import InconsistentTimeReferenceError, UnknownEventRecordError, IncoherentTimelineError, CircularIncludeError, \
+    StaleSourceError
+from .resolved_timeline import ResolvedTimeline
+from .timeline_summary import TimelineSummary
+from .timeline_snapshot import TimelineSnapshot
+from .event_log import EventLog, LogRecord
 from .timeline import Timeline
+from .tiled_timeline import TiledTimeline
+from .lane_layout import LaneLayout
+from .hit_grid import HitGrid
+from .view_transform import ViewTransform
 from .timeview import Timeview
 from .sliding_value import SlidingValue
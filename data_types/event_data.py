@@ -1,13 +1,34 @@
-from typing import Dict, List, Union
+import sys
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
 from dataclasses import dataclass
 
 from logs import get_logger
 
 
-@dataclass
+class InfoRef(NamedTuple):
+    """
+    Where a record's unparsed `info` entry lies in its source file, so it can be read only when needed.
+    Offsets are in bytes of the (decompressed) document; member names the document within an archive.
+    The stamp is the source file's (size, modification time) when it was read, so offsets into a file which has
+    since changed are never followed.
+    """
+    source: str
+    member: Optional[str]
+    start: int
+    end: int
+    column: int
+    stamp: Optional[Tuple[int, int]] = None
+
+
+def _intern_all(values: List[str]) -> List[str]:
+    return [sys.intern(v) if type(v) is str else v for v in values]
+
+
+@dataclass(slots=True)
 class EventData:
     """
     Holds the data from a single EventRecord's input dictionary, and provides convenient accessors.
+    IDs and constraint/info strings are interned, since references and sources repeat across many records.
     """
 
     name: str = ''
@@ -19,7 +40,7 @@ class EventData:
     start_after: Union[str, List[str]] = ''
     end_after: Union[str, List[str]] = ''
     duration: str = ''
-    info: Union[str, List[str]] = ''
+    info: Union[str, List[Union[str, InfoRef]]] = ''
 
     @staticmethod
     def parse(event_record: Dict) -> 'EventData':
@@ -32,13 +53,16 @@ class EventData:
         ea = event_record.get('end_after', [])
         nf = event_record.get('info', [])
         # Just wrap everything that can be a list, as a list, for consistency.
+        # A file-loaded `info` is an InfoRef, which is kept as a single (lazily-read) entry.
+        # Lists are copied so later edits never reach back into the (possibly cached) parsed input.
         ss, ee, sb, sa, eb, ea, nf = [
-            [bound] if not isinstance(bound, list) else bound
+            _intern_all([bound] if not isinstance(bound, list) else bound)
             for bound in [ss, ee, sb, sa, eb, ea, nf]
         ]
+        rec_id = event_record.get('id', None)
 
         return EventData(name=event_record.get('name', None),
-                         id=event_record.get('id', None),
+                         id=sys.intern(rec_id) if rec_id else rec_id,
                          start=ss,
                          end=ee,
                          start_before=sb,
@@ -60,23 +84,48 @@ class EventData:
         Raises: ValueError if `other` has a different record ID or duration. If other attributes create
             a conflict, this will be discovered when the event boundaries are reconciled.
         """
-        if self.name != other.name:
+        EventData.merge_all([other, self])
+
+    @staticmethod
+    def merge_all(fragments: List['EventData']) -> 'EventData':
+        """
+        Combine every fragment of a record defined in several places into the last fragment, in one pass, so the
+        last definition's name wins. Constraint lists are concatenated in fragment order with duplicates removed,
+        so the result is deterministic.
+
+        Args:
+            fragments: EventData objects which all share the same ID.
+
+        Returns:
+            The last fragment, updated to hold the constraints of all of them.
+
+        Raises: ValueError if the fragments have different record IDs or durations. If other attributes create
+            a conflict, this will be discovered when the event boundaries are reconciled.
+        """
+        merged = fragments[-1]
+        others = fragments[:-1]
+
+        names = [frag.name for frag in others if frag.name != merged.name]
+        if names:
             log = get_logger()
-            log.warning(f"Event {self.name} is merging with a differently-named event {other.name}")
-        if self.id != other.id:
-            raise ValueError(f"Trying to merge event data for {other.id} into data for {self.id}!")
-        if self.duration and other.duration and self.duration != other.duration:
-            raise ValueError(f"Record {self.id} is defined with two conflicting durations ({self.duration} and {other.duration})!")
-        self.duration = other.duration if not self.duration else self.duration  # Keep if specified, replace if not.
-
-        def combine_lists(list1: List[str], list2: List[str]) -> List[str]:
-            combined = list1 + list2
-            return list(set(combined))
-
-        self.start = combine_lists(self.start, other.start)
-        self.end = combine_lists(self.end, other.end)
-        self.start_before = combine_lists(self.start_before, other.start_before)
-        self.end_before = combine_lists(self.end_before, other.end_before)
-        self.start_after = combine_lists(self.start_after, other.start_after)
-        self.end_after = combine_lists(self.end_after, other.end_after)
-        self.info = combine_lists(self.info, other.info)
+            log.warning(f"Event {merged.name} is merging with differently-named events {names}")
+        ids = [frag.id for frag in others if frag.id != merged.id]
+        if ids:
+            raise ValueError(f"Trying to merge event data for {ids} into data for {merged.id}!")
+        durations = list(dict.fromkeys(frag.duration for frag in fragments if frag.duration))
+        if len(durations) > 1:
+            raise ValueError(f"Record {merged.id} is defined with conflicting durations ({', '.join(durations)})!")
+        merged.duration = durations[0] if durations else merged.duration  # Keep if specified, replace if not.
+
+        def combine_lists(field: str) -> List[str]:
+            # dict.fromkeys drops repeats but, unlike a set, keeps the first-seen order.
+            return list(dict.fromkeys(item for frag in fragments for item in getattr(frag, field)))
+
+        merged.start = combine_lists('start')
+        merged.end = combine_lists('end')
+        merged.start_before = combine_lists('start_before')
+        merged.end_before = combine_lists('end_before')
+        merged.start_after = combine_lists('start_after')
+        merged.end_after = combine_lists('end_after')
+        merged.info = combine_lists('info')
+        return merged
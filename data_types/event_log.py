@@ -0,0 +1,130 @@
+import math
+from collections import namedtuple
+from typing import List, Optional, Sequence, Union
+import numpy as np
+
+from data_types import TimePoint
+from data_types.interval_index import IntervalIndex
+from data_types.timeline_summary import TimelineSummary
+
+# Resolved bounds of one end of a LogRecord. An event log's times are exact, so min and max are the same point.
+LogBound = namedtuple("LogBound", "min max")
+
+
+class LogRecord:
+    """
+    One event of an EventLog, shaped like a resolved EventRecord so a Timeview can draw it.
+    Built on demand by EventLog queries; the log itself only holds columns.
+    """
+    __slots__ = ('id', 'name', 'start', 'end', 'info')
+
+    def __init__(self, rec_id: str, name: str, start: TimePoint, end: TimePoint):
+        self.id = rec_id
+        self.name = name
+        self.start = LogBound(start, start)
+        self.end = LogBound(end, end)
+        self.info = []
+
+    def __repr__(self) -> str:
+        return f"LogRecord(id={self.id!r}, name={self.name!r})"
+
+
+class EventLog:
+    """
+    A read-only timeline of exactly-timed events, such as machine-generated logs, held as columns.
+    Times are float ordinal days, with the time of day as the fraction, so events can be resolved to the second.
+    No record depends on another, so nothing is solved: rows are sorted by start and queried through an IntervalIndex.
+    Provides the parts of the Timeline interface that a Timeview needs.
+    """
+
+    # The most records a single query builds. Wider queries return an evenly spaced sample of the overlapping
+    # events, in start order, so a zoomed-out view of millions of events stays drawable.
+    MAX_QUERY_RECORDS = 5000
+
+    def __init__(self,
+                 starts: np.ndarray,
+                 ends: np.ndarray,
+                 names: Sequence[str],
+                 ids: Optional[Sequence[str]] = None):
+        """
+        Args:
+            starts: The start of each event, as an ordinal day.
+            ends: The end of each event, as an ordinal day. Must be >= the start row by row.
+            names: The name of each event.
+            ids: The id of each event. Defaults to its row number in the input.
+
+        Raises:
+            ValueError if the columns differ in length, or an event ends before it starts.
+        """
+        starts = np.asarray(starts, dtype=np.float64)
+        ends = np.asarray(ends, dtype=np.float64)
+        if not (len(starts) == len(ends) == len(names)) or (ids is not None and len(ids) != len(starts)):
+            raise ValueError("Event log columns must all have the same length.")
+        backwards = np.nonzero(ends < starts)[0]
+        if len(backwards):
+            raise ValueError(f"Event on row {backwards[0]} ends before it starts.")
+
+        order = np.argsort(starts, kind='stable')
+        self.starts: np.ndarray = starts[order]
+        self.ends: np.ndarray = ends[order]
+        self.names: np.ndarray = np.asarray(names, dtype=object)[order]
+        self.ids: np.ndarray = order.astype(str).astype(object) if ids is None else np.asarray(ids, dtype=object)[order]
+
+        self._summary: Optional[TimelineSummary] = None
+        self._index: Optional[IntervalIndex] = None
+
+        if len(self):
+            self.min: Union[TimePoint, float] = TimePoint.from_ordinal(float(self.starts[0]))
+            self.max: Union[TimePoint, float] = TimePoint.from_ordinal(float(self.ends.max()))
+        else:
+            self.min, self.max = -math.inf, math.inf
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def summary(self) -> TimelineSummary:
+        """
+        Returns:
+            A density summary of the events, built the first time it is needed.
+        """
+        if self._summary is None:
+            self._summary = TimelineSummary(self.starts, self.ends)
+        return self._summary
+
+    def overlapping(self, lo: float, hi: float) -> np.ndarray:
+        """
+        Returns:
+            The sorted rows of every event that overlaps the ordinal range [lo, hi].
+        """
+        if self._index is None:
+            # Built on the first query; building it twice in a race is harmless.
+            self._index = IntervalIndex(self.starts, self.ends)
+        return np.sort(self._index.overlapping(lo, hi))
+
+    def query_range(self, lo: Union[float, TimePoint], hi: Union[float, TimePoint]) -> List[LogRecord]:
+        """
+        Find the events within a range of time. At most MAX_QUERY_RECORDS are returned.
+
+        Args:
+            lo: The beginning of the range, as a TimePoint or ordinal day.
+            hi: The end of the range, as a TimePoint or ordinal day.
+
+        Returns:
+            The events overlapping [lo, hi], in start order.
+        """
+        lo = lo.ordinal() if type(lo) is TimePoint else lo
+        hi = hi.ordinal() if type(hi) is TimePoint else hi
+        rows = self.overlapping(lo, hi)
+        if len(rows) > self.MAX_QUERY_RECORDS:
+            rows = rows[np.linspace(0, len(rows) - 1, self.MAX_QUERY_RECORDS).astype(np.int64)]
+        return [self.record(row) for row in rows]
+
+    def record(self, row: int) -> LogRecord:
+        """
+        Returns:
+            The event on a row, in sorted order, as a record.
+        """
+        return LogRecord(rec_id=self.ids[row],
+                         name=self.names[row],
+                         start=TimePoint.from_ordinal(float(self.starts[row])),
+                         end=TimePoint.from_ordinal(float(self.ends[row])))
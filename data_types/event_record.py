@@ -1,9 +1,11 @@
 
 from typing import List, Tuple, Union
-from data_types import TimeReference, TimeSpan, EventData
+from data_types import TimeReference, TimeSpan, EventData, InfoRef
 
 
 class EventRecord:
+    __slots__ = ('_data', 'name', 'id', 'start', 'end', 'duration', 'info')
+
     def __init__(self, record_data: EventData):
         """
         Represents a range of time. The beginning and end are represented by TimeReference objects, and may have
@@ -24,7 +26,7 @@ class EventRecord:
                                                 older=end_after,
                                                 later=end_before)
         self.duration = self._extract_duration(record_data)
-        self.info: List[str] = record_data.info
+        self.info: List[Union[str, InfoRef]] = record_data.info  # Use algorithms.expand_info to read any InfoRefs.
 
     @staticmethod
     def _extract_time_refs(record_data: EventData, start_refs: bool) -> Tuple:
@@ -43,5 +45,14 @@ class EventRecord:
     def _extract_duration(record_data: EventData) -> Union[TimeSpan, None]:
         return TimeSpan.parse(record_data.duration) if record_data.duration else None
 
+    def release(self):
+        """
+        Drop the parsed input and unresolved constraints once this record's bounds have been resolved.
+        Only the name, id, resolved bounds, duration and info are kept.
+        """
+        self._data = None
+        self.start.release()
+        self.end.release()
+
     def __str__(self):
         return self.name
@@ -9,3 +9,11 @@ class UnknownEventRecordError(Exception):
 
 class IncoherentTimelineError(Exception):
     pass
+
+
+class CircularIncludeError(Exception):
+    pass
+
+
+class StaleSourceError(Exception):
+    pass
@@ -0,0 +1,95 @@
+from typing import List, Tuple
+import numpy as np
+
+
+class HitGrid:
+    """
+    A uniform grid over a set of rectangles, such as where records are drawn, for finding those at a point or
+    overlapping an area without testing every one. Each rectangle is listed under every cell it overlaps, so a
+    query only tests the few listed under the cells it touches. Rectangles are only indexed within `bounds`;
+    queries outside them find nothing.
+
+    The listing is built in one pass of NumPy operations: every (cell, rectangle) pair is generated, then sorted
+    by cell, so each cell's rectangles are one slice of a single array, in their original order.
+    """
+
+    CELL_PX = 64  # Width and height of each cell, in pixels.
+
+    def __init__(self, rects: np.ndarray, bounds: Tuple[int, int, int, int], cell_px: int = CELL_PX):
+        """
+        Args:
+            rects: An (n, 4) array of (left, top, right, bottom) rectangles. The right and bottom edges are
+                exclusive, like a pygame.Rect's.
+            bounds: The (left, top, right, bottom) area to index, e.g. the window.
+            cell_px: The size of each cell.
+        """
+        self.rects = np.asarray(rects, dtype=np.float64).reshape(-1, 4)
+        self.bounds = bounds
+        self.cell_px = cell_px
+        left, top, right, bottom = bounds
+        self.columns = max(1, -(-(right - left) // cell_px))
+        self.rows = max(1, -(-(bottom - top) // cell_px))
+
+        first_col, first_row, last_col, last_row = self._cell_span(self.rects)
+        indexed = np.flatnonzero((first_col <= last_col) & (first_row <= last_row))
+        first_col, first_row = first_col[indexed], first_row[indexed]
+        widths = last_col[indexed] - first_col + 1
+        counts = widths * (last_row[indexed] - first_row + 1)
+
+        # Number each rectangle's cells from zero, then turn those numbers back into columns and rows.
+        owners = np.repeat(indexed, counts)
+        steps = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        repeated_widths = np.repeat(widths, counts)
+        cols = np.repeat(first_col, counts) + steps % repeated_widths
+        rows = np.repeat(first_row, counts) + steps // repeated_widths
+        cells = rows * self.columns + cols
+
+        order = np.argsort(cells, kind='stable')
+        self._owners = owners[order]
+        self._cell_starts = np.searchsorted(cells[order], np.arange(self.rows * self.columns + 1))
+
+    def __len__(self) -> int:
+        return len(self.rects)
+
+    def at(self, x: float, y: float) -> List[int]:
+        """
+        Returns:
+            The indices of the rectangles containing the point (x, y), in ascending order.
+        """
+        found = self.overlapping((x, y, x + 1, y + 1))
+        rects = self.rects[found]
+        return [int(index) for index, rect in zip(found, rects) if rect[0] <= x < rect[2] and rect[1] <= y < rect[3]]
+
+    def overlapping(self, area: Tuple[float, float, float, float]) -> List[int]:
+        """
+        Args:
+            area: A (left, top, right, bottom) rectangle, with exclusive right and bottom edges.
+
+        Returns:
+            The indices of the rectangles overlapping the area, in ascending order.
+        """
+        first_col, first_row, last_col, last_row = (int(edge[0]) for edge in self._cell_span(np.array([area])))
+        if first_col > last_col or first_row > last_row:
+            return []
+        slices = [self._owners[self._cell_starts[row * self.columns + first_col]:
+                               self._cell_starts[row * self.columns + last_col + 1]]
+                  for row in range(first_row, last_row + 1)]
+        candidates = np.unique(np.concatenate(slices))
+        rects = self.rects[candidates]
+        left, top, right, bottom = area
+        hits = (rects[:, 0] < right) & (rects[:, 2] > left) & (rects[:, 1] < bottom) & (rects[:, 3] > top)
+        return candidates[hits].tolist()
+
+    def _cell_span(self, rects: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        # The first and last cell each rectangle overlaps, clipped to the grid; empty where last < first.
+        left, top, right, bottom = self.bounds
+        clipped = np.stack([np.maximum(rects[:, 0], left), np.maximum(rects[:, 1], top),
+                            np.minimum(rects[:, 2], right), np.minimum(rects[:, 3], bottom)], axis=1)
+        first_col = np.floor((clipped[:, 0] - left) / self.cell_px).astype(np.int64)
+        first_row = np.floor((clipped[:, 1] - top) / self.cell_px).astype(np.int64)
+        last_col = np.ceil((clipped[:, 2] - left) / self.cell_px).astype(np.int64) - 1
+        last_row = np.ceil((clipped[:, 3] - top) / self.cell_px).astype(np.int64) - 1
+        # A rectangle that is empty after clipping overlaps no cells.
+        empty = (clipped[:, 0] >= clipped[:, 2]) | (clipped[:, 1] >= clipped[:, 3])
+        last_col[empty] = first_col[empty] - 1
+        return first_col, first_row, last_col, last_row
@@ -0,0 +1,101 @@
+from typing import List, Optional
+import numpy as np
+
+
+class _Node:
+    """
+    One node of a centered interval tree. Holds every interval that contains `center`, sorted both by
+    start and by end so a stabbing query only has to take a prefix or suffix of one of them.
+    A node without a center is a flat leaf, holding every interval of its (small) subtree.
+    """
+    __slots__ = ('center', 'left', 'right', 'by_start', 'starts', 'by_end', 'ends')
+
+    def __init__(self, center: Optional[int], rows: np.ndarray, lo: np.ndarray, hi: np.ndarray):
+        self.center = center
+        self.left: Optional[_Node] = None
+        self.right: Optional[_Node] = None
+        order = np.argsort(lo[rows], kind='stable')
+        self.by_start = rows[order]
+        self.starts = lo[self.by_start]
+        order = np.argsort(hi[rows], kind='stable')
+        self.by_end = rows[order]
+        self.ends = hi[self.by_end]
+
+
+class IntervalIndex:
+    """
+    Static index over closed intervals [lo, hi] for range and stabbing queries in O(log n + k).
+
+    Stabbing queries use a centered interval tree. A range query [a, b] is answered as the intervals
+    containing a, plus those starting in (a, b], which come from a single array sorted by start.
+    """
+
+    # Subtrees with this many intervals or fewer are stored flat and scanned with one vector operation.
+    LEAF_SIZE = 64
+
+    def __init__(self, lo: np.ndarray, hi: np.ndarray):
+        """
+        Args:
+            lo: The start of each interval.
+            hi: The end of each interval. Must be >= lo row by row.
+        """
+        self.lo = np.asarray(lo)
+        self.hi = np.asarray(hi)
+        self.by_start = np.argsort(self.lo, kind='stable')
+        self.sorted_starts = self.lo[self.by_start]
+        self.root = self._build(np.arange(len(self.lo)))
+
+    def __len__(self) -> int:
+        return len(self.lo)
+
+    def _build(self, rows: np.ndarray) -> Optional[_Node]:
+        if len(rows) == 0:
+            return None
+        lo = self.lo[rows]
+        hi = self.hi[rows]
+        if len(rows) <= self.LEAF_SIZE:
+            return _Node(center=None, rows=rows, lo=self.lo, hi=self.hi)
+
+        # Centering on the median endpoint leaves at most half of the intervals on either side.
+        center = np.partition(np.concatenate([lo, hi]), len(rows))[len(rows)]
+        left = hi < center
+        right = lo > center
+        node = _Node(center=center, rows=rows[~(left | right)], lo=self.lo, hi=self.hi)
+        node.left = self._build(rows[left])
+        node.right = self._build(rows[right])
+        return node
+
+    def stab(self, t: int) -> np.ndarray:
+        """
+        Returns:
+            The rows of every interval containing t, in no particular order.
+        """
+        found: List[np.ndarray] = []
+        node = self.root
+        while node is not None:
+            if node.center is None:
+                # Flat leaf: just test every interval in it.
+                found.append(node.by_start[(node.starts <= t) & (self.hi[node.by_start] >= t)])
+                break
+            if t < node.center:
+                # Every interval here ends after t; keep the ones that have started by t.
+                found.append(node.by_start[:np.searchsorted(node.starts, t, side='right')])
+                node = node.left
+            elif t > node.center:
+                # Every interval here starts before t; keep the ones that haven't ended yet.
+                found.append(node.by_end[np.searchsorted(node.ends, t, side='left'):])
+                node = node.right
+            else:
+                found.append(node.by_start)
+                break
+        return np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+
+    def overlapping(self, a: int, b: int) -> np.ndarray:
+        """
+        Returns:
+            The rows of every interval which overlaps [a, b], in no particular order.
+        """
+        containing = self.stab(a)
+        first = np.searchsorted(self.sorted_starts, a, side='right')
+        last = np.searchsorted(self.sorted_starts, b, side='right')
+        return np.concatenate([containing, self.by_start[first:last]])
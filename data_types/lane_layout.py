@@ -0,0 +1,113 @@
+import bisect
+from collections import namedtuple
+from typing import Dict, Iterable, List, Sequence, Tuple
+import numpy as np
+
+from algorithms.layout import assign_lanes
+
+# Where one record sits: its lane, and the ordinal extent it occupies there, label included.
+LaneEntry = namedtuple("LaneEntry", "lane left right")
+
+
+class LaneLayout:
+    """
+    The lanes records are stacked into, kept in ordinal days rather than pixels so the same layout serves every
+    frame of a pan or zoom. Each record occupies [start, end] plus the width of its label, converted to days at
+    the scale it was laid out for. That extent only shrinks as the view zooms in, so the layout stays free of
+    overlaps until the view zooms out past its scale; only then, or once zoomed in so far that the stacking is
+    needlessly loose, is everything laid out again. Otherwise records entering or leaving the view are inserted
+    into or removed from their lanes one by one, unless many of them are new.
+    """
+
+    # Lay everything out afresh once the view is this many times more zoomed in than the layout's scale.
+    RELAYOUT_ZOOM = 4
+
+    def __init__(self):
+        self.scale: float = 0.0  # Pixels per day the layout was made for. Zero when nothing is laid out.
+        self.entries: Dict[str, LaneEntry] = {}
+        self._lanes: List[List[Tuple[float, float]]] = []  # Each lane's (left, right) extents, sorted.
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @property
+    def lane_count(self) -> int:
+        """
+        The number of lanes up to and including the highest one in use.
+        """
+        for lane in range(len(self._lanes) - 1, -1, -1):
+            if self._lanes[lane]:
+                return lane + 1
+        return 0
+
+    def update(self, ids: Sequence[str], starts: np.ndarray, ends: np.ndarray, label_widths: np.ndarray,
+               scale: float) -> bool:
+        """
+        Bring the layout up to date with the records now in view.
+
+        Args:
+            ids: The id of each record in view.
+            starts: Each record's earliest start, in ordinal days. May be -inf.
+            ends: Each record's latest end, in ordinal days. May be inf.
+            label_widths: The width of each record's label, in pixels.
+            scale: The pixels per day the records will be drawn at.
+
+        Returns:
+            True if everything was laid out afresh, False if the existing lanes were updated in place.
+        """
+        lefts = np.asarray(starts, dtype=np.float64)
+        with np.errstate(invalid='ignore'):  # -inf + width is fine; only inf - inf is undefined, and never used.
+            rights = np.maximum(np.asarray(ends, dtype=np.float64), lefts + np.asarray(label_widths) / scale)
+
+        if not self.scale or scale < self.scale or scale > self.scale * self.RELAYOUT_ZOOM:
+            self._relayout(ids, lefts, rights, scale)
+            return True
+
+        added = [row for row, rec_id in enumerate(ids) if rec_id not in self.entries]
+        if len(added) > len(ids) // 4:
+            # Inserting one by one scans every lane, so a mostly new set of records is cheaper to lay out afresh.
+            self._relayout(ids, lefts, rights, scale)
+            return True
+
+        in_view = set(ids)
+        self.remove([rec_id for rec_id in self.entries if rec_id not in in_view])
+        for row in added:
+            self._insert(ids[row], float(lefts[row]), float(rights[row]))
+        return False
+
+    def remove(self, ids: Iterable[str]):
+        """
+        Take records out of their lanes, e.g. because they left the view or their bounds changed.
+        """
+        for rec_id in ids:
+            entry = self.entries.pop(rec_id, None)
+            if entry is not None:
+                lane = self._lanes[entry.lane]
+                del lane[bisect.bisect_left(lane, (entry.left, entry.right))]
+
+    def clear(self):
+        self.scale = 0.0
+        self.entries = {}
+        self._lanes = []
+
+    def _relayout(self, ids: Sequence[str], lefts: np.ndarray, rights: np.ndarray, scale: float):
+        lanes, lane_count = assign_lanes(lefts, rights)
+        self.scale = scale
+        self.entries = {rec_id: LaneEntry(lane, left, right)
+                        for rec_id, lane, left, right in zip(ids, lanes.tolist(), lefts.tolist(), rights.tolist())}
+        self._lanes = [[] for _ in range(lane_count)]
+        for entry in self.entries.values():
+            self._lanes[entry.lane].append((entry.left, entry.right))
+        for lane in self._lanes:
+            lane.sort()
+
+    def _insert(self, rec_id: str, left: float, right: float):
+        # First fit: the lowest lane with a gap wide enough between its neighbouring extents.
+        for index, lane in enumerate(self._lanes):
+            pos = bisect.bisect_left(lane, (left, right))
+            if (pos == 0 or lane[pos - 1][1] <= left) and (pos == len(lane) or right <= lane[pos][0]):
+                lane.insert(pos, (left, right))
+                self.entries[rec_id] = LaneEntry(index, left, right)
+                return
+        self._lanes.append([(left, right)])
+        self.entries[rec_id] = LaneEntry(len(self._lanes) - 1, left, right)
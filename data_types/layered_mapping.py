@@ -0,0 +1,73 @@
+from typing import Callable, Dict, Iterator, List, Mapping, TypeVar
+
+Layer = TypeVar('Layer')
+
+_MISSING = object()
+
+
+def append_layer(layers: List[Layer], layer: Layer, merge: Callable[[Layer, Layer], Layer]) -> List[Layer]:
+    """
+    Add a layer after the others, merging it into the layers before it for as long as they are no larger.
+    Appending n rows in batches this way keeps O(log n) layers, and copies each row O(log n) times in all,
+    where copying every layer into a single one would copy each row once per batch.
+
+    Args:
+        layers: The existing layers, oldest first. Not modified.
+        layer: The layer to add. Anything with a length.
+        merge: Combines an older layer with the newer one after it into a new layer, without modifying either.
+
+    Returns:
+        The new list of layers, oldest first.
+    """
+    layers = layers + [layer]
+    while len(layers) > 1 and len(layers[-2]) <= len(layers[-1]):
+        newer = layers.pop()
+        layers[-1] = merge(layers[-1], newer)
+    return layers
+
+
+def merge_dicts(older: Dict, newer: Dict) -> Dict:
+    merged = dict(older)
+    merged.update(newer)
+    return merged
+
+
+class LayeredMapping(Mapping):
+    """
+    A read-only mapping over a list of dicts with no keys in common, so adding a batch of keys only copies
+    the batch (and occasionally some of the smaller layers, see append_layer) instead of every key so far.
+    Unlike a ChainMap, its length is known without visiting the keys. Iterates in the order the keys were added.
+    """
+
+    def __init__(self, layers: List[Dict] = None):
+        """
+        Args:
+            layers: Dicts with no keys in common, oldest first. The mapping takes ownership of them.
+        """
+        self.layers: List[Dict] = layers if layers is not None else []
+        self._len = sum(len(layer) for layer in self.layers)
+
+    def appended(self, layer: Dict) -> 'LayeredMapping':
+        """
+        Returns:
+            A new LayeredMapping holding this one's keys followed by layer's, none of which may be in this one.
+        """
+        return LayeredMapping(append_layer(self.layers, layer, merge_dicts))
+
+    def __getitem__(self, key):
+        # The oldest layer is the largest, so most lookups end at the first one.
+        for layer in self.layers:
+            value = layer.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+        raise KeyError(key)
+
+    def __contains__(self, key) -> bool:
+        return any(key in layer for layer in self.layers)
+
+    def __iter__(self) -> Iterator:
+        for layer in self.layers:
+            yield from layer
+
+    def __len__(self) -> int:
+        return self._len
@@ -0,0 +1,225 @@
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple, Union
+import numpy as np
+
+from data_types import EventRecord, TimePoint
+from data_types.layered_mapping import LayeredMapping, append_layer
+
+# Infinite bounds are stored as the extremes of int64, so they still order correctly against real dates.
+NEG_INF = np.iinfo(np.int64).min
+POS_INF = np.iinfo(np.int64).max
+
+# Order of the bound columns, as used by bounds() and bound_of().
+BOUND_FIELDS = ('start_min', 'start_max', 'end_min', 'end_max')
+
+
+def encode_bound(bound: Union[TimePoint, float]) -> int:
+    """
+    Convert a resolved TimeReference boundary (a TimePoint or +/-math.inf) to its ordinal column value.
+    """
+    if type(bound) is TimePoint:
+        return bound.ordinal()
+    return NEG_INF if bound < 0 else POS_INF
+
+
+class _Block:
+    """
+    A run of consecutive rows of a ResolvedTimeline. Blocks are never modified once built, so a ResolvedTimeline
+    can share them with the one it was appended to.
+    """
+    __slots__ = ('first', 'ids', 'names', 'columns', 'row_of')
+
+    def __init__(self, first: int, ids: np.ndarray, names: np.ndarray, columns: Tuple[np.ndarray, ...],
+                 row_of: Dict[str, int]):
+        self.first = first  # Row number of the block's first row.
+        self.ids = ids
+        self.names = names
+        self.columns = columns  # The bound columns, in BOUND_FIELDS order.
+        self.row_of = row_of
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def merged(self, newer: '_Block') -> '_Block':
+        return _Block.concatenate([self, newer])
+
+    @staticmethod
+    def concatenate(blocks: List['_Block']) -> '_Block':
+        """
+        Returns:
+            A single block holding the rows of consecutive blocks.
+        """
+        row_of = {}
+        for block in blocks:
+            row_of.update(block.row_of)
+        return _Block(blocks[0].first,
+                      np.concatenate([block.ids for block in blocks]),
+                      np.concatenate([block.names for block in blocks]),
+                      tuple(np.concatenate(column) for column in zip(*(block.columns for block in blocks))),
+                      row_of)
+
+
+class ResolvedTimeline:
+    """
+    A column-oriented copy of a resolved Timeline: each record's four bounds as int64 ordinal days,
+    alongside its id and name. Row i of every column describes the same record, so range queries
+    and extents can be computed as vector operations instead of walking EventRecord objects.
+
+    Rows are kept in append-only blocks, so appending rows doesn't copy the existing ones. The full columns
+    are only concatenated when one of them is read, and are then kept.
+    """
+
+    def __init__(self,
+                 ids: List[str],
+                 names: List[str],
+                 start_min: np.ndarray,
+                 start_max: np.ndarray,
+                 end_min: np.ndarray,
+                 end_max: np.ndarray,
+                 row_of: Dict[str, int] = None):
+        row_of = row_of if row_of is not None else {rec_id: row for row, rec_id in enumerate(ids)}  # Map record ID to row
+        self._set_blocks([_Block(0, np.asarray(ids, dtype=object), np.asarray(names, dtype=object),
+                                 (start_min, start_max, end_min, end_max), row_of)])
+
+    def _set_blocks(self, blocks: List[_Block]):
+        self._blocks = blocks
+        self._len = sum(len(block) for block in blocks)
+        self.row_of: Mapping[str, int] = (blocks[0].row_of if len(blocks) == 1 else
+                                          LayeredMapping([block.row_of for block in blocks]))  # Map record ID to row
+        self._flat: Optional[_Block] = blocks[0] if len(blocks) == 1 else None
+
+    @staticmethod
+    def from_records(records: Iterable[EventRecord]) -> 'ResolvedTimeline':
+        """
+        Build the columns from resolved EventRecords, keeping their iteration order.
+        """
+        records = list(records)
+        columns = np.empty((4, len(records)), dtype=np.int64)
+        for row, rec in enumerate(records):
+            columns[0, row] = encode_bound(rec.start.min)
+            columns[1, row] = encode_bound(rec.start.max)
+            columns[2, row] = encode_bound(rec.end.min)
+            columns[3, row] = encode_bound(rec.end.max)
+        return ResolvedTimeline(ids=[rec.id for rec in records],
+                                names=[rec.name for rec in records],
+                                start_min=columns[0],
+                                start_max=columns[1],
+                                end_min=columns[2],
+                                end_max=columns[3])
+
+    def __len__(self) -> int:
+        return self._len
+
+    def append(self, other: 'ResolvedTimeline') -> 'ResolvedTimeline':
+        """
+        Returns:
+            A new ResolvedTimeline holding this one's rows followed by other's. Neither input is modified.
+                Only other's rows are copied, along with some of the most recently appended blocks.
+        """
+        offset = len(self)
+        theirs = other._flatten()
+        block = _Block(offset, theirs.ids, theirs.names, theirs.columns,
+                       {rec_id: offset + row for rec_id, row in theirs.row_of.items()})
+        resolved = ResolvedTimeline.__new__(ResolvedTimeline)
+        resolved._set_blocks(append_layer(self._blocks, block, _Block.merged))
+        return resolved
+
+    def _flatten(self) -> _Block:
+        flat = self._flat
+        if flat is None:
+            # Concatenated by whichever reader asks first, and kept in place of the blocks. Both describe the
+            # same rows, so doing it twice in a race, or reading the blocks while it happens, is harmless.
+            flat = _Block.concatenate(self._blocks)
+            self._set_blocks([flat])
+        return flat
+
+    @property
+    def ids(self) -> np.ndarray:
+        return self._flatten().ids
+
+    @property
+    def names(self) -> np.ndarray:
+        return self._flatten().names
+
+    @property
+    def start_min(self) -> np.ndarray:
+        return self._flatten().columns[0]
+
+    @property
+    def start_max(self) -> np.ndarray:
+        return self._flatten().columns[1]
+
+    @property
+    def end_min(self) -> np.ndarray:
+        return self._flatten().columns[2]
+
+    @property
+    def end_max(self) -> np.ndarray:
+        return self._flatten().columns[3]
+
+    def ids_at(self, rows: np.ndarray) -> np.ndarray:
+        """
+        Returns:
+            The ids of the given rows, without concatenating the id column.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        if self._flat is not None:
+            return self._flat.ids[rows]
+        ids = np.empty(len(rows), dtype=object)
+        for block in self._blocks:
+            inside = (rows >= block.first) & (rows < block.first + len(block))
+            ids[inside] = block.ids[rows[inside] - block.first]
+        return ids
+
+    def bounds(self) -> np.ndarray:
+        """
+        Returns:
+            An (n, 4) array of every record's bounds, in BOUND_FIELDS order.
+        """
+        return np.stack([self.start_min, self.start_max, self.end_min, self.end_max], axis=1)
+
+    def overlapping(self, lo: int, hi: int, first: int = 0) -> np.ndarray:
+        """
+        Find the records that could be at least partly within an ordinal range.
+
+        Args:
+            lo: Ordinal of the beginning of the range.
+            hi: Ordinal of the end of the range.
+            first: The first row to consider. Only the blocks holding the rows from here on are read.
+
+        Returns:
+            A boolean mask over the rows from `first` on; True where [start.min, end.max] overlaps [lo, hi].
+        """
+        blocks = [self._flat] if self._flat is not None else self._blocks
+        masks = [np.empty(0, dtype=bool)]
+        for block in blocks:
+            if block.first + len(block) > first:
+                skip = max(first - block.first, 0)
+                masks.append((block.columns[0][skip:] <= hi) & (block.columns[3][skip:] >= lo))
+        return np.concatenate(masks)
+
+    def extent(self) -> Tuple[Optional[Tuple[int, int]], Optional[Tuple[int, int]]]:
+        """
+        Locate the earliest and latest real (non-infinite) bounds across all records.
+
+        Returns:
+            A tuple of ((row, column), (row, column)) for the earliest and latest bounds, where the column
+                indexes BOUND_FIELDS. Either entry is None if no record has a real bound.
+        """
+        if len(self) == 0:
+            return None, None
+        bounds = self.bounds()
+        finite = (bounds != NEG_INF) & (bounds != POS_INF)
+        if not finite.any():
+            return None, None
+        earliest = np.unravel_index(np.argmin(np.where(finite, bounds, POS_INF)), bounds.shape)
+        latest = np.unravel_index(np.argmax(np.where(finite, bounds, NEG_INF)), bounds.shape)
+        return (int(earliest[0]), int(earliest[1])), (int(latest[0]), int(latest[1]))
+
+
+def bound_of(rec: EventRecord, column: int) -> Union[TimePoint, float]:
+    """
+    Fetch the bound of an EventRecord that corresponds to one of the ResolvedTimeline columns.
+    """
+    field = BOUND_FIELDS[column]
+    ref = rec.start if field.startswith('start') else rec.end
+    return ref.min if field.endswith('min') else ref.max
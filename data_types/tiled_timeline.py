@@ -0,0 +1,276 @@
+import os
+import json
+import math
+import threading
+from queue import Queue
+from collections import OrderedDict, namedtuple
+from typing import Dict, List, Optional, Union
+import numpy as np
+
+from data_types import EventRecord, TimePoint
+from data_types.resolved_timeline import ResolvedTimeline, NEG_INF, POS_INF
+from logs import get_logger
+
+MANIFEST_NAME = "manifest.json"
+
+# Version of the tile layout written by write_tiles. Directories written in any other layout are refused.
+TILE_FORMAT = 2
+
+# Resolved bounds of one end of a TileRecord: the earliest and latest it could be, TimePoints or +/-math.inf.
+TileBound = namedtuple("TileBound", "min max")
+
+# Default width of one era tile: a century, in days.
+DEFAULT_TILE_DAYS = 36524
+
+
+def write_tiles(records: List[EventRecord], directory: str, tile_days: int = DEFAULT_TILE_DAYS,
+                timeline_min: TimePoint = None, timeline_max: TimePoint = None, info: List[List[str]] = None):
+    """
+    Write resolved records to disk as era tiles, bucketed by the tile their start.min falls in.
+    Records with no lower bound on their start share one extra tile that is checked by every query.
+
+    Tiles hold only data, so they can be shared and browsed safely: each record's four bounds go in a NumPy
+    .npz file, as whole ordinal days plus any seconds into the day, and its id, name and info strings in JSON.
+
+    Args:
+        records: Resolved EventRecords.
+        directory: Where to write the tiles and their manifest. Created if needed.
+        tile_days: The width of each tile, in days.
+        timeline_min: The earliest real date in the timeline, saved for framing the view.
+        timeline_max: The latest real date in the timeline, saved for framing the view.
+        info: Each record's info strings, in the same order as `records`. Tiles are browsed without the source
+            files, so any info left in them must be read first, e.g. with algorithms.expand_info_many.
+            Defaults to the records' own info, which must then be plain strings.
+    """
+    info = info if info is not None else [rec.info for rec in records]
+    os.makedirs(directory, exist_ok=True)
+    resolved = ResolvedTimeline.from_records(records)
+    buckets: Dict[Optional[int], List[int]] = {}
+    for row, start_min in enumerate(resolved.start_min):
+        key = None if start_min == NEG_INF else int(start_min) // tile_days
+        buckets.setdefault(key, []).append(row)
+
+    tiles = []
+    for key, rows in sorted(buckets.items(), key=lambda item: -math.inf if item[0] is None else item[0]):
+        filename = "tile_open" if key is None else f"tile_{key}"
+        _write_tile(os.path.join(directory, filename), [records[row] for row in rows], [info[row] for row in rows])
+        tiles.append({'file': filename,
+                      'lo': int(resolved.start_min[rows].min()),
+                      'hi': int(resolved.end_max[rows].max()),
+                      'count': len(rows)})
+
+    manifest = {'format': TILE_FORMAT,
+                'tile_days': tile_days,
+                'min': [timeline_min.year, timeline_min.month, timeline_min.day] if timeline_min else None,
+                'max': [timeline_max.year, timeline_max.month, timeline_max.day] if timeline_max else None,
+                'tiles': tiles}
+    with open(os.path.join(directory, MANIFEST_NAME), 'w') as file:
+        json.dump(manifest, file)
+
+
+def _write_tile(path: str, records: List[EventRecord], info: List[List[str]]):
+    # Bounds are split into whole days and seconds into the day, so times of day survive exactly.
+    days = np.empty((len(records), 4), dtype=np.int64)
+    seconds = np.zeros((len(records), 4), dtype=np.float64)
+    for row, rec in enumerate(records):
+        for col, bound in enumerate((rec.start.min, rec.start.max, rec.end.min, rec.end.max)):
+            if type(bound) is TimePoint:
+                days[row, col] = TimePoint(bound.year, bound.month, bound.day).ordinal()
+                seconds[row, col] = bound.seconds
+            else:
+                days[row, col] = NEG_INF if bound < 0 else POS_INF
+    np.savez(path + ".npz", days=days, seconds=seconds)
+    with open(path + ".json", 'w') as file:
+        json.dump({'ids': [rec.id for rec in records],
+                   'names': [rec.name for rec in records],
+                   'info': info}, file)
+
+
+def _read_tile(path: str) -> List['TileRecord']:
+    with np.load(path + ".npz", allow_pickle=False) as columns:
+        days, seconds = columns['days'].tolist(), columns['seconds'].tolist()
+    with open(path + ".json") as file:
+        text = json.load(file)
+
+    def decode(day: int, second: float) -> Union[TimePoint, float]:
+        if day == NEG_INF or day == POS_INF:
+            return -math.inf if day == NEG_INF else math.inf
+        tp = TimePoint.from_ordinal(day)
+        return TimePoint(tp.year, tp.month, tp.day, second) if second else tp
+
+    records = []
+    for rec_id, name, info, row_days, row_seconds in zip(text['ids'], text['names'], text['info'], days, seconds):
+        start_min, start_max, end_min, end_max = (decode(day, second) for day, second in zip(row_days, row_seconds))
+        records.append(TileRecord(rec_id, name, TileBound(start_min, start_max), TileBound(end_min, end_max), info))
+    return records
+
+
+class TileRecord:
+    """
+    One record read back from a tile, shaped like a resolved EventRecord so a Timeview can draw it.
+    """
+    __slots__ = ('id', 'name', 'start', 'end', 'info')
+
+    def __init__(self, rec_id: str, name: str, start: TileBound, end: TileBound, info: List[str]):
+        self.id = rec_id
+        self.name = name
+        self.start = start
+        self.end = end
+        self.info = info
+
+    def __repr__(self) -> str:
+        return f"TileRecord(id={self.id!r}, name={self.name!r})"
+
+
+class _Tile:
+    """
+    One loaded tile: its records plus their bound columns for filtering.
+    """
+    def __init__(self, records: List[TileRecord]):
+        self.records = records
+        self.resolved = ResolvedTimeline.from_records(records)
+
+
+class TileCache:
+    """
+    Holds up to `capacity` loaded tiles, evicting the least recently used. Tiles can be prefetched
+    on a background thread so they are already resident when a query reaches them.
+    """
+
+    def __init__(self, directory: str, capacity: int = 64):
+        self.directory = directory
+        self.capacity = capacity
+        self._tiles: 'OrderedDict[str, _Tile]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._prefetch_queue: Queue = Queue()
+        self._prefetcher = threading.Thread(target=self._prefetch_loop, daemon=True)
+        self._prefetcher.start()
+
+    def get(self, filename: str) -> _Tile:
+        """
+        Fetch a tile, loading it from disk if it isn't resident.
+        """
+        with self._lock:
+            tile = self._tiles.get(filename)
+            if tile is not None:
+                self._tiles.move_to_end(filename)
+                return tile
+        tile = self._load(filename)
+        self._insert(filename, tile)
+        return tile
+
+    def prefetch(self, filenames: List[str]):
+        """
+        Queue tiles to be loaded in the background, if they aren't already resident.
+        """
+        for filename in filenames:
+            self._prefetch_queue.put(filename)
+
+    def close(self):
+        self._prefetch_queue.put(None)
+
+    def __contains__(self, filename: str) -> bool:
+        with self._lock:
+            return filename in self._tiles
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._tiles)
+
+    def _load(self, filename: str) -> _Tile:
+        return _Tile(_read_tile(os.path.join(self.directory, filename)))
+
+    def _insert(self, filename: str, tile: _Tile):
+        with self._lock:
+            self._tiles[filename] = tile
+            self._tiles.move_to_end(filename)
+            while len(self._tiles) > self.capacity:
+                self._tiles.popitem(last=False)
+
+    def _prefetch_loop(self):
+        while True:
+            filename = self._prefetch_queue.get()
+            if filename is None:
+                return
+            if filename in self:
+                continue
+            try:
+                self._insert(filename, self._load(filename))
+            except OSError as err:
+                get_logger().warning(f"Failed to prefetch tile {filename}: {err}")
+
+
+class TiledTimeline:
+    """
+    A read-only timeline whose records stay on disk in era tiles (see write_tiles), and are paged
+    in through a TileCache as queries reach them. Provides the parts of the Timeline interface
+    that a Timeview needs.
+    """
+
+    def __init__(self, directory: str, cache_tiles: int = 64):
+        """
+        Args:
+            directory: A directory written by write_tiles.
+            cache_tiles: The most tiles to keep loaded at once.
+
+        Raises:
+            ValueError if the directory's tiles were written in another format.
+        """
+        with open(os.path.join(directory, MANIFEST_NAME)) as file:
+            manifest = json.load(file)
+        if manifest.get('format') != TILE_FORMAT:
+            raise ValueError(f"Tiles in {directory} were written in an older format; "
+                             "write them again with --save-tiles.")
+        self.tile_days: int = manifest['tile_days']
+        self.min = TimePoint(*manifest['min']) if manifest['min'] else -math.inf
+        self.max = TimePoint(*manifest['max']) if manifest['max'] else math.inf
+        self.tile_files: List[str] = [tile['file'] for tile in manifest['tiles']]
+        self.tile_lo = np.array([tile['lo'] for tile in manifest['tiles']], dtype=np.int64)
+        self.tile_hi = np.array([tile['hi'] for tile in manifest['tiles']], dtype=np.int64)
+        self.cache = TileCache(directory, capacity=cache_tiles)
+        self._last_center: Optional[float] = None
+
+    def query_range(self, lo: Union[int, TimePoint], hi: Union[int, TimePoint]) -> List[TileRecord]:
+        """
+        Find every record that could be at least partly within a range of time, loading tiles as needed.
+        Tiles just beyond the range, in the direction the queries are moving, are prefetched.
+
+        Args:
+            lo: The beginning of the range, as a TimePoint or ordinal day.
+            hi: The end of the range, as a TimePoint or ordinal day.
+
+        Returns:
+            The records whose [start.min, end.max] overlaps [lo, hi].
+        """
+        lo = lo.ordinal() if type(lo) is TimePoint else lo
+        hi = hi.ordinal() if type(hi) is TimePoint else hi
+
+        found = []
+        for tile_idx in np.nonzero((self.tile_lo <= hi) & (self.tile_hi >= lo))[0]:
+            tile = self.cache.get(self.tile_files[tile_idx])
+            for row in np.nonzero(tile.resolved.overlapping(lo, hi))[0]:
+                found.append(tile.records[row])
+
+        self._prefetch_ahead(lo, hi)
+        return found
+
+    def summary(self) -> None:
+        """
+        Tiles are only read as queries reach them, so there is no density summary of the whole timeline.
+        """
+        return None
+
+    def _prefetch_ahead(self, lo: int, hi: int):
+        center = (lo + hi) / 2
+        if self._last_center is not None and center != self._last_center:
+            # Prefetch one view-width further along in the direction of travel.
+            width = hi - lo
+            if center > self._last_center:
+                ahead = (self.tile_lo <= hi + width) & (self.tile_lo > hi)
+            else:
+                ahead = (self.tile_lo < lo) & (self.tile_lo >= lo - width) & (self.tile_lo != NEG_INF)
+            self.cache.prefetch([self.tile_files[idx] for idx in np.nonzero(ahead)[0]])
+        self._last_center = center
+
+    def close(self):
+        self.cache.close()
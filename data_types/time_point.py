@@ -1,5 +1,5 @@
 
-from typing import Union
+from typing import Tuple, Union
 from time import struct_time
 from datetime import date, timedelta
 from data_types import TimeSpan
@@ -7,6 +7,8 @@ import calendar
 import math
 
 UNUSED_STRUCT_FIELDS = (0, 0, 0, 0, 0, -1)  # hour, min, sec, wday, yday, isdst
+SECONDS_PER_DAY = 86400
+MAX_DATE_ORDINAL = date.max.toordinal()
 
 
 def construct_time(year, month, day) -> struct_time:
@@ -60,28 +62,58 @@ def construct_time(year, month, day) -> struct_time:
 class TimePoint:
     """
     Sure datetime already exists, but it only goes back to year 1. TimePoint is a wrapper around a
-    struct_time object to provide an easy interface while supporting a wide date range.
+    (year, month, day) tuple to provide an easy interface while supporting a wide date range.
+    A TimePoint may also carry a time of day, as seconds since midnight, for data recorded more finely than days;
+    it is then stored as a (year, month, day, seconds) tuple, which orders after the bare date.
     """
-    def __init__(self, year: int = 0, month: int = 0, day: int = 0):
-        self._time: struct_time = construct_time(year, month, day)
-        self.DAY_ZERO = None  # Initialized at the bottom of this file.
+    __slots__ = ('_time',)
+    DAY_ZERO: 'TimePoint' = None  # Initialized at the bottom of this file.
+
+    def __init__(self, year: int = 0, month: int = 0, day: int = 0, seconds: float = 0):
+        if seconds:
+            # Carry whole days out of the time of day, so the seconds are always in [0, SECONDS_PER_DAY).
+            days, seconds = divmod(seconds, SECONDS_PER_DAY)
+            day += int(days)
+        # Only keep the date fields of the reconciled struct_time; a plain tuple is far smaller.
+        time = construct_time(year, month, day)[:3]
+        self._time: Tuple = time + (seconds,) if seconds else time
 
     def __repr__(self) -> str:
+        if len(self._time) > 3:
+            return f"TimePoint(year={self.year}, month={self.month}, day={self.day}, seconds={self.seconds})"
         return f"TimePoint(year={self.year}, month={self.month}, day={self.day})"
 
     @staticmethod
-    def from_ordinal(ordinal: int) -> 'TimePoint':
-        td = timedelta(days=ordinal)
-        tp = TimePoint.DAY_ZERO + td
-        return tp
-
-    def ordinal(self) -> int:
+    def from_ordinal(ordinal: Union[int, float]) -> 'TimePoint':
+        day = math.floor(ordinal)
+        if ordinal == day:
+            td = timedelta(days=ordinal)
+            tp = TimePoint.DAY_ZERO + td
+            return tp
+
+        # A fractional ordinal only has about ten microseconds of precision at modern dates,
+        # so the time of day is kept to the millisecond.
+        seconds = round((ordinal - day) * SECONDS_PER_DAY, 3)
+        if 1 <= day <= MAX_DATE_ORDINAL:
+            d = date.fromordinal(day)
+            return TimePoint(year=d.year, month=d.month, day=d.day, seconds=seconds)
+        tp = TimePoint.DAY_ZERO + timedelta(days=day)
+        return TimePoint(year=tp.year, month=tp.month, day=tp.day, seconds=seconds)
+
+    def ordinal(self) -> Union[int, float]:
         """
-        Represent this point in time as an integer for direct comparisons.
+        Represent this point in time as a number for direct comparisons.
         the calendar module sets 1 BC as year zero, so we will follow their lead and say that
         Dec 31 of year 0 is day zero (so Jan 1 of 1 AD is day 1).
-        Returns: The number of days from Dec 31 of 1 BC.
+        Returns: The number of days from Dec 31 of 1 BC; a float with the time of day as a fraction, if there is one.
         """
+        if len(self._time) > 3:
+            if 1 <= self._time[0] <= 9999:
+                return date(*self._time[:3]).toordinal() + self._time[3] / SECONDS_PER_DAY
+            delta: timedelta = self - TimePoint.DAY_ZERO
+            return delta / timedelta(days=1)
+        if 1 <= self._time[0] <= 9999:
+            return date(*self._time).toordinal()  # Same day zero as ours, and far cheaper than subtracting.
         delta: timedelta = self - TimePoint.DAY_ZERO
         return delta.days
 
@@ -96,17 +128,21 @@ class TimePoint:
         raise AttributeError('Cannot modify TimePoint fields after construction.')
 
     def get_year(self):
-        return self._time.tm_year
+        return self._time[0]
 
     def get_month(self):
-        return self._time.tm_mon
+        return self._time[1]
 
     def get_day(self):
-        return self._time.tm_mday
+        return self._time[2]
+
+    def get_seconds(self):
+        return self._time[3] if len(self._time) > 3 else 0
 
     year = property(get_year, set_error, del_error)
     month = property(get_month, set_error, del_error)
     day = property(get_day, set_error, del_error)
+    seconds = property(get_seconds, set_error, del_error)
 
     # ------------------------------------------------------------
     # Operator overrides
@@ -127,10 +163,11 @@ class TimePoint:
 
         # Handle the case delta is an EventDuration.
         if isinstance(delta, TimeSpan):
-            return TimePoint(year=year+delta.years, month=month+delta.months, day=day+delta.days)
+            return TimePoint(year=year+delta.years, month=month+delta.months, day=day+delta.days, seconds=self.seconds)
         elif isinstance(delta, timedelta):
-            # timedelta is specified only in days.
-            return TimePoint(year=year, month=month, day=day+delta.days)
+            # Any part of a day is added to the time of day, carrying into the date.
+            seconds = self.seconds + delta.seconds + delta.microseconds / 1e6
+            return TimePoint(year=year, month=month, day=day+delta.days, seconds=seconds)
         else:
             raise ValueError(f"Cannot add a {type(delta)} to a TimePoint!")
 
@@ -150,10 +187,21 @@ class TimePoint:
         """
         # If we are subtracting a timedelta instead of a TimePoint, just invert and pass it to __add__
         if isinstance(other, timedelta):
-            return self + timedelta(days=-other.days)
+            return self + -other
         if isinstance(other, TimeSpan):
-            return TimePoint(year=self.year-other.years, month=self.month-other.months, day=self.day-other.days)
+            return TimePoint(year=self.year-other.years, month=self.month-other.months, day=self.day-other.days,
+                             seconds=self.seconds)
+
+        difference = self._date_difference(other)
+        if len(self._time) > 3 or len(other._time) > 3:
+            difference += timedelta(seconds=self.seconds - other.seconds)
+        return difference
 
+    def _date_difference(self, other: 'TimePoint') -> timedelta:
+        """
+        Returns:
+            The number of days between the dates of self and other, ignoring any time of day.
+        """
         # If both dates are in the same month, treat this as a special case.
         if self.year == other.year and self.month == other.month:
             return timedelta(days=self.day - other.day)
@@ -31,10 +31,18 @@ def is_event_ref(tokens: List[str]) -> bool:
     return is_offset(tokens) or len(tokens) == 1 and not is_year(tokens[0])
 
 
+def parse_date(text: str) -> Tuple[TimePoint, TimePoint]:
+    """
+    Parse a date string formatted as '[day] [mon] year' into the earliest and latest days it could refer to.
+    """
+    return TimeReference._parse_input(text.split())
+
+
 class TimeReference:
     """
     Represents a point in time that may have some uncertainty.
     """
+    __slots__ = ('min', 'max', '_older_refs', '_later_refs')
 
     def __init__(self, absolutes: List[str] = None, older: List[str] = None, later: List[str] = None):
         """
@@ -178,6 +186,13 @@ class TimeReference:
         date_max = TimePoint(year=year_max, month=month_max, day=day_max)
         return date_min, date_max
 
+    def release(self):
+        """
+        Forget the constraints used to resolve min and max, once they have been resolved.
+        """
+        self._older_refs = ()
+        self._later_refs = ()
+
     def has_min(self) -> bool:
         return type(self.min) is TimePoint
 
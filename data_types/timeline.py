@@ -1,26 +1,83 @@
-from typing import Dict, List, Union
-import yaml
-import math
+from typing import Callable, Dict, List, Mapping, Set, Tuple, Union
+import threading
 
-from data_types import EventRecord, TimePoint, IncoherentTimelineError, EventData
+from data_types import EventRecord, TimePoint, IncoherentTimelineError, EventData, StaleSourceError
+from data_types.resolved_timeline import ResolvedTimeline
+from data_types.timeline_snapshot import TimelineSnapshot
+from data_types.timeline_summary import TimelineSummary
+from data_types.tiled_timeline import write_tiles, DEFAULT_TILE_DAYS
 from logs import get_logger
 import algorithms
 
 
 class Timeline:
-    def __init__(self):
-        self.records = {}  # Map record ID to record
-        self.min = -math.inf
-        self.max = math.inf
+    """
+    The resolved records of one or more timeline files. Each update publishes a new immutable TimelineSnapshot,
+    so other threads can keep reading the snapshot they hold (or the current one) while a writer prepares the next.
+    Updates themselves are serialized.
+    """
 
-    def load_records(self, inputs: Union[str, List[str]]):
+    def __init__(self, compact: bool = False, reloadable: bool = False):
+        """
+        Args:
+            compact: If True, records drop their parsed input and constraint lists once resolved, to save memory.
+            reloadable: If True, remember enough about each record's constraints for reload to re-resolve
+                only the records that changed.
+        """
+        self.compact = compact
+        self.reloadable = reloadable
+        self.sources: List[str] = []  # Every file read by load_records, including included files.
+        self._inputs: List[str] = []
+        self._window: Tuple[TimePoint, TimePoint] = None
+        self._constraint_keys: Dict[str, Tuple] = None  # Map record ID to algorithms.constraint_key, if reloadable.
+        self._ingest_suffixes: Dict[str, int] = {}  # Next suffix for IDs generated for ingested records.
+        self._generated_ids: Dict[Tuple, List[str]] = {}  # IDs generated for records in the files, kept on reload.
+        self._snapshot = TimelineSnapshot({})
+        self._write_lock = threading.RLock()
+
+    @property
+    def records(self) -> Mapping[str, EventRecord]:
+        """
+        The current snapshot's records, mapped by ID. Read-only.
+        """
+        return self._snapshot.records
+
+    @property
+    def min(self) -> Union[TimePoint, float]:
+        return self._snapshot.min
+
+    @property
+    def max(self) -> Union[TimePoint, float]:
+        return self._snapshot.max
+
+    def snapshot(self) -> TimelineSnapshot:
+        """
+        Returns:
+            The current state of the timeline. It never changes, so it can be used from any thread
+                for as long as needed; later updates publish a new snapshot instead.
+        """
+        return self._snapshot
+
+    def load_records(self,
+                     inputs: Union[str, List[str]],
+                     window: Tuple[TimePoint, TimePoint] = None,
+                     progress: Callable[[str, int, int], None] = None):
         """
         Load record entries from one or more files to initialize this timeline.
         If multiple files contain records with the same explicitly-set id, they
         will be treated as the same event.
+        Files may be plain YAML, compressed YAML (.gz, .xz, .bz2), or zip/tar bundles of YAML files.
 
         Args:
             inputs: Either a filename or a list of filenames containing event records.
+            window: An optional (min, max) date range. Records whose absolute dates put them
+                entirely outside it are dropped before their bounds are resolved.
+            progress: If given, called as (stage, done, total) while loading, where stage is 'reading' (files)
+                or 'resolving' (records). Snapshots of the records resolved so far are also published while
+                resolving, so another thread can show them before loading finishes.
+
+        Raises:
+            IncoherentTimelineError if no dates can be resolved, or if no records fall within the window.
         """
         # Wrap in a list if needed to simplify the following logic.
         if type(inputs) is str:
@@ -28,44 +85,212 @@ class Timeline:
 
         # Load all records from all provided files into one record list.
         # Any duplicates will be reconciled in a later step.
-        dict_list = []
-        for filename in inputs:
-            with open(filename) as file:
-                loaded = yaml.load(file, Loader=yaml.BaseLoader)
-                dict_list.extend(loaded['Records'])
-
-        event_datas: List[EventData] = [EventData.parse(rr) for rr in dict_list]
-        self.init_from_event_data(event_datas)
-
-    def init_from_event_data(self, event_datas: List[EventData], *, recursing=False):
-
-        # Generate EventRecords with consistent boundaries based on the data we read in.
-        self.records: Dict[str, EventRecord] = algorithms.build_record_list(event_datas)
-
-        # Determine the entire relevant time span, from the earliest start.min to the latest end.max.
-        for rec in self.records.values():
-
-            # Just pull all bounds into a list. We could look at only start.min and end.max, but we
-            # want to catch the case where e.g. the earliest possible known date is an end boundary.
-            bounds = [rec.start.min, rec.start.max, rec.end.min, rec.end.max]
-
-            # We only want to track real dates - so ignore non-dates (infinities) in the normalized records.
-            bounds = [b for b in bounds if type(b) is TimePoint]
-
-            for bound in bounds:
-                if self.min == -math.inf or bound < self.min:
-                    self.min = bound
-                if self.max == math.inf or bound > self.max:
-                    self.max = bound
-
-        if not recursing and type(self.min) is not TimePoint:
-            # If we weren't able to anchor anything so far, then nail down the first event to start at 0 and retry.
-            logger = get_logger()
-            logger.warn(f"Unable to resolve any well-defined dates on first pass. Fixing '{event_datas[0].name}' to start at 1 Jan 0")
-            event_datas[0].start.append('1 Jan 0')
-            self.init_from_event_data(event_datas, recursing=True)
-        if type(self.min) is not TimePoint:
-            raise IncoherentTimelineError("[timeline.load] Failed to find any well-defined dates")
-
-    def get_records(self) -> Dict[str, EventRecord]:
+        with self._write_lock:
+            sources = []
+            read_progress = (lambda done, total: progress('reading', done, total)) if progress else None
+            # Only a reloadable timeline expects to read the files again soon enough to be worth keeping them parsed.
+            dict_list = algorithms.load_record_dicts(inputs, sources=sources, progress=read_progress,
+                                                     keep_documents=self.reloadable)
+
+            event_datas: List[EventData] = [EventData.parse(rr) for rr in dict_list]
+            self.init_from_event_data(event_datas, window=window, progress=progress)
+            self._inputs = list(inputs)
+            self._window = window
+            self.sources = sources
+            if self.reloadable:
+                # Preprocessing merged each id's fragments into the last of them, so the last EventData
+                # seen with an id holds that record's full constraints.
+                self._constraint_keys = {data.id: algorithms.constraint_key(data) for data in event_datas}
+
+    def reload(self) -> Set[str]:
+        """
+        Re-read the files given to load_records after some of them changed. For a reloadable timeline, files whose
+        contents are unchanged are not parsed again, and only records whose constraints changed, and the
+        records depending on them, are resolved again; otherwise the whole timeline is rebuilt.
+        If the files can't be read or resolved an exception is raised, and a reloadable timeline keeps its previous snapshot.
+
+        Returns:
+            The IDs of every record that was added, removed, or had its constraints changed.
+        """
+        with self._write_lock:
+            sources = []
+            dict_list = algorithms.load_record_dicts(self._inputs, sources=sources, keep_documents=self.reloadable)
+            algorithms.clear_info_cache()  # Info offsets from the old version of a file are no longer valid.
+
+            event_datas: List[EventData] = [EventData.parse(rr) for rr in dict_list]
+            if self._constraint_keys is None or self._window is not None:
+                # Without the previous constraints (or with a window, where any edit can change what's pruned)
+                # there's nothing to compare against, so rebuild everything.
+                old_ids = set(self.records)
+                self.init_from_event_data(event_datas, window=self._window)
+                self.sources = sources
+                return old_ids | set(self.records)
+
+            pre_datas = algorithms.preprocess_event_data(event_datas, generated_ids=self._generated_ids)
+            keys = {rec_id: algorithms.constraint_key(data) for rec_id, data in pre_datas.items()}
+            changed = {rec_id for rec_id, key in keys.items() if self._constraint_keys.get(rec_id) != key}
+            changed |= self._constraint_keys.keys() - keys.keys()
+
+            # Unchanged records are shared with the current snapshot rather than copied.
+            records, rebuilt = algorithms.update_records(self.records, pre_datas, changed, release=self.compact)
+            get_logger().info(f"Reloaded timeline: {len(changed)} records changed, {len(rebuilt)} re-resolved.")
+            snapshot = self._next_snapshot(records)
+            if type(snapshot.min) is not TimePoint:
+                raise IncoherentTimelineError("[timeline.reload] Failed to find any well-defined dates")
+            self._snapshot = snapshot
+            self._constraint_keys = keys
+            self.sources = sources
+            return changed
+
+    def ingest(self, record_dicts: List[Dict]) -> List[str]:
+        """
+        Add a batch of records to the timeline, e.g. as they arrive from a stream, resolving only the new ones.
+        Records may refer to each other and to records already in the timeline. A record whose explicit id
+        is already in the timeline is skipped, since existing records are never changed by ingestion.
+        Ingested records aren't part of the timeline's files, so a reload drops them.
+
+        Args:
+            record_dicts: Record dictionaries with the same fields as a record in a timeline file.
+
+        Returns:
+            The IDs of the records that were added.
+
+        Raises:
+            UnknownEventRecordError or InconsistentTimeReferenceError if the batch can't be resolved,
+                in which case none of it is added.
+        """
+        with self._write_lock:
+            snapshot = self._snapshot
+            event_datas: List[EventData] = [EventData.parse(rr) for rr in record_dicts]
+            pre_datas = algorithms.preprocess_event_data(event_datas, existing_ids=snapshot.records,
+                                                         next_suffix=self._ingest_suffixes)
+            duplicates = [rec_id for rec_id in pre_datas if rec_id in snapshot.records]
+            if duplicates:
+                get_logger().warning(f"Skipping {len(duplicates)} ingested records whose ids already exist: {duplicates[:10]}")
+                for rec_id in duplicates:
+                    del pre_datas[rec_id]
+
+            new_records = algorithms.add_records(snapshot.records, pre_datas, release=self.compact)
+            self._snapshot = snapshot.appended(new_records, version=snapshot.version + 1)
+            return list(new_records)
+
+    def init_from_event_data(self, event_datas: List[EventData], *, window: Tuple[TimePoint, TimePoint] = None,
+                             progress: Callable[[str, int, int], None] = None, recursing=False):
+
+        with self._write_lock:
+            on_resolved = None
+            if progress:
+                partial = TimelineSnapshot({})
+                pending: Dict[str, EventRecord] = {}
+
+                def on_resolved(batch: Dict[str, EventRecord], done: int, total: int):
+                    # Publish resolved records early; the full snapshot replaces these at the end. Waiting for
+                    # a quarter as many new records as are already shown keeps the total copying linear.
+                    nonlocal partial
+                    pending.update(batch)
+                    if len(pending) >= len(partial) // 4:
+                        partial = partial.appended(dict(pending), version=self._snapshot.version + 1)
+                        self._snapshot = partial
+                        pending.clear()
+                    progress('resolving', done, total)
+
+            # Generate EventRecords with consistent boundaries based on the data we read in.
+            records = algorithms.build_record_list(event_datas, window=window, release=self.compact,
+                                                   on_resolved=on_resolved, generated_ids=self._generated_ids)
+            if not records and window is not None:
+                # Anchoring a record below wouldn't help; every record was pruned, not left unresolved.
+                raise IncoherentTimelineError(f"[timeline.load] No records fall within the window {window[0]} to {window[1]}")
+            snapshot = self._next_snapshot(records)
+
+            if type(snapshot.min) is TimePoint:
+                self._snapshot = snapshot
+            elif not recursing:
+                # If we weren't able to anchor anything so far, then nail down the first event to start at 0 and retry.
+                logger = get_logger()
+                logger.warn(f"Unable to resolve any well-defined dates on first pass. Fixing '{event_datas[0].name}' to start at 1 Jan 0")
+                event_datas[0].start.append('1 Jan 0')
+                self.init_from_event_data(event_datas, window=window, progress=progress, recursing=True)
+            else:
+                raise IncoherentTimelineError("[timeline.load] Failed to find any well-defined dates")
+
+    def _next_snapshot(self, records: Dict[str, EventRecord]) -> TimelineSnapshot:
+        snapshot = TimelineSnapshot(records, version=self._snapshot.version + 1)
+        snapshot.summary()  # Built before publishing, so the first reader doesn't stall on it.
+        return snapshot
+
+    def get_records(self) -> Mapping[str, EventRecord]:
         return self.records
+
+    def save_tiles(self, directory: str, tile_days: int = DEFAULT_TILE_DAYS):
+        """
+        Write this timeline's resolved records to disk as era tiles, to be browsed later through a TiledTimeline.
+        Info left in the files is read in one pass through each file. If a file changed since it was loaded,
+        the timeline is reloaded first, so the tiles match the files as they are now.
+
+        Args:
+            directory: Where to write the tiles.
+            tile_days: The width of each tile, in days.
+
+        Raises:
+            StaleSourceError if the files keep changing while they are read.
+        """
+        with self._write_lock:
+            try:
+                info = algorithms.expand_info_many([rec.info for rec in self._snapshot.records.values()])
+            except StaleSourceError as err:
+                # A file was edited since it was loaded, so its info can't be read; load the files again first.
+                get_logger().info(f"Reloading before writing tiles: {err}")
+                self.reload()
+                info = algorithms.expand_info_many([rec.info for rec in self._snapshot.records.values()])
+            snapshot = self._snapshot
+        records = list(snapshot.records.values())
+        write_tiles(records, directory, tile_days=tile_days, timeline_min=snapshot.min, timeline_max=snapshot.max,
+                    info=info)
+
+    def get_info(self, rec_id: str) -> List[str]:
+        """
+        Read a record's info strings. Info from files is only read from disk when asked for.
+        """
+        return algorithms.expand_info(self.records[rec_id].info)
+
+    def resolved(self) -> ResolvedTimeline:
+        """
+        Returns:
+            A column-oriented view of the current snapshot's records, in the same order as self.records.
+        """
+        return self._snapshot.resolved
+
+    def summary(self) -> TimelineSummary:
+        """
+        Returns:
+            A density summary of the current snapshot's records, for drawing them zoomed out.
+        """
+        return self._snapshot.summary()
+
+    def query_range(self, lo: Union[int, TimePoint], hi: Union[int, TimePoint]) -> List[EventRecord]:
+        """
+        Find every record that could be at least partly within a range of time, in the current snapshot.
+
+        Args:
+            lo: The beginning of the range, as a TimePoint or ordinal day.
+            hi: The end of the range, as a TimePoint or ordinal day.
+
+        Returns:
+            The records whose [start.min, end.max] overlaps [lo, hi], in timeline order.
+        """
+        lo = lo.ordinal() if type(lo) is TimePoint else lo
+        hi = hi.ordinal() if type(hi) is TimePoint else hi
+        return self._snapshot.query_range(lo, hi)
+
+    def query_point(self, t: Union[int, TimePoint]) -> List[EventRecord]:
+        """
+        Find every record that could have been happening at a point in time, in the current snapshot.
+
+        Args:
+            t: The point in time, as a TimePoint or ordinal day.
+
+        Returns:
+            The records whose [start.min, end.max] contains t, in timeline order.
+        """
+        t = t.ordinal() if type(t) is TimePoint else t
+        return self._snapshot.query_point(t)
@@ -0,0 +1,162 @@
+import math
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple, Union
+import numpy as np
+
+from data_types import EventRecord, TimePoint
+from data_types.resolved_timeline import ResolvedTimeline, bound_of, NEG_INF, POS_INF
+from data_types.layered_mapping import LayeredMapping
+from data_types.interval_index import IntervalIndex
+from data_types.timeline_summary import TimelineSummary
+
+
+def _earlier(a: Union[TimePoint, float], b: Union[TimePoint, float]) -> Union[TimePoint, float]:
+    if type(a) is not TimePoint:
+        return b
+    if type(b) is not TimePoint:
+        return a
+    return min(a, b)
+
+
+def _later(a: Union[TimePoint, float], b: Union[TimePoint, float]) -> Union[TimePoint, float]:
+    if type(a) is not TimePoint:
+        return b
+    if type(b) is not TimePoint:
+        return a
+    return max(a, b)
+
+
+def _with_infinities(column: np.ndarray) -> np.ndarray:
+    # Ordinal columns store infinite bounds as the extremes of int64; turn them back into real infinities.
+    values = column.astype(np.float64)
+    values[column == NEG_INF] = -math.inf
+    values[column == POS_INF] = math.inf
+    return values
+
+
+class TimelineSnapshot:
+    """
+    One immutable, versioned state of a resolved Timeline. A Timeline publishes a new snapshot for every update
+    instead of changing the current one, so a reader holding a snapshot always sees a consistent set of records,
+    bounds and indexes without locking. Consecutive snapshots share every EventRecord that didn't change.
+    Records must not be modified once they are part of a snapshot.
+    """
+
+    # An appended snapshot scans its unindexed rows directly until there are more than this many of them,
+    # or more than a quarter of the indexed rows, at which point the index is rebuilt over everything.
+    MAX_UNINDEXED_ROWS = 4096
+
+    def __init__(self,
+                 records: Union[Dict[str, EventRecord], LayeredMapping],
+                 version: int = 0,
+                 resolved: ResolvedTimeline = None,
+                 indexed: Tuple[Optional[IntervalIndex], int] = (None, 0),
+                 extent: Tuple[Union[TimePoint, float], Union[TimePoint, float]] = None,
+                 summary: TimelineSummary = None):
+        """
+        Args:
+            records: The resolved records, mapped by id. The snapshot takes ownership of them.
+            version: Increases by one with each snapshot a Timeline publishes.
+            resolved: The records' columns, if already known. Built from `records` otherwise.
+            indexed: An interval index over the first rows of `resolved`, and how many rows it covers.
+            extent: The (min, max) real dates of the records, if already known.
+            summary: A density summary of the records, if already known.
+        """
+        self.version = version
+        self._layers = records if isinstance(records, LayeredMapping) else LayeredMapping([records])
+        # A single dict is read through a proxy, which is faster than going through the layers.
+        self.records: Mapping[str, EventRecord] = (MappingProxyType(self._layers.layers[0])
+                                                   if len(self._layers.layers) == 1 else self._layers)
+        self.resolved = resolved if resolved is not None else ResolvedTimeline.from_records(records.values())
+        # Replaced as a single tuple, so a reader never pairs an index with the wrong row count.
+        self._indexed: Tuple[Optional[IntervalIndex], int] = indexed
+        self._summary: Optional[TimelineSummary] = summary
+
+        # Determine the entire relevant time span, from the earliest real bound to the latest one.
+        # All four bounds are considered, to catch the case where e.g. the earliest known date is an end boundary.
+        if extent is None:
+            extent = self._find_extent(records, self.resolved)
+        self.min: Union[TimePoint, float] = extent[0]
+        self.max: Union[TimePoint, float] = extent[1]
+
+    @staticmethod
+    def _find_extent(records: Mapping[str, EventRecord], resolved: ResolvedTimeline) -> Tuple[Union[TimePoint, float], Union[TimePoint, float]]:
+        earliest, latest = resolved.extent()
+        if earliest is None:
+            return -math.inf, math.inf
+        earliest_id, latest_id = resolved.ids_at([earliest[0], latest[0]])
+        return bound_of(records[earliest_id], earliest[1]), bound_of(records[latest_id], latest[1])
+
+    def __len__(self) -> int:
+        return len(self.resolved)
+
+    def appended(self, new_records: Dict[str, EventRecord], version: int) -> 'TimelineSnapshot':
+        """
+        Build the snapshot that follows this one when records are only added, without re-examining existing rows.
+        The existing interval index is reused, and only rebuilt once enough rows have been appended past it.
+        The density summary is extended with the new records.
+
+        Args:
+            new_records: Resolved records whose ids are not already in this snapshot. The new snapshot takes
+                ownership of the dict.
+            version: The version of the new snapshot.
+        """
+        records = self._layers.appended(new_records)
+        batch = ResolvedTimeline.from_records(new_records.values())
+        resolved = self.resolved.append(batch)
+
+        batch_min, batch_max = self._find_extent(new_records, batch)
+        extent = (_earlier(self.min, batch_min), _later(self.max, batch_max))
+
+        # Brought up to date here as well, rather than rebuilt by the first reader of every snapshot.
+        summary = self.summary().added(_with_infinities(batch.start_min), _with_infinities(batch.end_max))
+
+        index, indexed_rows = self._indexed
+        if len(resolved) - indexed_rows > max(self.MAX_UNINDEXED_ROWS, indexed_rows // 4):
+            # Rebuilt here, by the writer, so readers never stall on it.
+            index, indexed_rows = IntervalIndex(resolved.start_min, resolved.end_max), len(resolved)
+        return TimelineSnapshot(records, version=version, resolved=resolved,
+                                indexed=(index, indexed_rows), extent=extent, summary=summary)
+
+    def query_range(self, lo: int, hi: int) -> List[EventRecord]:
+        """
+        Returns:
+            The records whose [start.min, end.max] overlaps the ordinal range [lo, hi], in timeline order.
+        """
+        index, indexed_rows = self._index_rows()
+        rows = index.overlapping(lo, hi) if index is not None else np.empty(0, dtype=np.int64)
+        tail = self.resolved.overlapping(lo, hi, first=indexed_rows)
+        return self._records_at(np.concatenate([rows, indexed_rows + np.nonzero(tail)[0]]))
+
+    def query_point(self, t: int) -> List[EventRecord]:
+        """
+        Returns:
+            The records whose [start.min, end.max] contains the ordinal t, in timeline order.
+        """
+        index, indexed_rows = self._index_rows()
+        rows = index.stab(t) if index is not None else np.empty(0, dtype=np.int64)
+        tail = self.resolved.overlapping(t, t, first=indexed_rows)
+        return self._records_at(np.concatenate([rows, indexed_rows + np.nonzero(tail)[0]]))
+
+    def summary(self) -> TimelineSummary:
+        """
+        Returns:
+            A density summary of the records, built the first time it is needed.
+        """
+        if self._summary is None:
+            # Built by whichever reader asks first; building it twice in a race is harmless.
+            self._summary = TimelineSummary(_with_infinities(self.resolved.start_min),
+                                            _with_infinities(self.resolved.end_max))
+        return self._summary
+
+    def _index_rows(self) -> Tuple[Optional[IntervalIndex], int]:
+        indexed = self._indexed
+        if indexed[0] is None and len(self.resolved) > self.MAX_UNINDEXED_ROWS:
+            # Built on the first query; building it twice in a race is harmless.
+            indexed = (IntervalIndex(self.resolved.start_min, self.resolved.end_max), len(self.resolved))
+            self._indexed = indexed
+        return indexed
+
+    def _records_at(self, rows) -> List[EventRecord]:
+        records = self.records
+        return [records[rec_id] for rec_id in self.resolved.ids_at(np.sort(rows))]
@@ -0,0 +1,171 @@
+import math
+from typing import List, Tuple
+import numpy as np
+
+from data_types.layered_mapping import append_layer
+
+
+def _merge_sorted(older: np.ndarray, newer: np.ndarray) -> np.ndarray:
+    return np.sort(np.concatenate([older, newer]), kind='mergesort')
+
+
+class TimelineSummary:
+    """
+    A multi-resolution summary of how many records are in progress over time, for drawing dense views as
+    density bands instead of individual records.
+
+    Level 0 divides the timeline's real extent into 2**bits equal bins, and counts the records overlapping each
+    bin. Every level above has half as many bins, each twice as wide, up to a single bin covering everything,
+    so a view at any zoom can read counts at roughly its own resolution. The records' starts and ends are also
+    kept sorted, so the exact number of records overlapping any range can be counted in O(log n).
+    """
+
+    MAX_BITS = 20  # Level 0 never has more than 2**MAX_BITS bins.
+
+    def __init__(self, starts: np.ndarray, ends: np.ndarray, extent: Tuple[float, float] = None):
+        """
+        Args:
+            starts: The earliest start of each record, in ordinal days. May be -inf.
+            ends: The latest end of each record, in ordinal days. May be inf.
+            extent: The range of ordinal days the bins cover. Defaults to the records' real extent.
+        """
+        starts = np.asarray(starts, dtype=np.float64)
+        ends = np.asarray(ends, dtype=np.float64)
+        # Kept as a few sorted layers rather than one array, so records can be added without sorting them all again.
+        self._sorted_starts: List[np.ndarray] = [np.sort(starts)]
+        self._sorted_ends: List[np.ndarray] = [np.sort(ends)]
+
+        if extent is None:
+            bounds = np.concatenate([starts, ends])
+            finite = bounds[np.isfinite(bounds)]
+            extent = (float(finite.min()), float(finite.max())) if len(finite) else (0.0, 0.0)
+        self.origin: float = extent[0]
+        span = extent[1] - extent[0]
+        bits = self._bits_for(len(starts))
+        self.bin_days: float = max(span, 1.0) / 2 ** bits  # Width of a level 0 bin.
+        self.levels = [self._level_counts(starts, ends, level, bits) for level in range(bits + 1)]
+
+    @classmethod
+    def _bits_for(cls, record_count: int) -> int:
+        return min(cls.MAX_BITS, max(1, math.ceil(math.log2(max(record_count, 1))) + 2))
+
+    def _bins(self, starts: np.ndarray, ends: np.ndarray, level: int, bin_count: int) -> Tuple[np.ndarray, np.ndarray]:
+        # The first and last bin of the level that each record overlaps.
+        width = self.bin_days * 2 ** level
+        first = np.clip(np.floor((starts - self.origin) / width), 0, bin_count - 1).astype(np.int64)
+        last = np.clip(np.floor((ends - self.origin) / width), 0, bin_count - 1).astype(np.int64)
+        return first, last
+
+    def _level_counts(self, starts: np.ndarray, ends: np.ndarray, level: int, bits: int) -> np.ndarray:
+        # Records overlapping each bin, counted with a difference array: +1 at its first bin, -1 after its last.
+        bin_count = 2 ** (bits - level)
+        first, last = self._bins(starts, ends, level, bin_count)
+        diff = np.bincount(first, minlength=bin_count + 1) - np.bincount(last + 1, minlength=bin_count + 1)
+        return np.cumsum(diff[:bin_count]).astype(np.int32)
+
+    def _added_counts(self, counts: np.ndarray, starts: np.ndarray, ends: np.ndarray, level: int) -> np.ndarray:
+        # As _level_counts, added to a copy of the existing counts. With few records, it's quicker to sort where
+        # each one starts and stops, and repeat the running count across the bins between, than to sum a whole
+        # difference array.
+        first, last = self._bins(starts, ends, level, len(counts))
+        points = np.concatenate([first, last + 1])
+        order = np.argsort(points, kind='stable')
+        points = points[order]
+        running = np.cumsum(np.where(order < len(first), 1, -1)).astype(np.int32)
+        counts = counts.copy()
+        counts[points[0]:points[-1]] += np.repeat(running[:-1], np.diff(points))
+        return counts
+
+    @property
+    def sorted_starts(self) -> np.ndarray:
+        return self._sorted_starts[0] if len(self._sorted_starts) == 1 else np.sort(np.concatenate(self._sorted_starts))
+
+    @property
+    def sorted_ends(self) -> np.ndarray:
+        return self._sorted_ends[0] if len(self._sorted_ends) == 1 else np.sort(np.concatenate(self._sorted_ends))
+
+    def added(self, starts: np.ndarray, ends: np.ndarray) -> 'TimelineSummary':
+        """
+        Summarize these records along with some more, without recounting these. The new records' counts are added
+        to a copy of each level, unless they reach outside the range the bins cover, or there are now enough
+        records for finer bins. The summary is then rebuilt, covering twice the span in whichever direction it
+        has to grow, so a timeline that keeps growing in one direction is only rebuilt O(log n) times.
+
+        Args:
+            starts: The earliest start of each new record, in ordinal days. May be -inf.
+            ends: The latest end of each new record, in ordinal days. May be inf.
+
+        Returns:
+            A new TimelineSummary, or this one if there are no new records. This one is not modified.
+        """
+        starts = np.asarray(starts, dtype=np.float64)
+        ends = np.asarray(ends, dtype=np.float64)
+        if len(starts) == 0:
+            return self
+        bits = len(self.levels) - 1
+        lo, hi = self.origin, self.origin + self.bin_days * 2 ** bits
+        bounds = np.concatenate([starts, ends])
+        finite = bounds[np.isfinite(bounds)]
+        new_lo = min(lo, float(finite.min())) if len(finite) else lo
+        new_hi = max(hi, float(finite.max())) if len(finite) else hi
+        if len(self) == 0 or new_lo < lo or new_hi > hi or self._bits_for(len(self) + len(starts)) > bits:
+            if len(self) and new_lo < lo:
+                new_lo = min(new_lo, new_hi - 2 * (hi - lo))
+            if len(self) and new_hi > hi:
+                new_hi = max(new_hi, new_lo + 2 * (hi - lo))
+            extent = None if len(self) == 0 else (new_lo, new_hi)
+            return TimelineSummary(np.concatenate([self.sorted_starts, starts]),
+                                   np.concatenate([self.sorted_ends, ends]), extent=extent)
+
+        summary = TimelineSummary.__new__(TimelineSummary)
+        summary.origin, summary.bin_days = self.origin, self.bin_days
+        summary.levels = [summary._added_counts(counts, starts, ends, level) for level, counts in enumerate(self.levels)]
+        summary._sorted_starts = append_layer(self._sorted_starts, np.sort(starts), _merge_sorted)
+        summary._sorted_ends = append_layer(self._sorted_ends, np.sort(ends), _merge_sorted)
+        return summary
+
+    def __len__(self) -> int:
+        return sum(len(layer) for layer in self._sorted_starts)
+
+    def count(self, lo: float, hi: float) -> int:
+        """
+        Returns:
+            The exact number of records overlapping the ordinal range [lo, hi].
+        """
+        started = sum(np.searchsorted(layer, hi, side='right') for layer in self._sorted_starts)
+        ended = sum(np.searchsorted(layer, lo, side='left') for layer in self._sorted_ends)
+        return int(started - ended)
+
+    def columns(self, lo: float, hi: float, column_count: int) -> np.ndarray:
+        """
+        Divide the ordinal range [lo, hi] into equal columns, and read how many records are in progress in each,
+        from the coarsest level whose bins are no wider than a column.
+
+        Args:
+            lo: The beginning of the range.
+            hi: The end of the range.
+            column_count: The number of columns.
+
+        Returns:
+            For each column, the most records overlapping any one bin within it.
+        """
+        column_days = (hi - lo) / column_count
+        level = int(np.clip(math.floor(math.log2(max(column_days / self.bin_days, 1))), 0, len(self.levels) - 1))
+        counts = self.levels[level]
+        width = self.bin_days * 2 ** level
+
+        # The bins each column spans, at least one each; bins outside the summary count as empty. Bins are more
+        # than half a column wide, so no column spans more than three of them.
+        edges = lo + column_days * np.arange(column_count + 1)
+        bins = np.floor((edges - self.origin) / width)
+        first, last = bins[:-1], np.maximum(bins[1:] - 1, bins[:-1])
+        inside = (last >= 0) & (first < len(counts))
+        result = np.zeros(column_count, dtype=np.int32)
+        if inside.any():
+            first = np.clip(first[inside], 0, len(counts) - 1).astype(np.int64)
+            last = np.clip(last[inside], 0, len(counts) - 1).astype(np.int64)
+            most = counts[first]
+            for step in (1, 2):
+                most = np.maximum(most, counts[np.minimum(first + step, last)])
+            result[inside] = most
+        return result
@@ -1,22 +1,54 @@
 
 import math
+import calendar
 from random import randrange
-from typing import List, Tuple, Union
+from typing import Iterable, List, Optional, Tuple, Union
 from collections import namedtuple
 
+import numpy as np
 import pygame
+import yaml
 from pygame_manager import PyGameManager as pgm
 import color
 
 from datetime import timedelta
 import data_types
-from algorithms import interpolate
 from logs import get_logger
+from algorithms.ticks import calendar_ticks, Tick
+import algorithms
 
 TimePoint = data_types.TimePoint
 
 # Utility struct to hold info about the event records we are drawing.
-LabelInfo = namedtuple("LabelInfo", "id x_vals label_surf label_rect")
+# The extent covers everything drawn for the record, bar and label alike.
+LabelInfo = namedtuple("LabelInfo", "id x_vals label_surf label_rect label_pos extent")
+
+# Gap between the start of a record and its label, or the window's edge and a label pinned to it.
+LABEL_BUFFER = 5
+
+
+def _ordinal_of(bound: Union[TimePoint, float]) -> float:
+    return bound.ordinal() if type(bound) is TimePoint else bound
+
+
+def _format_time(tp: TimePoint) -> str:
+    text = f"{tp.day} {calendar.month_abbr[tp.month]} {tp.year}"
+    if tp.seconds:
+        seconds = round(tp.seconds)
+        text += f" {seconds // 3600:02}:{seconds // 60 % 60:02}:{seconds % 60:02}"
+    return text
+
+
+def _format_reference(bound) -> str:
+    # Describe a resolved bound, whose min and max are TimePoints or infinite.
+    lo, hi = bound.min, bound.max
+    if type(lo) is TimePoint and type(hi) is TimePoint:
+        return _format_time(lo) if lo == hi else f"{_format_time(lo)} to {_format_time(hi)}"
+    if type(lo) is TimePoint:
+        return f"no earlier than {_format_time(lo)}"
+    if type(hi) is TimePoint:
+        return f"no later than {_format_time(hi)}"
+    return "unknown"
 
 
 class Timeview:
@@ -25,7 +57,20 @@ class Timeview:
     # Values must be [0-1], where lower numbers cause more change.
     ZOOM_RATIO = 0.8
 
-    def __init__(self, timeline: data_types.Timeline):
+    # Views with less than this many pixels of width per record in range draw density bands from the timeline's
+    # summary instead of laying out each record, so drawing costs the same however many records there are.
+    LOD_PIXELS_PER_RECORD = 0.5
+    LOD_COLUMN_PX = 3  # Width of each density column, in pixels.
+
+    GUIDELINE_SPACING_PX = 100  # Guidelines are spaced at least about this far apart.
+
+    # The most lines of info a tooltip shows, and the most characters in each.
+    TOOLTIP_INFO_LINES = 10
+    TOOLTIP_CHARS = 80
+
+    SCROLLBAR_PX = 6  # Width of the scrollbar shown when the lanes are stacked taller than the window.
+
+    def __init__(self, timeline: Union[data_types.Timeline, data_types.TiledTimeline, data_types.EventLog]):
         self.timeline = timeline
         self.min: TimePoint = self.timeline.min
         self.max: TimePoint = self.timeline.max
@@ -33,6 +78,64 @@ class Timeview:
         # Invert min/max for starting positions so we get a nice zoom effect on startup.
         self.render_min = data_types.SlidingValue(self.max.ordinal())
         self.render_max = data_types.SlidingValue(self.min.ordinal())
+        self.frame_timeline()
+        self.render_force = False
+
+        # Store the drawable information to avoid recalculating every frame.
+        self.guidelines: List[Tick] = []
+        self._guideline_key = None  # The (min, max, most guidelines) the guidelines were chosen for.
+        self.label_infos: List[LabelInfo] = []
+
+        # The records in view, laid out in ordinal days for the range the view is moving towards. Each frame of a
+        # pan or zoom only projects this layout to pixels; it is updated when that range or the records change.
+        self.layout = data_types.LaneLayout()
+        self._layout_key = None  # The (target min, target max, window width) the layout was made for.
+        self._projection_key = None  # The (min, max, width, height, scroll) label_infos were projected for.
+        self._layout_ids: List[str] = []
+        self._layout_records = {}  # The records in the layout, by id.
+        self._bounds = np.empty((0, 4))  # Each record's four bounds as ordinals, with infinite bounds as +/-inf.
+        self._lanes = np.empty(0, dtype=np.int64)
+        self._guideline_ordinals = np.empty(0)
+        self.lod = False  # True while the view is too dense for individual records, and draws density bands.
+        self._changed_ids = set()  # Records added, removed or changed since the layers were last drawn.
+
+        # How far the lanes are scrolled down, when they are stacked taller than the window. Only the lanes within
+        # the window are projected to pixels and drawn, however many there are.
+        self.scroll_px = 0
+        self.lane_height = 0
+        self._max_scroll_px = 0  # How far the lanes could be scrolled when they were last projected.
+        self._drawn_scroll_px = 0  # The scroll they were last projected at.
+        self._stack_top = 0  # Where the top of the first lane was last projected to, relative to the window.
+
+        # The layers the guidelines and records are drawn on, kept between frames, and where they were drawn.
+        self._guide_layer: pygame.Surface = None
+        self._record_layer: pygame.Surface = None
+        self._layer_transform: data_types.ViewTransform = None
+        self._layer_key = None  # The (width, height, lod, lane count) the layers were drawn for.
+        self._layers_stale = True  # Whether the layers must be redrawn in full.
+        self._record_extents = {}  # Where each record is drawn on the layers.
+        self._pinned_px = 0  # How far from the left edge labels pinned to it reach.
+        self._tick_xs: List[float] = []
+        self._tick_extents = {}  # Where each guideline is drawn on the layers, by its ordinal.
+
+        # The record under the pointer, highlighted and described in a tooltip drawn over the layers.
+        self.hover_id: Optional[str] = None
+        self._hover_pos: Optional[Tuple[int, int]] = None
+        self._tooltip: List[str] = []  # Lines of text describing the hovered record.
+        self._overlay_rects: List[pygame.Rect] = []  # Where the highlight and tooltip were last drawn.
+        self._overlay_stale = False  # Whether the hover changed since the overlay was drawn.
+        self._hit_grid: Optional[data_types.HitGrid] = None  # Index of label_infos' extents, built when needed.
+        self._pick_bounds = (0, 0, 0, 0)  # The window area label_infos were placed in.
+
+        # Colors for each of the records, generated the first time each record is drawn.
+        self.record_colors = {}
+
+    def frame_timeline(self):
+        """
+        Move the view to show the timeline's whole extent, e.g. once it has finished loading.
+        """
+        self.min = self.timeline.min
+        self.max = self.timeline.max
 
         # Set the target zoom to frame the records with a buffer on each side.
         min_ord = self.min.ordinal()
@@ -43,24 +146,25 @@ class Timeview:
         frame_max = max_ord + framing_ord
         self.render_min.set(frame_min)
         self.render_max.set(frame_max)
-        self.render_force = False
-
-        # Store the drawable information to avoid recalculating every frame.
-        self.guidelines = []
-        self.label_infos: List[LabelInfo] = []
 
-        # Generate colors for each of the records.
-        self.record_colors = {}
-        for rec_id in self.timeline.get_records().keys():
+    def get_record_colors(self, rec_id: str) -> Tuple[pygame.Color, pygame.Color]:
+        """
+        Returns:
+            The (outline, fill) colors of a record, choosing them if it hasn't been drawn before.
+        """
+        colors = self.record_colors.get(rec_id)
+        if colors is None:
             fg = pygame.Color(0)
             bg = pygame.Color(0)
             hue = randrange(0, 360)
             fg.hsva = (hue, 30, 90)
-            bg.hsva = (hue, 50, 90, 0)
-            self.record_colors[rec_id] = (fg, bg)
+            bg.hsva = (hue, 50, 90, 100)
+            colors = (fg, bg)
+            self.record_colors[rec_id] = colors
+        return colors
 
-    def contains(self, timelike: Union[int, data_types.TimePoint, data_types.TimeReference, data_types.EventRecord]) -> bool:
-        if type(timelike) is int:
+    def contains(self, timelike: Union[int, float, data_types.TimePoint, data_types.TimeReference, data_types.EventRecord]) -> bool:
+        if isinstance(timelike, (int, float)):
             return self.min.ordinal() <= timelike <= self.max.ordinal()
         if type(timelike) is TimePoint:
             return self.contains_date(timelike)
@@ -116,20 +220,26 @@ class Timeview:
             return False
         return True
 
+    def target_transform(self, window_width_px: int) -> data_types.ViewTransform:
+        """
+        Returns:
+            The mapping between ordinals and x coordinates for the range the view is set to, e.g. to find the
+            date under the mouse.
+        """
+        return data_types.ViewTransform(self.min.ordinal(), self.max.ordinal(), window_width_px)
+
     def get_visible(self) -> List[data_types.EventRecord]:
         """
         Returns:
             A list of all records from this view's Timeline that are also currently within the view.
         """
-        visible_records = []
-        for rec in self.timeline.get_records().values():
-            if self.contains(rec):
-                visible_records.append(rec)
-        return visible_records
+        # Equivalent to contains_record on every record, but answered from the timeline's interval index.
+        return self.timeline.query_range(self.min, self.max)
 
-    def zoom_in(self, focus: int) -> None:
+    def zoom_in(self, focus: Union[int, float]) -> None:
         """
         Changes the view's min and/or max to narrow the view on the provided ordinal day.
+        Views may narrow below a single day; their bounds then carry a time of day.
         Args:
             focus: The ordinal day to zoom in towards.
 
@@ -149,7 +259,7 @@ class Timeview:
         self.render_min.set(self.min.ordinal())
         self.render_max.set(self.max.ordinal())
 
-    def zoom_out(self, focus: int) -> None:
+    def zoom_out(self, focus: Union[int, float]) -> None:
         """
         Changes the view's min and/or max to widen the view around the provided ordinal day.
         Args:
@@ -180,12 +290,12 @@ class Timeview:
         self.render_min.set(self.min.ordinal())
         self.render_max.set(self.max.ordinal())
 
-    def pan(self, delta_days: int) -> None:
+    def pan(self, delta_days: Union[int, float]) -> None:
         """
         Shift the view by the prescribed delta.
 
         Args:
-            delta_days: The number of days to shift both the min and max bounds of the view.
+            delta_days: The number of days to shift both the min and max bounds of the view. May be fractional.
 
         Returns:
             None
@@ -205,190 +315,484 @@ class Timeview:
         self.render_min.set(self.min.ordinal())
         self.render_max.set(self.max.ordinal())
 
+    def refresh(self, changed_ids: Iterable[str] = ()):
+        """
+        Redraw from the timeline's current records after they were reloaded, keeping the current view range.
+
+        Args:
+            changed_ids: Records which were added, removed or changed. Their colors are chosen afresh.
+        """
+        changed_ids = set(changed_ids)
+        for rec_id in changed_ids:
+            self.record_colors.pop(rec_id, None)
+        self.layout.remove(changed_ids)  # Their bounds may have changed, so they are placed again.
+        self._changed_ids.update(changed_ids)  # Only they need drawing again, unless the lanes change.
+        self.render_force = True
+
     def force_redraw(self):
         """
         The next call to render will regenerate the window unconditionally.
         """
         self.render_force = True
+        self._layers_stale = True
 
-    def render(self, surf: pygame.Surface):
+    def is_animating(self) -> bool:
+        """
+        Returns:
+            True while the view is still sliding towards its latest zoom or pan target, so every frame differs.
+        """
+        return not (self.render_min.is_at_destination() and self.render_max.is_at_destination())
 
-        regen_view = self.render_force or (not self.render_min.is_at_destination() or not self.render_max.is_at_destination())
-        self.render_force = False
+    def needs_render(self) -> bool:
+        """
+        Returns:
+            True if the next call to render would draw something different from the last one.
+        """
+        return self.render_force or self.is_animating() or self._overlay_stale or \
+            self.scroll_px != self._drawn_scroll_px
 
-        # First draw the background
-        surf.fill(color.WHITE)
+    def scroll(self, delta_px: int):
+        """
+        Scroll the lanes vertically, as far as they are stacked taller than the window.
+
+        Args:
+            delta_px: How far to scroll, in pixels. Positive values bring lower lanes into view.
+        """
+        self.scroll_px = int(min(max(self.scroll_px + delta_px, 0), self._max_scroll_px))
 
-        min_ord = self.render_min.get()
-        max_ord = self.render_max.get()
-        timeview_range = (min_ord, max_ord)
+    def render(self, surf: pygame.Surface) -> List[pygame.Rect]:
+        """
+        Draw the view onto a surface, such as the window.
+
+        The guidelines and the records are kept drawn on layers of their own, which are only redrawn in full when
+        the scale, the window's size or the stacking of lanes changes. A frame that only pans scrolls both layers
+        instead, and redraws just the strip scrolled into view, the labels pinned to the left edge, and whatever
+        records or guidelines came, went or changed. Scrolling the lanes vertically likewise scrolls the record
+        layer, and draws only the lanes scrolled into view. Density bands are cheap to draw, and always drawn in
+        full. Only the parts of `surf` that changed are drawn on.
+
+        Args:
+            surf: The surface to draw on, the size of the view.
 
+        Returns:
+            The areas of surf that were drawn on, e.g. to update on the display.
+        """
         width, height = surf.get_size()
 
-        font = pgm.get_font()
-
-        # Figure out where to draw guidelines. Then draw them.
-        if regen_view:
-            self.guidelines = self.generate_guidelines(self.min, self.max)
-        for gl in self.guidelines:
-            glx = interpolate(gl.ordinal(), timeview_range, (0, width))
-            pygame.draw.line(surface=surf, color=color.LIGHT_GRAY, start_pos=(glx, 0), end_pos=(glx, height))
-            antialias = True
-            text = font.render(str(gl.year), antialias, color.LIGHT_GRAY)
-            text_size = text.get_size()
-            surf.blit(text, (glx+5, 5))
-            surf.blit(text, (glx+5, height - text_size[1] - 5))
-
-        # Regenerate the drawable time events if the view changed.
-        if regen_view:
-            # Generate positions/rects for all timeline elements
-            visible_records = self.get_visible()
-            self.calculate_record_positions(visible_records, width, height, timeview_range)
+        # Only lay the records out again when the range being moved towards changes, not on every frame of the move.
+        layout_key = (self.render_min.tgt, self.render_max.tgt, width)
+        relayout = self.render_force or layout_key != self._layout_key
+        self.render_force = False
+
+        transform = data_types.ViewTransform(self.render_min.get(), self.render_max.get(), width)
+
+        # Figure out where to draw guidelines, and regenerate the drawable time events, if the range being moved
+        # towards changed.
+        if relayout:
+            guideline_key = (self.min.ordinal(), self.max.ordinal(), max(1, width // self.GUIDELINE_SPACING_PX))
+            if guideline_key != self._guideline_key:
+                self.guidelines = calendar_ticks(self.min, self.max, max_ticks=guideline_key[2])
+                self._guideline_ordinals = np.array([gl.time.ordinal() for gl in self.guidelines], dtype=np.float64)
+                self._guideline_key = guideline_key
+            self.update_layout(width)
+            self._layout_key = layout_key
+
+        # The layers can be scrolled into place if only the view's position changed, by a whole number of pixels
+        # less than the window's width. The layers are then drawn at that whole-pixel offset, which is always
+        # within half a pixel of the exact range.
+        layer_key = (width, height, self.lod, self.layout.lane_count)
+        previous = self._layer_transform
+        full = self._layers_stale or self.lod or layer_key != self._layer_key or previous is None or \
+            not math.isclose(previous.scale, transform.scale, rel_tol=1e-6)
+        dx = 0 if full else round((previous.min_ord - transform.min_ord) * previous.scale)
+        if full or abs(dx) >= width:
+            full = True
+            layer_transform = transform
+        else:
+            shift = dx / previous.scale
+            layer_transform = data_types.ViewTransform(previous.min_ord - shift, previous.max_ord - shift, width)
+
+        old_extents, old_tick_extents, old_pinned_px = self._record_extents, self._tick_extents, self._pinned_px
+        old_stack_top = self._stack_top
+        projection_key = (layer_transform.min_ord, layer_transform.max_ord, width, height, self.scroll_px)
+        if relayout or projection_key != self._projection_key:
+            self.calculate_record_positions(layer_transform, height)
+            self._projection_key = projection_key
+            if self._hover_pos is not None:
+                self.hover(self._hover_pos)  # Records may have moved under the pointer.
+        dy = 0 if full else self._stack_top - old_stack_top
+        if abs(dy) >= height:
+            full = True
+        self._layer_transform = layer_transform
+        self._layer_key = layer_key
+        self._tick_xs = np.floor(layer_transform.to_x(self._guideline_ordinals).round(3)).tolist()
+        self._tick_extents = {}
+        for ordinal, gl, glx in zip(self._guideline_ordinals.tolist(), self.guidelines, self._tick_xs):
+            caption_width = pgm.render_text(gl.caption, text_color=color.LIGHT_GRAY).get_width()
+            self._tick_extents[ordinal] = pygame.Rect(glx, 0, caption_width + 7, height)
+
+        changed_ids, self._changed_ids = self._changed_ids, set()
+        if full:
+            self._layers_stale = False
+            if self._guide_layer is None or self._guide_layer.get_size() != (width, height):
+                self._guide_layer = pygame.Surface((width, height))
+                self._record_layer = pygame.Surface((width, height), pygame.SRCALPHA)
+                if pygame.display.get_surface() is not None:
+                    self._guide_layer = self._guide_layer.convert()
+                    self._record_layer = self._record_layer.convert_alpha()
+            self.draw_layers(surf.get_rect())
+            return self._composite(surf, [surf.get_rect()])
+
+        regions = []
+        if dx:
+            self._guide_layer.scroll(dx, 0)
+            self._record_layer.scroll(dx, dy)
+            regions.append(pygame.Rect(0, 0, dx, height) if dx > 0 else pygame.Rect(width + dx, 0, -dx, height))
+            # Labels pinned to the left edge don't move with their records, before or after the scroll.
+            pinned_px = max(old_pinned_px, self._pinned_px)
+            if pinned_px:
+                regions.append(pygame.Rect(0, 0, pinned_px + max(dx, 0), height))
+        elif dy:
+            self._record_layer.scroll(0, dy)  # The guidelines span the window, so are unmoved.
+        if dy:
+            regions.append(pygame.Rect(0, 0, width, dy) if dy > 0 else pygame.Rect(0, height + dy, width, -dy))
+        for key in changed_ids:
+            if key in old_extents:
+                regions.append(old_extents[key].move(dx, dy))
+            if key in self._record_extents:
+                regions.append(self._record_extents[key])
+        for key in old_tick_extents.keys() ^ self._tick_extents.keys():
+            regions.append(old_tick_extents[key].move(dx, 0) if key in old_tick_extents else self._tick_extents[key])
+
+        regions = [region.clip(surf.get_rect()) for region in regions]
+        regions = [region for region in regions if region]
+        if sum(region.width * region.height for region in regions) > width * height // 2:
+            regions = [surf.get_rect()]  # Cheaper to draw everything once than to draw over most of it in pieces.
+        for region in regions:
+            self.draw_layers(region)
+        if dx or dy:
+            regions = [surf.get_rect()]  # Everything moved.
+        return self._composite(surf, regions)
+
+    def present(self, surf: pygame.Surface) -> List[pygame.Rect]:
+        """
+        Draw the view as it was last rendered, without bringing it up to date, e.g. while the window is being
+        resized and the layers are not yet remade at the new size.
+
+        Returns:
+            The areas of surf that were drawn on.
+        """
+        surf.fill(color.WHITE)
+        if self._guide_layer is not None:
+            region = self._guide_layer.get_rect().clip(surf.get_rect())
+            surf.blit(self._guide_layer, region, region)
+            surf.blit(self._record_layer, region, region)
+        return [surf.get_rect()]
 
+    def draw_layers(self, region: pygame.Rect):
+        """
+        Redraw everything within a region of the guideline and record layers, at their current projection.
+        """
+        guides, records = self._guide_layer, self._record_layer
+        guides.set_clip(region)
+        records.set_clip(region)
+        guides.fill(color.WHITE)
+        records.fill((0, 0, 0, 0))
+
+        height = guides.get_height()
+        for gl, glx, extent in zip(self.guidelines, self._tick_xs, self._tick_extents.values()):
+            if not extent.colliderect(region):
+                continue
+            pygame.draw.line(surface=guides, color=color.LIGHT_GRAY, start_pos=(glx, 0), end_pos=(glx, height))
+            text = pgm.render_text(gl.caption, text_color=color.LIGHT_GRAY)
+            guides.blit(text, (glx+5, 5))
+            guides.blit(text, (glx+5, height - text.get_height() - 5))
+
+        if self.lod:
+            self.draw_density(records, self._layer_transform)
+        extents = [li.extent for li in self.label_infos]
+        for index in region.collidelistall(extents):
+            self.draw_record(records, self.label_infos[index])
+
+        guides.set_clip(None)
+        records.set_clip(None)
+
+    def _composite(self, surf: pygame.Surface, regions: List[pygame.Rect]) -> List[pygame.Rect]:
+        # Copy the layers' regions onto surf, then draw the hover highlight and tooltip over them, if they
+        # changed or were drawn over.
+        overlay_drawn_over = any(region.collidelist(self._overlay_rects) != -1 for region in regions)
+        if self._overlay_stale or overlay_drawn_over:
+            regions = regions + self._overlay_rects  # Erase the last overlay.
+        for region in regions:
+            surf.blit(self._guide_layer, region, region)
+            surf.blit(self._record_layer, region, region)
+        if self._overlay_stale or overlay_drawn_over:
+            self._overlay_rects = self.draw_overlay(surf)
+            regions = regions + self._overlay_rects
+        self._overlay_stale = False
+        return regions
+
+    def draw_overlay(self, surf: pygame.Surface) -> List[pygame.Rect]:
+        """
+        Draw the scrollbar, if the lanes are stacked taller than the window, and the hovered record's highlight
+        and tooltip.
+
+        Returns:
+            The areas of surf drawn on.
+        """
+        drawn = []
+        width, height = surf.get_size()
+        if self._max_scroll_px:
+            # The thumb is to the window's height as the part of the stack in view is to all of it.
+            stack_px = height + self._max_scroll_px
+            thumb = pygame.Rect(width - self.SCROLLBAR_PX - 2, height * self.scroll_px // stack_px,
+                                self.SCROLLBAR_PX, max(self.SCROLLBAR_PX, height * height // stack_px))
+            pygame.draw.rect(surf, color.LIGHT_GRAY, thumb, border_radius=self.SCROLLBAR_PX // 2)
+            drawn.append(thumb)
+
+        if self.hover_id is None:
+            return drawn
         for li in self.label_infos:
-            # Render
-            # Draw an outline showing the full possible extent in time (start.min to end.max)
-            lr = li.label_rect
-            fgc, bgc = self.record_colors[li.id]
-            xss, xse, xes, xee = li.x_vals
-            xspan = xee-xss
-            line_width = 2 if xspan >= 4 else 1 if xspan >= 2 else 1
-            if xspan > 1:
-                pygame.draw.rect(surface=surf,
-                             color=fgc,
-                             rect=(xss, lr.top, xspan, lr.height),
+            if li.id == self.hover_id:
+                highlight = li.label_rect.inflate(4, 4)
+                pygame.draw.rect(surf, color.BLACK, highlight, width=2, border_radius=int(highlight.height/2))
+                drawn.append(highlight)
+                break
+
+        texts = [pgm.render_text(line) for line in self._tooltip]
+        padding = 4
+        box = pygame.Rect(0, 0, max(text.get_width() for text in texts) + 2 * padding,
+                          sum(text.get_height() for text in texts) + 2 * padding)
+        # Below and right of the pointer, unless that would run off the window.
+        x, y = self._hover_pos
+        box.topleft = (x + 16 if x + 16 + box.width <= width else x - 8 - box.width,
+                       y + 16 if y + 16 + box.height <= height else y - 8 - box.height)
+        box.clamp_ip(surf.get_rect())
+        pygame.draw.rect(surf, color.WHITE, box)
+        pygame.draw.rect(surf, color.LIGHT_GRAY, box, width=1)
+        text_y = box.top + padding
+        for text in texts:
+            surf.blit(text, (box.left + padding, text_y))
+            text_y += text.get_height()
+        drawn.append(box)
+        return drawn
+
+    def draw_record(self, surf: pygame.Surface, li: LabelInfo):
+        """
+        Draw one record where calculate_record_positions placed it.
+        """
+        # Draw an outline showing the full possible extent in time (start.min to end.max)
+        lr = li.label_rect
+        fgc, bgc = self.get_record_colors(li.id)
+        xss, xse, xes, xee = li.x_vals
+        xspan = xee-xss
+        line_width = 2 if xspan >= 4 else 1 if xspan >= 2 else 1
+        if xspan > 1:
+            pygame.draw.rect(surface=surf,
+                         color=fgc,
+                         rect=(xss, lr.top, xspan, lr.height),
+                         border_radius=int(lr.height/2),
+                         width=line_width
+                         )
+        else:  # Just draw a single 1-pixel line so it doesn't disappear entirely.
+            pygame.draw.line(surface=surf, color=fgc, start_pos=(xss, lr.top), end_pos=(xss, lr.top+lr.height))
+
+        # Draw a filled area showing the time during which the event was occurring (start.max to end.min).
+        if xse <= xes:
+            pygame.draw.rect(surface=surf,
+                             color=bgc,
+                             rect=(xse, lr.top, xes-xse, lr.height),
                              border_radius=int(lr.height/2),
-                             width=line_width
+                             # width=1
                              )
-            else:  # Just draw a single 1-pixel line so it doesn't disappear entirely.
-                pygame.draw.line(surface=surf, color=fgc, start_pos=(xss, lr.top), end_pos=(xss, lr.top+lr.height))
-
-            # Draw a filled area showing the time during which the event was occurring (start.max to end.min).
-            if xse <= xes:
-                pygame.draw.rect(surface=surf,
-                                 color=bgc,
-                                 rect=(xse, lr.top, xes-xse, lr.height),
-                                 border_radius=int(lr.height/2),
-                                 # width=1
-                                 )
-
-            # EventRecord's name.
-            label_buffer = 5
-            label_x = xse if xse <= xes else xss
-            # Ensure the label is drawn on-screen.
-            label_x = label_buffer + label_x if label_x > 0 else label_buffer
-            surf.blit(li.label_surf, (label_x, li.label_rect.y+2))
 
-    @staticmethod
-    def generate_guidelines(min_date: TimePoint, max_date: TimePoint) -> List[TimePoint]:
+        # EventRecord's name.
+        surf.blit(li.label_surf, li.label_pos)
+
+    def update_layout(self, window_width_px: int):
+        """
+        Find the records within the range the view is moving towards, and bring their lanes up to date
+        at the scale they will be drawn at there.
+
+        Args:
+            window_width_px: Current width of the drawable window in pixels.
         """
-        Figure out where to draw guidelines to help orient the viewer.
+        target = data_types.ViewTransform(self.render_min.tgt, self.render_max.tgt, window_width_px)
+        self.lane_height = pgm.get_font().get_linesize() + 4
+        summary = self.timeline.summary()
+        self.lod = summary is not None and \
+            summary.count(target.min_ord, target.max_ord) * self.LOD_PIXELS_PER_RECORD > window_width_px
+        if self.lod:
+            # Too many records to tell apart; none are fetched, and they are laid out again on zooming back in.
+            self._changed_ids.update(self._layout_ids)
+            self.layout.clear()
+            self._layout_ids = []
+            self._layout_records = {}
+            self._bounds = np.empty((0, 4))
+            self._lanes = np.empty(0, dtype=np.int64)
+            return
+
+        records = self.get_visible()
+        old_ids = set(self._layout_ids)
+        self._layout_ids = [rec.id for rec in records]
+        self._layout_records = dict(zip(self._layout_ids, records))
+        self._changed_ids.update(old_ids.symmetric_difference(self._layout_ids))
+        self._bounds = np.array([[_ordinal_of(rec.start.min), _ordinal_of(rec.start.max),
+                                  _ordinal_of(rec.end.min), _ordinal_of(rec.end.max)] for rec in records],
+                                dtype=np.float64).reshape(-1, 4)
+        # Labels are only measured here; they are rendered once their lanes are scrolled into view.
+        label_widths = np.array([pgm.text_size(rec.name)[0] for rec in records])
+        if self.layout.update(self._layout_ids, self._bounds[:, 0], self._bounds[:, 3], label_widths,
+                              scale=target.scale):
+            self._layers_stale = True  # Records may have moved lanes.
+        entries = self.layout.entries
+        self._lanes = np.array([entries[rec_id].lane for rec_id in self._layout_ids], dtype=np.int64)
+
+    def calculate_record_positions(self, transform: data_types.ViewTransform, window_height_px: int):
+        """
+        Figure out where to draw the laid-out records in the lanes within the window, by projecting all their
+        ordinal bounds to pixels at once. Records in lanes scrolled out of the window are skipped.
 
         Args:
-            min_date: The beginning of the visible time range.
-            max_date: The end of the visible time range.
+            transform: The mapping from ordinals to x coordinates for the frame being drawn.
+            window_height_px: Current height of the drawable window in pixels.
+        """
+        self.label_infos = []
+        self._record_extents = {}
+        self._pinned_px = 0
+        self._hit_grid = None
+        self._pick_bounds = (0, 0, transform.width, window_height_px)
+
+        # Center the stack of lanes vertically if it fits in the window, or else scroll it, no further than its
+        # bottom lane as lanes come and go.
+        stack_px = self.layout.lane_count * self.lane_height
+        self._max_scroll_px = max(0, stack_px - window_height_px)
+        self.scroll_px = min(self.scroll_px, self._max_scroll_px)
+        self._drawn_scroll_px = self.scroll_px
+        self._stack_top = -self.scroll_px if self._max_scroll_px else (window_height_px - stack_px) // 2
+        if not self._layout_ids:
+            return
+        first_lane = max(0, -self._stack_top // self.lane_height)
+        last_lane = (window_height_px - 1 - self._stack_top) // self.lane_height
+        rows = np.flatnonzero((self._lanes >= first_lane) & (self._lanes <= last_lane))
+
+        # Bounds far off-screen, infinite ones included, are pinned a window's width past its edges. That is far
+        # enough that scrolling the layers by less than a width never brings a record's clipped end into sight.
+        # They are then snapped to whole pixels, first rounding away errors in the ordinals, so a record drawn
+        # before and after scrolling by whole pixels covers the same pixels both times.
+        x_vals = np.clip(transform.to_x(self._bounds[rows]), -transform.width, 2 * transform.width)
+        x_vals = np.floor(x_vals.round(3)).astype(np.int64).tolist()
+
+        lane_height = self.lane_height
+        for row, xs, lane in zip(rows.tolist(), x_vals, self._lanes[rows].tolist()):
+            rec_id = self._layout_ids[row]
+            label_surf = pgm.render_text(self._layout_records[rec_id].name)
+            lane_top = self._stack_top + lane * lane_height
+            xss, xse, xes, xee = xs
+            label_rect = pygame.Rect(xss, lane_top, max(xee - xss, label_surf.get_width()), lane_height)
+
+            # The label follows the start of the record, but is pinned to the left edge so it stays on-screen.
+            label_x = xse if xse <= xes else xss
+            if label_x > 0:
+                label_x += LABEL_BUFFER
+            else:
+                label_x = LABEL_BUFFER
+                self._pinned_px = max(self._pinned_px, LABEL_BUFFER + label_surf.get_width())
+            left = math.floor(min(xss, label_x))
+            extent = pygame.Rect(left, lane_top, math.ceil(max(xee, label_x + label_surf.get_width())) - left + 2,
+                                 lane_height)
+            self.label_infos.append(LabelInfo(id=rec_id, x_vals=xs, label_surf=label_surf, label_rect=label_rect,
+                                              label_pos=(label_x, lane_top + 2), extent=extent))
+            self._record_extents[rec_id] = extent
+
+    def pick(self, x: float, y: float) -> Optional[str]:
+        """
+        Returns:
+            The id of the record drawn at a position in the window, or None if there is none.
+        """
+        hits = self._hits().at(x, y)
+        return self.label_infos[hits[-1]].id if hits else None  # The last drawn is on top.
 
+    def pick_area(self, area: pygame.Rect) -> List[str]:
+        """
         Returns:
-            A list of TimePoints within the given range at which to draw orientation guidelines.
-        """
-
-        # Choose guidelines to show to always/usually show at least one, but not too many.
-        # 0<span<1 - show no guidelines
-        # 1<span<5 - show all years
-        # 5<span<10 - show even-numbered years
-        # 10<span<50 - show every 10
-        # 50<span<100 - show every 50
-        # <100 - every 100
-        span = max_date.year - min_date.year
-        mod = 1 if 0 < span <= 5 else \
-            2 if 5 < span <= 10 else \
-            10 if 10 < span <= 50 else \
-            50 if 50 < span <= 100 else \
-            100
-
-        # Use the mod to find the specific dates to draw
-        # Note that The max date's year should be visible; the min date's year may not.
-        chosen_dates = []
-        for year in range(min_date.year+1, max_date.year+1):
-            if year % mod == 0:
-                chosen_dates.append(TimePoint(year=year, month=1, day=1))
-        if len(chosen_dates) > 20:  # Too many lines; view gets busy.
-            desired_max = 10  # Ten is pretty reasonable to keep.
-            skip = int(len(chosen_dates) / desired_max)
-            new_dates = []
-            for ii in range(0, len(chosen_dates), skip):
-                new_dates.append(chosen_dates[ii])
-            chosen_dates = new_dates
-
-        return chosen_dates
-
-    def calculate_record_positions(self,
-                                   visible_records: List[data_types.EventRecord],
-                                   window_width_px: int,
-                                   window_height_px: int,
-                                   timeview_range: Tuple[int, int],
-                                   ):
-        """
-        Figure out where to draw all the records on the window.
+            The ids of the records drawn at least partly within an area of the window, in drawing order.
+        """
+        return [self.label_infos[index].id for index in self._hits().overlapping((area.left, area.top,
+                                                                                  area.right, area.bottom))]
+
+    def _hits(self) -> data_types.HitGrid:
+        if self._hit_grid is None:
+            extents = np.array([(e.left, e.top, e.right, e.bottom) for e in (li.extent for li in self.label_infos)])
+            self._hit_grid = data_types.HitGrid(extents, bounds=self._pick_bounds)
+        return self._hit_grid
+
+    def hover(self, pos: Optional[Tuple[int, int]]):
+        """
+        Highlight the record at a position in the window, and describe it in a tooltip beside the position.
+        The record's info is only read when it is first hovered.
 
         Args:
-            visible_records: All records that are to be positioned. May be a subset or everything.
-            screen_width_px: Current width of the drawable window in pixels.
-            screen_height_px: Current height of the drawable window in pixels.
-            timeview_range: Ordinal min/max values of the beginning/end of the visible timeline.
+            pos: The position, e.g. of the mouse, or None to hide the highlight and tooltip.
         """
-        # Generate all drawable labels and figure out the horizontal extents of each EventRecord.
-        self.label_infos = []
-        for rec in visible_records:
-            w_range = (0, window_width_px)
-            xss = -10 if rec.start.min == -math.inf else interpolate(rec.start.min.ordinal(), timeview_range, w_range)
-            xse = window_width_px+10 if rec.start.max == math.inf else interpolate(rec.start.max.ordinal(), timeview_range, w_range)
-            xes = -10 if rec.end.min == -math.inf else interpolate(rec.end.min.ordinal(), timeview_range, w_range)
-            xee = window_width_px+10 if rec.end.max == math.inf else interpolate(rec.end.max.ordinal(), timeview_range, w_range)
-            antialias = True  # render takes no keyword arguments.
-            label_surf = pgm.get_font().render(rec.name, antialias, color.BLACK)
-            lw, lh = label_surf.get_size()
-            label_rect = pygame.rect.Rect((0, 0), (xee-xss, lh+4))  # build a rect around the whole rendered record.
-            label_rect.midleft = (xss, window_height_px/2)  # Start by vertically centering all labels.
-            label_rect.width = max(label_rect.width, label_surf.get_size()[0])
-            self.label_infos.append(LabelInfo(id=rec.id, x_vals=[xss, xse, xes, xee], label_surf=label_surf, label_rect=label_rect))
-
-        min_y = self.label_infos[0].label_rect.midleft[1]
-        max_y = self.label_infos[0].label_rect.midleft[1]
-        if len(self.label_infos) > 1:
-            # Deconflict as needed to position each label.
-            deconflicted_rects = []
-
-            # Settings to determine how events are arranged.
-            deconflict_claw = False  # If true, alternate deconflicting records up and down to keep everything more centered.
-            center_new_events = False  # Whether new events should be centered vertically if possible, or continue outward.
-            deconflict_up = False  # Starting deconfliction direction.
-
-            min_top = self.label_infos[0].label_rect.top
-            for li in self.label_infos:
-                xss, xse, xes, xee = li.x_vals
-
-                lr: pygame.rect.Rect = li.label_rect
-                if not center_new_events:
-                    lr.top = min_top
-                idx = lr.collidelist(deconflicted_rects)
-                while idx != -1:
-                    # Find the rect we are hitting and move past it.
-                    other: pygame.Rect = deconflicted_rects[idx]
-                    if deconflict_up:
-                        lr.bottom = other.top
-                    else:
-                        lr.top = other.bottom
-                    idx = lr.collidelist(deconflicted_rects)
-                deconflict_up = not deconflict_up if deconflict_claw else deconflict_up
-                min_y = lr.midleft[1] if lr.midleft[1] < min_y else min_y
-                max_y = lr.midleft[1] if lr.midleft[1] > max_y else max_y
-                min_top = lr.bottom
-                deconflicted_rects.append(lr)
-
-        # Recenter the whole list of records vertically.
-        v_span = max_y - min_y
-        buffer = (window_height_px - v_span) / 2  # This much empty space above and below everything.
-        offset = buffer - min_y  # Move records up this much to center them.
-        for li in self.label_infos:
-            li.label_rect.midleft = (li.label_rect.midleft[0], li.label_rect.midleft[1] + offset)
+        rec_id = self.pick(*pos) if pos is not None else None
+        if rec_id != self.hover_id:
+            self.hover_id = rec_id
+            self._tooltip = self.describe(rec_id) if rec_id is not None else []
+            self._overlay_stale = True
+        elif rec_id is not None and pos != self._hover_pos:
+            self._overlay_stale = True  # The tooltip follows the pointer.
+        self._hover_pos = pos
+
+    def describe(self, rec_id: str) -> List[str]:
+        """
+        Returns:
+            Lines of text describing a record in the layout: its name, its bounds, then its info, which is read
+            from its source file now if it was left there when loading.
+        """
+        rec = self._layout_records[rec_id]
+        lines = [rec.name, f"Start: {_format_reference(rec.start)}", f"End: {_format_reference(rec.end)}"]
+        try:
+            info = [line for item in algorithms.expand_info(rec.info) for line in str(item).splitlines()]
+        except (data_types.StaleSourceError, OSError, yaml.YAMLError) as err:
+            get_logger().warning(f"Failed to read the info of {rec_id}: {err}")
+            info = []
+        for line in info[:self.TOOLTIP_INFO_LINES]:
+            lines.append(line if len(line) <= self.TOOLTIP_CHARS else line[:self.TOOLTIP_CHARS - 1] + "…")
+        if len(info) > self.TOOLTIP_INFO_LINES:
+            lines.append(f"(and {len(info) - self.TOOLTIP_INFO_LINES} more)")
+        return lines
+
+    def draw_density(self, surf: pygame.Surface, transform: data_types.ViewTransform):
+        """
+        Draw how many records are in progress across the view as columns read from the timeline's summary,
+        and label each band of adjoining columns with the exact number of records it holds.
+
+        Args:
+            surf: The surface to draw on.
+            transform: The mapping from ordinals to x coordinates for the frame being drawn.
+        """
+        width, height = surf.get_size()
+        summary = self.timeline.summary()
+        column_px = self.LOD_COLUMN_PX
+        counts = summary.columns(transform.min_ord, transform.max_ord, math.ceil(width / column_px))
+        peak = int(counts.max()) if len(counts) else 0
+        if not peak:
+            return
+
+        # Heights grow with the log of the count, so sparse stretches stay visible beside dense ones.
+        middle = height // 2
+        half_heights = np.maximum(1, np.log1p(counts) / math.log1p(peak) * height * 0.4).astype(np.int64)
+        for column in np.flatnonzero(counts).tolist():
+            half = int(half_heights[column])
+            pygame.draw.rect(surface=surf, color=color.STEEL_BLUE,
+                             rect=(column * column_px, middle - half, column_px, 2 * half))
+
+        # Bands are runs of non-empty columns; edges alternate between where one starts and where it stops.
+        edges = np.flatnonzero(np.diff(np.concatenate([[0], counts > 0, [0]]).astype(np.int8))).tolist()
+        for first, stop in zip(edges[::2], edges[1::2]):
+            lo, hi = transform.to_ordinal(first * column_px), transform.to_ordinal(stop * column_px)
+            text = pgm.render_text(f"{summary.count(lo, hi):,}")
+            if text.get_width() + 4 <= (stop - first) * column_px:
+                top = middle - int(half_heights[first:stop].max()) - text.get_height() - 2
+                surf.blit(text, (first * column_px + 2, top))
@@ -0,0 +1,44 @@
+from typing import Union
+import numpy as np
+
+# The narrowest range a view is drawn over, in days, so a degenerate range never divides by zero.
+MIN_VIEW_DAYS = 1e-9
+
+Ordinals = Union[float, np.ndarray]
+
+
+class ViewTransform:
+    """
+    The mapping between ordinal days and window x coordinates for one view range and window width.
+    Both directions take either a single value or a NumPy array, which is mapped in one vector operation.
+    """
+    __slots__ = ('min_ord', 'max_ord', 'width', 'scale')
+
+    def __init__(self, min_ord: float, max_ord: float, width: int):
+        """
+        Args:
+            min_ord: The ordinal day at the window's left edge.
+            max_ord: The ordinal day at the window's right edge.
+            width: The window's width in pixels.
+        """
+        self.min_ord = min_ord
+        self.max_ord = max_ord
+        self.width = width
+        self.scale: float = width / max(max_ord - min_ord, MIN_VIEW_DAYS)  # Pixels per day.
+
+    def __repr__(self) -> str:
+        return f"ViewTransform(min_ord={self.min_ord}, max_ord={self.max_ord}, width={self.width})"
+
+    def to_x(self, ordinals: Ordinals) -> Ordinals:
+        """
+        Returns:
+            The window x coordinate of each ordinal. Infinite ordinals map to infinite coordinates.
+        """
+        return (ordinals - self.min_ord) * self.scale
+
+    def to_ordinal(self, xs: Ordinals) -> Ordinals:
+        """
+        Returns:
+            The ordinal day at each window x coordinate.
+        """
+        return self.min_ord + xs / self.scale
@@ -0,0 +1,164 @@
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+import threading
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from logs import get_logger
+
+# inotify event flags, from <sys/inotify.h>.
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+# Editors usually save by writing in place or by writing a new file and renaming it over the old one.
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+# struct inotify_event: int wd; uint32_t mask, cookie, len; char name[len];
+EVENT_HEADER = struct.Struct('iIII')
+
+
+def _load_inotify() -> Optional[ctypes.CDLL]:
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+class FileWatcher:
+    """
+    Watches a set of files for changes from a background thread. Uses inotify where it is available,
+    and otherwise polls each file's modification time and size.
+    Changes are collected until a file has been quiet for SETTLE_TIME, so a save that takes several
+    writes is only reported once.
+    """
+
+    POLL_INTERVAL = 0.5  # Seconds between checks when polling.
+    SETTLE_TIME = 0.1  # Seconds a file must go unchanged before its change is reported.
+
+    def __init__(self, paths: Iterable[str], use_inotify: bool = True):
+        """
+        Args:
+            paths: The files to watch.
+            use_inotify: If False, always poll, even where inotify is available.
+        """
+        self._lock = threading.Lock()
+        self._paths: Set[str] = set()
+        self._stats: Dict[str, Optional[Tuple[int, int]]] = {}
+        self._changed: Dict[str, float] = {}  # Map path to the time of its most recent change.
+        self._stop = threading.Event()
+
+        self._libc = _load_inotify() if use_inotify else None
+        self._fd = -1
+        self._watch_dirs: Dict[int, str] = {}  # Map inotify watch descriptor to directory.
+        if self._libc is not None:
+            self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if self._fd < 0:
+                get_logger().warning(f"inotify unavailable ({os.strerror(ctypes.get_errno())}); polling files instead.")
+                self._libc = None
+
+        self.watch(paths)
+        target = self._inotify_loop if self._libc is not None else self._poll_loop
+        self._thread = threading.Thread(target=target, daemon=True)
+        self._thread.start()
+
+    @property
+    def using_inotify(self) -> bool:
+        return self._libc is not None
+
+    def watch(self, paths: Iterable[str]):
+        """
+        Replace the set of watched files, e.g. after a reload changed which files are included.
+        """
+        paths = {os.path.realpath(path) for path in paths}
+        with self._lock:
+            for path in paths - self._paths:
+                self._stats[path] = self._stat(path)
+            for path in self._paths - paths:
+                self._stats.pop(path, None)
+            self._paths = paths
+        if self._libc is not None:
+            watched_dirs = set(self._watch_dirs.values())
+            for directory in {os.path.dirname(path) for path in paths} - watched_dirs:
+                wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+                if wd < 0:
+                    get_logger().warning(f"Unable to watch {directory}: {os.strerror(ctypes.get_errno())}")
+                else:
+                    self._watch_dirs[wd] = directory
+
+    def poll(self) -> Set[str]:
+        """
+        Returns:
+            The watched files that changed since the last call and have since settled.
+        """
+        now = time.monotonic()
+        with self._lock:
+            settled = {path for path, when in self._changed.items() if now - when >= self.SETTLE_TIME}
+            for path in settled:
+                del self._changed[path]
+        return settled
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def _mark_changed(self, path: str):
+        with self._lock:
+            if path in self._paths:
+                self._changed[path] = time.monotonic()
+
+    @staticmethod
+    def _stat(path: str) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _poll_loop(self):
+        while not self._stop.wait(self.POLL_INTERVAL):
+            with self._lock:
+                paths = list(self._paths)
+            for path in paths:
+                stat = self._stat(path)
+                with self._lock:
+                    if path in self._stats and self._stats[path] != stat:
+                        self._stats[path] = stat
+                        self._changed[path] = time.monotonic()
+
+    def _inotify_loop(self):
+        while not self._stop.is_set():
+            ready, _, _ = select.select([self._fd], [], [], self.POLL_INTERVAL)
+            if not ready:
+                continue
+            try:
+                buffer = os.read(self._fd, 64 * 1024)
+            except OSError as err:
+                if err.errno == errno.EAGAIN:
+                    continue
+                raise
+            offset = 0
+            while offset + EVENT_HEADER.size <= len(buffer):
+                wd, mask, cookie, length = EVENT_HEADER.unpack_from(buffer, offset)
+                offset += EVENT_HEADER.size
+                name = buffer[offset:offset + length].rstrip(b'\0')
+                offset += length
+                directory = self._watch_dirs.get(wd)
+                if directory is not None and name:
+                    self._mark_changed(os.path.join(directory, os.fsdecode(name)))
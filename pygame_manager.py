@@ -1,13 +1,77 @@
 
+from collections import OrderedDict
+from typing import Tuple
+
 import pygame
 from pygame.locals import *
 
 from logs import get_logger
+import color
+
+
+class TextCache:
+    """
+    Keeps rendered text surfaces, keyed by (text, font size, colour), so labels that are drawn frame after frame
+    are only rendered once. Surfaces are converted to the display's pixel format when there is a display, so
+    blitting them is a straight copy. The least recently used surfaces are dropped once their pixels take more
+    than `max_bytes`.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.bytes = 0  # Pixel memory of the surfaces currently held.
+        self.hits = 0
+        self.misses = 0
+        self._surfaces: 'OrderedDict[Tuple[str, int, Tuple[int, ...]], pygame.Surface]' = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._surfaces)
+
+    def get(self, text: str, size: int = 12, text_color: Tuple[int, ...] = color.BLACK) -> pygame.Surface:
+        """
+        Returns:
+            The antialiased rendering of `text` in the given font size and colour, from the cache if it is there.
+            The surface is shared, so must not be drawn on.
+        """
+        key = (text, size, tuple(text_color))
+        surf = self._surfaces.get(key)
+        if surf is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            return surf
+
+        self.misses += 1
+        surf = PyGameManager.get_font(size).render(text, True, text_color)
+        if pygame.display.get_surface() is not None:
+            surf = surf.convert_alpha()
+        self._surfaces[key] = surf
+        self.bytes += self._size_of(surf)
+        while self.bytes > self.max_bytes and len(self._surfaces) > 1:
+            _, evicted = self._surfaces.popitem(last=False)
+            self.bytes -= self._size_of(evicted)
+        return surf
+
+    def hit_rate(self) -> float:
+        """
+        Returns:
+            The fraction of lookups answered from the cache so far.
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def clear(self):
+        self._surfaces.clear()
+        self.bytes = 0
+
+    @staticmethod
+    def _size_of(surf: pygame.Surface) -> int:
+        return surf.get_width() * surf.get_height() * surf.get_bytesize()
 
 
 class PyGameManager:
     fonts = {}
     screen = None
+    text_cache = TextCache()
 
     @staticmethod
     def initialize():
@@ -16,6 +80,10 @@ class PyGameManager:
 
     @staticmethod
     def terminate():
+        cache = PyGameManager.text_cache
+        get_logger().debug(f'Text cache: {len(cache)} surfaces, {cache.bytes:,} bytes, {cache.hit_rate():.1%} hit rate')
+        # Surfaces converted for this display are useless to the next one.
+        cache.clear()
         pygame.quit()
 
     @staticmethod
@@ -33,3 +101,17 @@ class PyGameManager:
             font = pygame.font.Font('freesansbold.ttf', size)
             PyGameManager.fonts[size] = font
         return PyGameManager.fonts[size]
+
+    @staticmethod
+    def render_text(text: str, size: int = 12, text_color: Tuple[int, ...] = color.BLACK) -> pygame.Surface:
+        """
+        Render text through the shared TextCache. The returned surface must not be drawn on.
+        """
+        return PyGameManager.text_cache.get(text, size, text_color)
+
+    @staticmethod
+    def text_size(text: str, size: int = 12) -> Tuple[int, int]:
+        """
+        Measure the (width, height) text would be rendered at, without rendering it.
+        """
+        return PyGameManager.get_font(size).size(text)
@@ -0,0 +1,176 @@
+import os
+import sys
+import json
+import stat
+import time
+import socket
+import threading
+from queue import Queue, Empty, Full
+from typing import BinaryIO, Dict, List, Optional
+
+from data_types import Timeline
+from logs import get_logger
+
+
+def parse_record_line(line: bytes) -> Optional[Dict]:
+    """
+    Convert one line of newline-delimited JSON into a record dictionary, shaped like a record read from YAML.
+    Numbers and other scalars become strings, as YAML scalars do; null fields are dropped.
+
+    Returns:
+        The record dictionary, or None for a blank line.
+
+    Raises:
+        ValueError if the line isn't a JSON object.
+    """
+    line = line.strip()
+    if not line:
+        return None
+    obj = json.loads(line)
+    if not isinstance(obj, dict):
+        raise ValueError(f"Expected a JSON object, got {type(obj).__name__}")
+    record = {}
+    for key, value in obj.items():
+        if value is None:
+            continue
+        record[key] = [str(item) for item in value] if isinstance(value, list) else str(value)
+    return record
+
+
+class RecordStream:
+    """
+    Feeds records into a Timeline as they arrive, one JSON object per line, from stdin or a local Unix socket.
+    Reader threads parse lines; a single ingest thread gathers them into batches and adds each batch to the
+    timeline, which publishes a new snapshot for the render loop to pick up. Malformed lines are logged and skipped.
+    """
+
+    BATCH_TIME = 0.05  # Seconds adding a batch should take at most, since it holds the timeline's lock meanwhile.
+    BATCH_INTERVAL = 0.05  # Seconds to keep gathering a batch before adding what has arrived.
+    FIRST_BATCH_SIZE = 500  # The most records in the first batch, before the ingest rate has been measured.
+    QUEUE_SIZE = 100000  # Readers wait once this many parsed records are waiting to be added.
+
+    def __init__(self, timeline: Timeline, source: str):
+        """
+        Args:
+            timeline: The timeline to add records to.
+            source: '-' to read from stdin, or the path of a Unix socket to listen on. Any number of
+                producers may connect to the socket, one after another or at once.
+        """
+        self.timeline = timeline
+        self.source = source
+        self.ingested = 0  # Records added to the timeline so far.
+        self.rejected = 0  # Lines or records that couldn't be added.
+        self._batch_size = self.FIRST_BATCH_SIZE  # The most records to add at once, to stay within BATCH_TIME.
+        self._queue: Queue = Queue(maxsize=self.QUEUE_SIZE)
+        self._stop = threading.Event()
+        self._server: Optional[socket.socket] = None
+
+        if source == '-':
+            reader = threading.Thread(target=self._read_lines, args=(sys.stdin.buffer,), daemon=True)
+        else:
+            self._server = self._listen(source)
+            reader = threading.Thread(target=self._accept_loop, daemon=True)
+        reader.start()
+        self._ingester = threading.Thread(target=self._ingest_loop, daemon=True)
+        self._ingester.start()
+
+    def close(self):
+        self._stop.set()
+        if self._server is not None:
+            self._server.close()
+            try:
+                os.unlink(self.source)
+            except OSError:
+                pass
+        self._ingester.join()
+
+    @staticmethod
+    def _listen(path: str) -> socket.socket:
+        # Clear away a socket left behind by an earlier run, but never an ordinary file.
+        if os.path.exists(path) and stat.S_ISSOCK(os.stat(path).st_mode):
+            os.unlink(path)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(path)
+        server.listen()
+        return server
+
+    def _accept_loop(self):
+        while not self._stop.is_set():
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                return  # The server socket was closed.
+            threading.Thread(target=self._read_connection, args=(conn,), daemon=True).start()
+
+    def _read_connection(self, conn: socket.socket):
+        with conn, conn.makefile('rb') as stream:
+            self._read_lines(stream)
+
+    def _read_lines(self, stream: BinaryIO):
+        log = get_logger()
+        for line in stream:
+            try:
+                record = parse_record_line(line)
+            except ValueError as err:
+                self.rejected += 1
+                log.warning(f"Skipping unreadable streamed record: {err}")
+                continue
+            if record is None:
+                continue
+            while not self._stop.is_set():
+                try:
+                    self._queue.put(record, timeout=0.1)
+                    break
+                except Full:
+                    continue
+            if self._stop.is_set():
+                return
+
+    def _next_batch(self) -> List[Dict]:
+        try:
+            batch = [self._queue.get(timeout=0.1)]
+        except Empty:
+            return []
+        deadline = time.monotonic() + self.BATCH_INTERVAL
+        while len(batch) < self._batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except Empty:
+                break
+        return batch
+
+    def _ingest_loop(self):
+        log = get_logger()
+        while not self._stop.is_set():
+            batch = self._next_batch()
+            if not batch:
+                continue
+            started = time.perf_counter()
+            try:
+                self.ingested += len(self.timeline.ingest(batch))
+            except Exception as err:
+                self.rejected += len(batch)
+                log.error(f"Dropped a batch of {len(batch)} streamed records: {err}")
+                continue
+            self._batch_size = self.next_batch_size(self._batch_size, len(batch), time.perf_counter() - started)
+
+    @classmethod
+    def next_batch_size(cls, limit: int, size: int, elapsed: float) -> int:
+        """
+        Size the next batch to take BATCH_TIME at the rate the last one was added, since the cost per record
+            depends on how the records refer to each other. Growing at most twofold keeps one quick batch from
+            overshooting.
+
+        Args:
+            limit: The most records the last batch could hold.
+            size: The number of records in the last batch.
+            elapsed: Seconds it took to add the last batch.
+
+        Returns:
+            The most records the next batch should hold.
+        """
+        fitted = int(size * cls.BATCH_TIME / elapsed) if elapsed > 0 else 2 * limit
+        return max(1, min(fitted, 2 * limit))
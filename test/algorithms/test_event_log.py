@@ -0,0 +1,86 @@
+
+import os
+import gzip
+import json
+import shutil
+import tempfile
+import unittest
+
+from algorithms import parse_timestamps, read_event_log
+from data_types import TimePoint
+
+
+class TestEventLogReading(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.tmp_dir, name)
+
+    def test_parse_timestamps(self):
+
+        # Arrange
+        expected = TimePoint(year=2024, month=3, day=1, seconds=9 * 3600 + 30 * 60 + 0.25).ordinal()
+
+        # Act
+        iso = parse_timestamps(["2024-03-01T09:30:00.25", "2024-03-01 09:30:00.25", "2024-03-01T11:30:00.25+02:00"])
+        epoch = parse_timestamps(["1709285400.25", 1709285400.25])
+
+        # Assert
+        for ordinal in list(iso) + list(epoch):
+            self.assertAlmostEqual(ordinal, expected, delta=1e-3 / 86400)
+        with self.assertRaises(ValueError):
+            parse_timestamps(["yesterday"])
+
+    def test_csv(self):
+
+        # Arrange
+        path = self._path("log.csv")
+        with open(path, 'w') as file:
+            file.write("when,until,what\n"
+                       "2024-03-01T00:01:00,2024-03-01T00:02:00,second\n"
+                       "2024-03-01T00:00:00,,first\n")
+
+        # Act
+        log = read_event_log(path, start_column='when', end_column='until', name_column='what')
+
+        # Assert
+        self.assertEqual(len(log), 2)
+        first, second = log.query_range(log.min, log.max)
+        self.assertEqual((first.id, first.name), ('1', 'first'))
+        self.assertEqual(first.end.max, first.start.min)  # No end means an instantaneous event.
+        self.assertEqual(second.end.max, TimePoint(year=2024, month=3, day=1, seconds=120))
+
+    def test_json_lines_gzip(self):
+
+        # Arrange
+        path = self._path("log.jsonl.gz")
+        with gzip.open(path, 'wt') as file:
+            for row in range(3):
+                file.write(json.dumps({'id': f"ev{row}", 'name': f"event {row}",
+                                       'start': 1709251200 + row, 'end': 1709251200 + row + 0.5}) + "\n")
+
+        # Act
+        log = read_event_log(path)
+
+        # Assert
+        records = log.query_range(log.min, log.max)
+        self.assertEqual([rec.id for rec in records], ['ev0', 'ev1', 'ev2'])
+        self.assertEqual(records[2].start.min, TimePoint(year=2024, month=3, day=1, seconds=2))
+        self.assertEqual(records[2].end.max, TimePoint(year=2024, month=3, day=1, seconds=2.5))
+
+    def test_missing_start(self):
+
+        # Arrange
+        path = self._path("log.csv")
+        with open(path, 'w') as file:
+            file.write("start,name\n,nothing\n")
+
+        # Act
+        # Assert
+        with self.assertRaises(ValueError):
+            read_event_log(path)
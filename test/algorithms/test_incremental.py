@@ -0,0 +1,61 @@
+import unittest
+
+from algorithms import construct_records, preprocess_event_data, update_records, add_records
+from data_types import EventData, TimePoint
+
+
+class TestUpdateRecords(unittest.TestCase):
+
+    @staticmethod
+    def _datas(death: str):
+        record_list = [{'name': 'Life', 'id': 'life', 'start': 'birth', 'end': 'death'},
+                       {'name': 'Birth', 'id': 'birth', 'start': '17 Aug 1970', 'end': '17 Aug 1970'},
+                       {'name': 'Death', 'id': 'death', 'start': death, 'end': death},
+                       {'name': 'Other', 'id': 'other', 'start': '1 Jan 1800'},
+                       ]
+        return preprocess_event_data([EventData.parse(rec) for rec in record_list])
+
+    def test_only_dependents_rebuilt(self):
+
+        # Arrange
+        records = construct_records(self._datas('5 Jun 2040'))
+
+        # Act
+        new_records, rebuilt = update_records(records, self._datas('9 Sep 2050'), changed_ids={'death'})
+
+        # Assert
+        self.assertEqual(rebuilt, {'death', 'life'})
+        self.assertEqual(list(new_records.keys()), ['life', 'birth', 'death', 'other'])
+        self.assertIs(new_records['birth'], records['birth'])
+        self.assertIs(new_records['other'], records['other'])
+        self.assertEqual(new_records['life'].end.max, TimePoint(year=2050, month=9, day=9))
+        self.assertEqual(records['life'].end.max, TimePoint(year=2040, month=6, day=5))
+
+
+
+class TestAddRecords(unittest.TestCase):
+
+    def test_dated_records_match_full_resolution(self):
+
+        # Arrange - records fixed by dates alone, which skip the reference-following resolver, and one that isn't.
+        record_list = [{'name': 'Reign', 'id': 'reign', 'start': 'Mar 1500', 'end': '1530'},
+                       {'name': 'Open', 'id': 'open', 'start': '1 Jan 1800'},
+                       {'name': 'Bounded', 'id': 'bounded', 'start_after': '1600', 'end_before': '1650'},
+                       {'name': 'Voyage', 'id': 'voyage', 'start': '1 Jun 1700', 'duration': '2y'},
+                       {'name': 'Heir', 'id': 'heir', 'start': 'reign$', 'duration': '10y'},
+                       ]
+        datas = preprocess_event_data([EventData.parse(rec) for rec in record_list])
+        expected = construct_records(preprocess_event_data([EventData.parse(rec) for rec in record_list]))
+
+        # Act
+        records = add_records({}, datas)
+
+        # Assert
+        for rec_id, rec in expected.items():
+            self.assertEqual((records[rec_id].start.min, records[rec_id].start.max,
+                              records[rec_id].end.min, records[rec_id].end.max),
+                             (rec.start.min, rec.start.max, rec.end.min, rec.end.max), rec_id)
+
+
+if __name__ == '__main__':
+    unittest.main()
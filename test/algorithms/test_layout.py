@@ -0,0 +1,51 @@
+
+import unittest
+
+import numpy as np
+
+from algorithms import assign_lanes
+
+
+class TestAssignLanes(unittest.TestCase):
+
+    def test_reuses_lowest_free_lane(self):
+
+        # Arrange
+        lefts = np.array([0, 1, 2, 5, 6, 10])
+        rights = np.array([4, 3, 7, 8, 9, 11])
+
+        # Act
+        lanes, lane_count = assign_lanes(lefts, rights)
+
+        # Assert
+        # Lane 1 comes free at 3 and lane 0 at 4; both are taken again at 5 and 6, lowest first.
+        self.assertEqual(lanes.tolist(), [0, 1, 2, 0, 1, 0])
+        self.assertEqual(lane_count, 3)
+
+    def test_touching_extents_share_a_lane(self):
+        lanes, lane_count = assign_lanes(np.array([0, 5, 10]), np.array([5, 10, 15]))
+        self.assertEqual(lanes.tolist(), [0, 0, 0])
+        self.assertEqual(lane_count, 1)
+
+    def test_minimal_and_non_overlapping(self):
+
+        # Arrange
+        rng = np.random.default_rng(7)
+        lefts = rng.uniform(0, 1000, 2000)
+        rights = lefts + rng.exponential(20, 2000)
+
+        # Act
+        lanes, lane_count = assign_lanes(lefts, rights)
+
+        # Assert
+        for lane in range(lane_count):
+            rows = np.nonzero(lanes == lane)[0]
+            rows = rows[np.argsort(lefts[rows])]
+            self.assertTrue(np.all(rights[rows][:-1] <= lefts[rows][1:]))
+        # The most extents overlapping at once, found at some extent's left edge.
+        depth = max(np.count_nonzero((lefts <= x) & (rights > x)) for x in lefts)
+        self.assertEqual(lane_count, depth)
+
+    def test_empty(self):
+        lanes, lane_count = assign_lanes(np.array([]), np.array([]))
+        self.assertEqual((len(lanes), lane_count), (0, 0))
@@ -0,0 +1,312 @@
+
+import os
+import gzip
+import lzma
+import shutil
+import tarfile
+import tempfile
+import unittest
+import zipfile
+from unittest import mock
+
+from algorithms import load_record_dicts, clear_document_cache, expand_info, expand_info_many, build_record_list, \
+    loading
+from data_types import CircularIncludeError, InfoRef, EventData, StaleSourceError
+
+SAMPLE = "test/data/test_sample.yaml"
+
+
+class TestLoadRecordDicts(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        with open(SAMPLE, 'rb') as file:
+            self.sample_bytes = file.read()
+        self.plain_dicts = load_record_dicts([SAMPLE])
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.tmp_dir, name)
+
+    def test_plain(self):
+        self.assertEqual(len(self.plain_dicts), 10)
+
+    def test_gzip(self):
+
+        # Arrange
+        path = self._path("sample.yaml.gz")
+        with gzip.open(path, 'wb') as file:
+            file.write(self.sample_bytes)
+
+        # Act
+        dicts = load_record_dicts([path])
+
+        # Assert
+        self.assertEqual(dicts, self.plain_dicts)
+
+    def test_xz(self):
+
+        # Arrange
+        path = self._path("sample.yaml.xz")
+        with lzma.open(path, 'wb') as file:
+            file.write(self.sample_bytes)
+
+        # Act
+        dicts = load_record_dicts([path])
+
+        # Assert
+        self.assertEqual(dicts, self.plain_dicts)
+
+    def test_zip(self):
+
+        # Arrange - two copies of the sample plus a non-yaml member that should be skipped.
+        path = self._path("bundle.zip")
+        with zipfile.ZipFile(path, 'w') as archive:
+            archive.writestr("a.yaml", self.sample_bytes)
+            archive.writestr("README.txt", b"not a timeline")
+            archive.writestr("nested/b.yml", self.sample_bytes)
+
+        # Act
+        dicts = load_record_dicts([path])
+
+        # Assert
+        self.assertEqual(dicts, self.plain_dicts + self.plain_dicts)
+
+    def test_tar_gz(self):
+
+        # Arrange
+        path = self._path("bundle.tar.gz")
+        with tarfile.open(path, 'w:gz') as archive:
+            archive.add(SAMPLE, arcname="a.yaml")
+            archive.add(SAMPLE, arcname="b.yaml")
+
+        # Act
+        dicts = load_record_dicts([path])
+
+        # Assert
+        self.assertEqual(dicts, self.plain_dicts + self.plain_dicts)
+
+
+class TestIncludes(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        clear_document_cache()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _write(self, name: str, text: str) -> str:
+        path = os.path.join(self.tmp_dir, name)
+        with open(path, 'w') as file:
+            file.write(text)
+        return path
+
+    def test_shared_include_loaded_once(self):
+
+        # Arrange - two regional files which both include the same base file.
+        self._write("base.yaml", "Records:\n- name: Anchor\n  id: anchor\n  start: 1000\n")
+        east = self._write("east.yaml", "Includes: base.yaml\nRecords:\n- name: East\n  start: anchor\n")
+        west = self._write("west.yaml", "Includes: [base.yaml]\nRecords:\n- name: West\n  start: anchor\n")
+
+        # Act
+        dicts = load_record_dicts([east, west])
+
+        # Assert
+        names = [dd['name'] for dd in dicts]
+        self.assertEqual(names, ['Anchor', 'East', 'West'])
+
+    def test_parse_cache(self):
+
+        # Arrange
+        base = self._write("base.yaml", "Records:\n- name: Anchor\n  id: anchor\n")
+
+        # Act
+        with mock.patch("algorithms.loading.parse_document", wraps=loading.parse_document) as parse:
+            load_record_dicts([base])
+            load_record_dicts([base])
+
+        # Assert
+        self.assertEqual(parse.call_count, 1)
+
+    def test_parse_cache_not_kept(self):
+
+        # Arrange
+        base = self._write("base.yaml", "Records:\n- name: Anchor\n  id: anchor\n")
+
+        # Act
+        with mock.patch("algorithms.loading.parse_document", wraps=loading.parse_document) as parse:
+            load_record_dicts([base], keep_documents=False)
+            dicts = load_record_dicts([base], keep_documents=False)
+
+        # Assert
+        self.assertEqual(parse.call_count, 2)
+        self.assertEqual([dd['name'] for dd in dicts], ['Anchor'])
+        self.assertEqual(loading._document_cache, {})
+
+    def test_changed_file_read_again(self):
+
+        # Arrange
+        base = self._write("base.yaml", "Records:\n- name: Anchor\n  id: anchor\n")
+        load_record_dicts([base])
+        self._write("base.yaml", "Records:\n- name: Moved\n  id: anchor\n")
+        stat = os.stat(base)
+        os.utime(base, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))  # In case the clock is too coarse to tell.
+
+        # Act
+        dicts = load_record_dicts([base])
+
+        # Assert
+        self.assertEqual([dd['name'] for dd in dicts], ['Moved'])
+
+    def test_document_without_records(self):
+
+        # Arrange
+        path = self._write("typo.yaml", "records:\n- name: Anchor\n  id: anchor\n")
+
+        # Act
+        with self.assertLogs("timeline", level="WARNING") as logs:
+            dicts = load_record_dicts([path])
+
+        # Assert
+        self.assertEqual(dicts, [])
+        self.assertIn("neither a `Records` nor an `Includes` key", logs.output[0])
+
+    def test_include_cycle(self):
+
+        # Arrange
+        first = self._write("first.yaml", "Includes: second.yaml\nRecords: []\n")
+        self._write("second.yaml", "Includes: first.yaml\nRecords: []\n")
+
+        # Act / Assert
+        with self.assertRaises(CircularIncludeError):
+            load_record_dicts([first])
+
+
+class TestLazyInfo(unittest.TestCase):
+
+    TEXT = ("Records:\n"
+            "- name: Café\n"
+            "  id: cafe\n"
+            "  info:\n"
+            "  - Sourcé one\n"
+            "  - Source two\n"
+            "\n"
+            "- name: Single\n"
+            "  id: single\n"
+            "  info: Only source\n")
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        clear_document_cache()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _check(self, path: str):
+        dicts = load_record_dicts([path])
+        refs = [dd['info'] for dd in dicts]
+        for ref in refs:
+            self.assertIsInstance(ref, InfoRef)
+        self.assertEqual(expand_info([refs[0]]), ['Sourcé one', 'Source two'])
+        self.assertEqual(expand_info(['plain', refs[1]]), ['plain', 'Only source'])
+
+    def test_plain(self):
+        path = os.path.join(self.tmp_dir, "info.yaml")
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(self.TEXT)
+        self._check(path)
+
+    def test_gzip(self):
+        path = os.path.join(self.tmp_dir, "info.yaml.gz")
+        with gzip.open(path, 'wb') as file:
+            file.write(self.TEXT.encode('utf-8'))
+        self._check(path)
+
+    def test_zip(self):
+        path = os.path.join(self.tmp_dir, "info.zip")
+        with zipfile.ZipFile(path, 'w') as archive:
+            archive.writestr("info.yaml", self.TEXT.encode('utf-8'))
+        self._check(path)
+
+    def test_many_gzip(self):
+
+        # Arrange
+        path = os.path.join(self.tmp_dir, "many.yaml.gz")
+        with gzip.open(path, 'wb') as file:
+            file.write("Records:\n".encode('utf-8'))
+            for index in range(50):
+                file.write(f"- name: R{index}\n  info:\n  - Source {index}\n  - Page {index}\n".encode('utf-8'))
+        info_lists = [['plain'] + [dd['info']] for dd in load_record_dicts([path])]
+
+        # Act
+        with mock.patch("algorithms.loading.open_stream", wraps=loading.open_stream) as opened:
+            expanded = expand_info_many(info_lists)
+
+        # Assert - The file is decompressed once for every record's info.
+        self.assertEqual(opened.call_count, 1)
+        self.assertEqual(expanded[7], ['plain', 'Source 7', 'Page 7'])
+        self.assertEqual(expanded, [expand_info(items) for items in info_lists])
+
+    def test_many_tar(self):
+
+        # Arrange
+        first = os.path.join(self.tmp_dir, "a.yaml")
+        with open(first, 'w', encoding='utf-8') as file:
+            file.write(self.TEXT)
+        path = os.path.join(self.tmp_dir, "bundle.tar.gz")
+        with tarfile.open(path, 'w:gz') as archive:
+            archive.add(first, arcname="a.yaml")
+            archive.add(first, arcname="b.yaml")
+        info_lists = [[dd['info']] for dd in load_record_dicts([path])]
+
+        # Act
+        expanded = expand_info_many(list(reversed(info_lists)))
+
+        # Assert
+        self.assertEqual(expanded, [['Only source'], ['Sourcé one', 'Source two']] * 2)
+
+    def test_empty(self):
+
+        # Arrange
+        path = os.path.join(self.tmp_dir, "empty.yaml")
+        with open(path, 'w') as file:
+            file.write("Records:\n- name: Bare\n  info:\n")
+
+        # Act
+        dicts = load_record_dicts([path])
+
+        # Assert
+        self.assertEqual(dicts[0]['info'], [])
+
+    def test_record_info(self):
+
+        # Arrange
+        path = os.path.join(self.tmp_dir, "info.yaml")
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(self.TEXT)
+        records = build_record_list([EventData.parse(dd) for dd in load_record_dicts([path])])
+
+        # Act
+        info = expand_info(records['cafe'].info)
+
+        # Assert - Records keep a reference to their info in the file, which is read when expanded.
+        self.assertEqual(info, ['Sourcé one', 'Source two'])
+
+    def test_stale_source(self):
+
+        # Arrange
+        path = os.path.join(self.tmp_dir, "info.yaml")
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(self.TEXT)
+        ref = load_record_dicts([path])[0]['info']
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write("# An edit moves every offset.\n" + self.TEXT)
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))  # In case the clock is too coarse to tell.
+
+        # Act / Assert
+        with self.assertRaises(StaleSourceError):
+            expand_info([ref])
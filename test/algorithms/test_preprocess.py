@@ -44,6 +44,37 @@ class TestAssignIds(unittest.TestCase):
         self.assertIn('nd2', rec_ids)
         self.assertIn('nd3', rec_ids)
 
+    def test_generate_ids_skip_explicit(self):
+
+        # Arrange - an explicit id occupies one of the generated suffixes.
+        record_list = [{'name': 'Name Duplicate'},
+                       {'name': 'Name Duplicate'},
+                       {'name': 'Other', 'id': 'nd2'},
+                       {'name': 'Name Duplicate'},
+                       ]
+
+        # Act
+        evt_datas = [EventData.parse(rec) for rec in record_list]
+        records: Dict[str, EventData] = preprocess_event_data(evt_datas)
+        rec_ids: List[str] = list(records.keys())
+
+        # Assert
+        self.assertEqual(rec_ids, ['nd2', 'nd', 'nd3', 'nd4'])
+
+    def test_generate_many_ids(self):
+
+        # Arrange
+        count = 20000
+        record_list = [{'name': 'Reign of Someone'} for _ in range(count)]
+
+        # Act
+        evt_datas = [EventData.parse(rec) for rec in record_list]
+        records: Dict[str, EventData] = preprocess_event_data(evt_datas)
+
+        # Assert
+        self.assertEqual(len(records), count)
+        self.assertEqual(evt_datas[-1].id, f'ros{count}')
+
     def test_duplicate_ids(self):
 
         # Arrange - these two records should be merged
@@ -137,3 +168,52 @@ class TestAssignIds(unittest.TestCase):
         self.assertTrue(life_entry.start_before)
         self.assertTrue(life_entry.end_after)
         self.assertTrue(life_entry.end)
+
+    def test_merge_order(self):
+
+        # Arrange
+        record_list = [{'name': 'Life', 'id': 'life', 'start_after': ['c', 'a']},
+                       {'name': 'Life', 'id': 'life', 'start_after': ['b', 'a']},
+                       {'name': 'Life', 'id': 'life', 'start_after': 'd'},
+                       ]
+
+        # Act
+        evt_datas = [EventData.parse(rec) for rec in record_list]
+        records: Dict[str, EventData] = preprocess_event_data(evt_datas)
+
+        # Assert - Constraints keep the order they were first seen in, without repeats.
+        self.assertEqual(records['life'].start_after, ['c', 'a', 'b', 'd'])
+
+    def test_merge_keeps_last(self):
+
+        # Arrange
+        record_list = [{'name': 'Life', 'id': 'life', 'start': '1970'},
+                       {'name': 'A Life', 'id': 'life', 'end': '2040'},
+                       ]
+
+        # Act
+        evt_datas = [EventData.parse(rec) for rec in record_list]
+        records: Dict[str, EventData] = preprocess_event_data(evt_datas)
+
+        # Assert - The last definition is the one kept, name and all, holding every fragment's constraints.
+        self.assertIs(records['life'], evt_datas[-1])
+        self.assertEqual(records['life'].name, 'A Life')
+        self.assertEqual((records['life'].start, records['life'].end), (['1970'], ['2040']))
+
+    def test_merge_conflicts_reported_together(self):
+
+        # Arrange
+        record_list = [{'name': 'A', 'id': 'a', 'duration': '1y'},
+                       {'name': 'A', 'id': 'a', 'duration': '2y'},
+                       {'name': 'B', 'id': 'b', 'duration': '3d'},
+                       {'name': 'B', 'id': 'b', 'duration': '4d'},
+                       ]
+
+        # Act
+        evt_datas = [EventData.parse(rec) for rec in record_list]
+        with self.assertRaises(ValueError) as ctx:
+            preprocess_event_data(evt_datas)
+
+        # Assert
+        self.assertIn('Record a', str(ctx.exception))
+        self.assertIn('Record b', str(ctx.exception))
@@ -0,0 +1,59 @@
+
+import unittest
+
+from algorithms import calendar_ticks
+from data_types import TimePoint
+
+
+class TestCalendarTicks(unittest.TestCase):
+
+    def test_years(self):
+
+        # Arrange
+        # Act
+        ticks = calendar_ticks(TimePoint(1990, 3, 5), TimePoint(2030, 1, 1), max_ticks=10)
+
+        # Assert
+        self.assertEqual([tick.caption for tick in ticks], ['1995', '2000', '2005', '2010', '2015', '2020', '2025', '2030'])
+        self.assertEqual(ticks[0].time, TimePoint(1995, 1, 1))
+
+    def test_vast_span(self):
+
+        # Arrange
+        # Act
+        ticks = calendar_ticks(TimePoint(-1000000, 1, 1), TimePoint(2000, 1, 1), max_ticks=10)
+
+        # Assert
+        # Only the ticks drawn are built, not one per year.
+        self.assertEqual([tick.time.year for tick in ticks], [-1000000, -800000, -600000, -400000, -200000, 0])
+
+    def test_months(self):
+        ticks = calendar_ticks(TimePoint(2020, 1, 30), TimePoint(2021, 5, 1), max_ticks=6)
+        self.assertEqual([tick.caption for tick in ticks], ['Apr 2020', 'Jul 2020', 'Oct 2020', '2021', 'Apr 2021'])
+
+    def test_days(self):
+
+        # Arrange
+        # Act
+        ticks = calendar_ticks(TimePoint(2020, 1, 1), TimePoint(2020, 2, 15), max_ticks=10)
+
+        # Assert
+        # Days restart from the 1st of each month.
+        self.assertEqual([tick.caption for tick in ticks],
+                         ['2020', '6 Jan', '11 Jan', '16 Jan', '21 Jan', '26 Jan', 'Feb 2020', '6 Feb', '11 Feb'])
+
+    def test_times_of_day(self):
+
+        # Arrange
+        # Act
+        hours = calendar_ticks(TimePoint(2020, 1, 1, seconds=80000), TimePoint(2020, 1, 2, seconds=20000), max_ticks=10)
+        seconds = calendar_ticks(TimePoint(2020, 1, 1, seconds=10), TimePoint(2020, 1, 1, seconds=40), max_ticks=10)
+
+        # Assert
+        self.assertEqual([tick.caption for tick in hours], ['23:00', '2 Jan', '01:00', '02:00', '03:00', '04:00', '05:00'])
+        self.assertEqual(hours[1].time, TimePoint(2020, 1, 2))
+        self.assertEqual(seconds[0].caption, '00:00:10')
+        self.assertEqual(len(seconds), 7)
+
+    def test_empty_range(self):
+        self.assertEqual(calendar_ticks(TimePoint(2020, 3, 3), TimePoint(2020, 3, 3)), [])
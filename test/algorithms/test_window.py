@@ -0,0 +1,42 @@
+
+import unittest
+
+from algorithms import preprocess_event_data, prune_to_window, record_dependencies
+from data_types import EventData, TimePoint
+
+
+class TestPruneToWindow(unittest.TestCase):
+
+    def setUp(self):
+        record_list = [{'name': 'Life', 'id': 'life', 'start': 'birth', 'end': 'death'},
+                       {'name': 'Birth', 'id': 'birth', 'start': '17 Aug 1970', 'end': '17 Aug 1970'},
+                       {'name': 'Death', 'id': 'death', 'start': '5 Jun 2040', 'end': '5 Jun 2040'},
+                       {'name': 'Ancient', 'id': 'ancient', 'start': '-500', 'end': '-400'},
+                       {'name': 'Future', 'id': 'future', 'start_after': '3000'},
+                       ]
+        self.event_datas = preprocess_event_data([EventData.parse(rec) for rec in record_list])
+
+    def test_record_dependencies(self):
+
+        # Arrange
+        data = EventData.parse({'name': 'Test', 'start_after': ['^birth - 1y', 'death$', '1900'], 'end': 'life + 2m'})
+
+        # Act
+        deps = record_dependencies(data)
+
+        # Assert
+        self.assertEqual(deps, {'birth', 'death', 'life'})
+
+    def test_prune(self):
+
+        # Arrange
+        window_min = TimePoint(year=1960, month=1, day=1)
+        window_max = TimePoint(year=1980, month=1, day=1)
+
+        # Act
+        required, in_window = prune_to_window(self.event_datas, window_min, window_max)
+
+        # Assert
+        self.assertEqual(in_window, {'life', 'birth'})
+        # Life depends on its death, so death must still be resolved even though it is outside the window.
+        self.assertEqual(list(required.keys()), ['life', 'birth', 'death'])
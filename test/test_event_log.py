@@ -0,0 +1,87 @@
+
+import unittest
+
+import numpy as np
+
+from data_types import EventLog, TimePoint, Timeview
+
+
+class TestEventLog(unittest.TestCase):
+
+    def setUp(self):
+        day = TimePoint(year=2024, month=3, day=1).ordinal()
+        second = 1 / 86400
+        # Out of order on purpose; the log sorts its rows by start.
+        self.starts = np.array([day + 60 * second, day, day + 10 * second, day + 3600 * second])
+        self.ends = np.array([day + 61 * second, day + 5 * second, day + 7200 * second, day + 3601 * second])
+        self.log = EventLog(self.starts, self.ends, ['c', 'a', 'b', 'd'])
+
+    def test_bounds(self):
+        self.assertEqual(self.log.min, TimePoint(year=2024, month=3, day=1))
+        self.assertEqual(self.log.max, TimePoint(year=2024, month=3, day=1, seconds=7200))
+
+    def test_query_range(self):
+
+        # Arrange
+        day = TimePoint(year=2024, month=3, day=1)
+
+        # Act
+        found = self.log.query_range(TimePoint(year=2024, month=3, day=1, seconds=30),
+                                     TimePoint(year=2024, month=3, day=1, seconds=3600))
+
+        # Assert
+        # 'a' ended before the range; 'b' started before it but is still running.
+        self.assertEqual([rec.name for rec in found], ['b', 'c', 'd'])
+        self.assertEqual([rec.id for rec in found], ['2', '0', '3'])
+        self.assertEqual(found[1].start.min, TimePoint(year=2024, month=3, day=1, seconds=60))
+        self.assertEqual(found[1].end.max, TimePoint(year=2024, month=3, day=1, seconds=61))
+        self.assertEqual(self.log.query_range(day.ordinal() - 1, day.ordinal() - 0.5), [])
+
+    def test_query_range_sampled(self):
+
+        # Arrange
+        starts = np.arange(100, dtype=np.float64)
+        log = EventLog(starts, starts + 0.5, [str(row) for row in range(100)])
+        log.MAX_QUERY_RECORDS = 10
+
+        # Act
+        found = log.query_range(0, 100)
+
+        # Assert
+        self.assertEqual(len(found), 10)
+        self.assertEqual((found[0].name, found[-1].name), ('0', '99'))
+
+    def test_overlapping_after_long_event(self):
+
+        # Arrange - one event spans the whole log, so looking back by the longest event would scan every row.
+        rng = np.random.default_rng(0)
+        starts = np.sort(rng.uniform(0, 1000, 500))
+        ends = starts + rng.uniform(0, 2, 500)
+        ends[0] = 1000
+        log = EventLog(starts, ends, [str(row) for row in range(500)])
+
+        # Act
+        rows = log.overlapping(600, 610)
+
+        # Assert
+        expected = np.nonzero((log.starts <= 610) & (log.ends >= 600))[0]
+        self.assertEqual(rows.tolist(), expected.tolist())
+
+    def test_ends_before_start(self):
+        with self.assertRaises(ValueError):
+            EventLog(np.array([2.0]), np.array([1.0]), ['backwards'])
+
+    def test_timeview_below_one_day(self):
+
+        # Arrange
+        view = Timeview(self.log)
+        focus = self.starts[0]
+
+        # Act
+        for _ in range(40):
+            view.zoom_in(focus)
+
+        # Assert
+        self.assertLess(view.max.ordinal() - view.min.ordinal(), 1 / 86400)
+        self.assertTrue(view.contains(focus))
+        self.assertEqual([rec.name for rec in view.get_visible()], ['b', 'c'])
@@ -2,6 +2,7 @@
 import unittest
 
 from data_types import TimeReference, EventRecord, EventData
+from algorithms import build_record_list
 
 
 class TestEventRecord(unittest.TestCase):
@@ -33,3 +34,38 @@ class TestEventRecord(unittest.TestCase):
         self.assertEqual(type(er.info), list)
         self.assertIn('source 1', er.info)
         self.assertIn('source 2', er.info)
+
+    def test_release(self):
+
+        # Arrange
+        record_data = {'name': 'Life', 'id': 'life', 'start': '1900', 'end': '1980', 'info': ['source 1']}
+        records = build_record_list([EventData.parse(record_data)], release=True)
+
+        # Act
+        er = records['life']
+
+        # Assert - Resolved bounds and info are kept, construction state is gone.
+        self.assertIsNone(er._data)
+        self.assertEqual(len(er.start._older_refs), 0)
+        self.assertEqual(len(er.end._later_refs), 0)
+        self.assertEqual(er.start.min.year, 1900)
+        self.assertEqual(er.end.max.year, 1980)
+        self.assertEqual(er.info, ['source 1'])
+        self.assertFalse(hasattr(er, '__dict__'))
+
+    def test_release_before_reporting(self):
+
+        # Arrange
+        record_list = [{'name': 'Life', 'id': 'life', 'start': 'birth', 'end': '1980'},
+                       {'name': 'Birth', 'id': 'birth', 'start': '1900', 'end': '1900'}]
+        reported = {}
+
+        def on_resolved(batch, done, total):
+            reported.update((rec_id, rec._data) for rec_id, rec in batch.items())
+
+        # Act
+        records = build_record_list([EventData.parse(rec) for rec in record_list], release=True, on_resolved=on_resolved)
+
+        # Assert - Reported records may already be on screen, so they were released before being passed on.
+        self.assertEqual(reported, {'life': None, 'birth': None})
+        self.assertEqual(records['life'].start.min.year, 1900)
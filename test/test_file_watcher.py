@@ -0,0 +1,54 @@
+import os
+import time
+import tempfile
+import unittest
+
+from file_watcher import FileWatcher
+
+
+class TestFileWatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.realpath(os.path.join(self.tmp.name, "records.yaml"))
+        with open(self.path, 'w') as file:
+            file.write("Records: []\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _wait_for_change(self, watcher: FileWatcher) -> set:
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            changed = watcher.poll()
+            if changed:
+                return changed
+            time.sleep(0.05)
+        return set()
+
+    def _check_watcher(self, use_inotify: bool):
+
+        # Arrange
+        watcher = FileWatcher([self.path], use_inotify=use_inotify)
+        watcher.POLL_INTERVAL = 0.05
+        time.sleep(0.05)
+
+        # Act
+        with open(self.path, 'w') as file:
+            file.write("Records:\n  - {name: Birth, start: 1970}\n")
+        changed = self._wait_for_change(watcher)
+        watcher.close()
+
+        # Assert
+        self.assertEqual(changed, {self.path})
+        self.assertEqual(watcher.poll(), set())
+
+    def test_polling(self):
+        self._check_watcher(use_inotify=False)
+
+    def test_inotify(self):
+        self._check_watcher(use_inotify=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
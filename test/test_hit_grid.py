@@ -0,0 +1,45 @@
+
+import unittest
+
+import numpy as np
+
+from data_types import HitGrid
+
+
+class TestHitGrid(unittest.TestCase):
+
+    def setUp(self):
+        # Two small rectangles in one cell, one long one across a row, and one wholly outside the grid.
+        self.rects = np.array([[10, 10, 20, 20], [15, 15, 30, 30], [0, 100, 500, 120], [600, 0, 700, 50]])
+        self.grid = HitGrid(self.rects, bounds=(0, 0, 500, 300), cell_px=64)
+
+    def test_at(self):
+        self.assertEqual(self.grid.at(12, 12), [0])
+        self.assertEqual(self.grid.at(17, 17), [0, 1])
+        self.assertEqual(self.grid.at(20, 20), [1])  # Right and bottom edges are exclusive.
+        self.assertEqual(self.grid.at(450, 110), [2])
+        self.assertEqual(self.grid.at(650, 10), [])  # Outside the grid.
+        self.assertEqual(self.grid.at(250, 250), [])
+
+    def test_overlapping(self):
+        self.assertEqual(self.grid.overlapping((0, 0, 16, 16)), [0, 1])
+        self.assertEqual(self.grid.overlapping((0, 0, 500, 300)), [0, 1, 2])
+        self.assertEqual(self.grid.overlapping((-50, -50, -1, -1)), [])
+
+    def test_matches_linear_scan(self):
+
+        # Arrange
+        rng = np.random.default_rng(7)
+        corners = rng.uniform(-100, 900, size=(2000, 2))
+        sizes = rng.uniform(1, 200, size=(2000, 2))
+        rects = np.concatenate([corners, corners + sizes], axis=1)
+        grid = HitGrid(rects, bounds=(0, 0, 800, 600))
+        points = rng.uniform((0, 0), (800, 600), size=(200, 2))
+
+        # Act
+        hits = [grid.at(x, y) for x, y in points]
+
+        # Assert
+        for (x, y), found in zip(points, hits):
+            inside = (rects[:, 0] <= x) & (x < rects[:, 2]) & (rects[:, 1] <= y) & (y < rects[:, 3])
+            self.assertEqual(found, np.flatnonzero(inside).tolist())
@@ -0,0 +1,48 @@
+
+import random
+import unittest
+import numpy as np
+
+from data_types import Timeline, EventData, TimePoint
+from data_types.interval_index import IntervalIndex
+
+
+class TestIntervalIndex(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(1)
+        self.lo = np.array([rng.randrange(-1000, 1000) for _ in range(2000)], dtype=np.int64)
+        self.hi = self.lo + np.array([rng.randrange(0, 200) for _ in range(2000)], dtype=np.int64)
+        self.index = IntervalIndex(self.lo, self.hi)
+
+    def test_stab(self):
+        for t in [-1100, -1000, -3, 0, 17, 999, 1250]:
+            expected = set(np.nonzero((self.lo <= t) & (self.hi >= t))[0])
+            self.assertEqual(set(self.index.stab(t)), expected)
+
+    def test_overlapping(self):
+        for a, b in [(-1100, -1050), (-10, 10), (500, 500), (0, 2000)]:
+            expected = np.nonzero((self.lo <= b) & (self.hi >= a))[0]
+            found = self.index.overlapping(a, b)
+            self.assertEqual(len(found), len(set(found)), "Rows should not be reported twice.")
+            self.assertEqual(set(found), set(expected))
+
+
+class TestTimelineQueries(unittest.TestCase):
+
+    def setUp(self):
+        record_list = [{'name': 'Life', 'id': 'life', 'start': 'birth', 'end': 'death'},
+                       {'name': 'Birth', 'id': 'birth', 'start': '17 Aug 1970', 'end': '17 Aug 1970'},
+                       {'name': 'Death', 'id': 'death', 'start': '5 Jun 2040', 'end': '5 Jun 2040'},
+                       {'name': 'Unbounded', 'id': 'unbounded', 'start_after': '2000'},
+                       ]
+        self.timeline = Timeline()
+        self.timeline.init_from_event_data([EventData.parse(rec) for rec in record_list])
+
+    def test_query_point(self):
+        found = self.timeline.query_point(TimePoint(year=1970, month=8, day=17))
+        self.assertEqual([rec.id for rec in found], ['life', 'birth'])
+
+    def test_query_range(self):
+        found = self.timeline.query_range(TimePoint(year=1990, month=1, day=1), TimePoint(year=2100, month=1, day=1))
+        self.assertEqual([rec.id for rec in found], ['life', 'death', 'unbounded'])
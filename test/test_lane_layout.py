@@ -0,0 +1,66 @@
+
+import math
+import unittest
+
+import numpy as np
+
+from data_types import LaneLayout
+
+
+class TestLaneLayout(unittest.TestCase):
+
+    def setUp(self):
+        self.layout = LaneLayout()
+        # At one pixel per day, a 10 pixel label reaches 10 days past its record's start.
+        self.layout.update(['a', 'b', 'c', 'e'], np.array([0, 5, 20, 40]), np.array([8, 6, 30, 41]),
+                           np.array([10, 10, 10, 10]), scale=1)
+
+    def test_initial_layout(self):
+        self.assertEqual({rec_id: entry.lane for rec_id, entry in self.layout.entries.items()},
+                         {'a': 0, 'b': 1, 'c': 0, 'e': 0})
+        self.assertEqual(self.layout.entries['a'].right, 10)
+        self.assertEqual(self.layout.lane_count, 2)
+
+    def test_pan_updates_in_place(self):
+
+        # Act
+        # 'a' leaves the view and 'd' enters it; zoomed in slightly, so the lanes are kept.
+        relaid = self.layout.update(['b', 'c', 'd', 'e'], np.array([5, 20, 1, 40]), np.array([6, 30, 2, 41]),
+                                    np.array([10, 10, 2, 10]), scale=1.5)
+
+        # Assert
+        self.assertFalse(relaid)
+        self.assertEqual({rec_id: entry.lane for rec_id, entry in self.layout.entries.items()},
+                         {'b': 1, 'c': 0, 'd': 0, 'e': 0})
+
+    def test_zoom_out_relays(self):
+
+        # Act
+        # At a tenth of a pixel per day, every label reaches 100 days, so nothing can share a lane.
+        relaid = self.layout.update(['a', 'b', 'c'], np.array([0, 5, 20]), np.array([8, 6, 30]),
+                                    np.array([10, 10, 10]), scale=0.1)
+
+        # Assert
+        self.assertTrue(relaid)
+        self.assertEqual(sorted(entry.lane for entry in self.layout.entries.values()), [0, 1, 2])
+
+    def test_remove(self):
+
+        # Act
+        self.layout.remove(['b'])
+
+        # Assert
+        self.assertNotIn('b', self.layout.entries)
+        self.assertEqual(self.layout.lane_count, 1)
+
+    def test_infinite_bounds(self):
+
+        # Arrange
+        layout = LaneLayout()
+
+        # Act
+        layout.update(['open', 'closed'], np.array([-math.inf, 5]), np.array([math.inf, 6]), np.array([10, 10]), scale=1)
+
+        # Assert
+        self.assertEqual(layout.entries['open'].right, math.inf)
+        self.assertEqual(layout.lane_count, 2)
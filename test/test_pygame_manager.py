@@ -0,0 +1,51 @@
+
+import unittest
+
+import pygame
+
+import color
+from pygame_manager import TextCache
+
+
+class TestTextCache(unittest.TestCase):
+
+    def setUp(self):
+        pygame.font.init()
+
+    def test_hit(self):
+
+        # Arrange
+        cache = TextCache()
+        first = cache.get("Life")
+
+        # Act
+        second = cache.get("Life")
+        other_color = cache.get("Life", text_color=color.LIGHT_GRAY)
+
+        # Assert
+        self.assertIs(first, second)
+        self.assertIsNot(first, other_color)
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+        self.assertAlmostEqual(cache.hit_rate(), 1 / 3)
+
+    def test_evicts_least_recently_used(self):
+
+        # Arrange
+        probe = TextCache().get("label 0")
+        label_bytes = probe.get_width() * probe.get_height() * probe.get_bytesize()
+        cache = TextCache(max_bytes=3 * label_bytes)
+        for ii in range(3):
+            cache.get(f"label {ii}")
+        cache.get("label 0")  # Now the most recently used.
+
+        # Act
+        cache.get("label 3")
+
+        # Assert
+        self.assertEqual(len(cache), 3)
+        self.assertLessEqual(cache.bytes, cache.max_bytes)
+        misses = cache.misses
+        cache.get("label 0")
+        self.assertEqual(cache.misses, misses)
+        cache.get("label 1")
+        self.assertEqual(cache.misses, misses + 1)
@@ -0,0 +1,62 @@
+import os
+import time
+import socket
+import tempfile
+import unittest
+
+from data_types import Timeline
+from record_stream import RecordStream, parse_record_line
+
+
+class TestRecordStream(unittest.TestCase):
+
+    def test_parse_record_line(self):
+
+        # Act
+        record = parse_record_line(b'{"name": "Birth", "start": 1970, "info": ["a", 2], "end": null}\n')
+
+        # Assert
+        self.assertEqual(record, {'name': 'Birth', 'start': '1970', 'info': ['a', '2']})
+        self.assertIsNone(parse_record_line(b'  \n'))
+        with self.assertRaises(ValueError):
+            parse_record_line(b'[1, 2]')
+
+    def test_socket_ingest(self):
+
+        # Arrange
+        tl = Timeline()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "records.sock")
+            stream = RecordStream(tl, path)
+            lines = [b'{"name": "Birth", "id": "birth", "start": "17 Aug 1970"}\n',
+                     b'not json\n',
+                     b'{"name": "Later", "start": "birth + 5y"}\n']
+
+            # Act
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+                client.connect(path)
+                client.sendall(b''.join(lines))
+            deadline = time.monotonic() + 5
+            while stream.ingested < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            stream.close()
+
+            # Assert
+            self.assertFalse(os.path.exists(path))
+        self.assertEqual(stream.ingested, 2)
+        self.assertEqual(stream.rejected, 1)
+        self.assertEqual(set(tl.get_records().keys()), {'birth', 'l'})
+
+    def test_batch_size_follows_ingest_time(self):
+
+        # Act
+        slow = RecordStream.next_batch_size(1000, 1000, 4 * RecordStream.BATCH_TIME)
+        quick = RecordStream.next_batch_size(1000, 1000, RecordStream.BATCH_TIME / 100)
+
+        # Assert - A batch that took too long shrinks the next one; a quick one grows it, but gradually.
+        self.assertEqual(slow, 250)
+        self.assertEqual(quick, 2000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+
+import unittest
+
+from data_types import Timeline, Timeview, EventData, ResolvedTimeline
+from data_types.resolved_timeline import NEG_INF, POS_INF
+
+
+class TestResolvedTimeline(unittest.TestCase):
+
+    def setUp(self):
+        self.record_list = [
+            {'name': 'Life', 'id': 'life', 'start': 'birth', 'end': 'death'},
+            {'name': 'Birth', 'id': 'birth', 'start': '17 Aug 1970', 'end': '17 Aug 1970'},
+            {'name': 'Death', 'id': 'death', 'start': '5 Jun 2040', 'end': '5 Jun 2040'},
+            {'name': 'Before', 'id': 'before', 'start': '10 Mar 1960', 'end': '11 Mar 1960'},
+            {'name': 'Open', 'id': 'open', 'start_after': '2000'},
+        ]
+        self.timeline = Timeline()
+        self.timeline.init_from_event_data([EventData.parse(rec) for rec in self.record_list])
+
+    def test_columns(self):
+
+        # Arrange
+        records = self.timeline.get_records()
+
+        # Act
+        resolved: ResolvedTimeline = self.timeline.resolved()
+
+        # Assert
+        self.assertEqual(len(resolved), len(records))
+        self.assertEqual(list(resolved.ids), list(records.keys()))
+        life = resolved.row_of['life']
+        self.assertEqual(resolved.names[life], 'Life')
+        self.assertEqual(resolved.start_min[life], records['birth'].start.min.ordinal())
+        self.assertEqual(resolved.end_max[life], records['death'].end.max.ordinal())
+        opened = resolved.row_of['open']
+        self.assertEqual(resolved.end_max[opened], POS_INF)
+        self.assertNotEqual(resolved.start_min[opened], NEG_INF)
+
+    def test_append(self):
+
+        # Arrange
+        records = list(self.timeline.get_records().values())
+        first = ResolvedTimeline.from_records(records[:1])
+
+        # Act - Appended one at a time, so the rows end up spread over several blocks.
+        resolved = first
+        for rec in records[1:]:
+            resolved = resolved.append(ResolvedTimeline.from_records([rec]))
+        opened = resolved.row_of['open']
+        mask = resolved.overlapping(NEG_INF, POS_INF, first=2)
+        bounds = resolved.bounds()
+
+        # Assert
+        expected = ResolvedTimeline.from_records(records)
+        self.assertEqual(len(first), 1)
+        self.assertEqual(len(resolved), len(records))
+        self.assertEqual(list(resolved.ids_at([4, 0, 2])), [records[4].id, records[0].id, records[2].id])
+        self.assertEqual(opened, 4)
+        self.assertEqual(list(mask), [True] * (len(records) - 2))
+        self.assertTrue((bounds == expected.bounds()).all())
+        self.assertEqual(list(resolved.ids), list(expected.ids))
+        self.assertEqual(dict(resolved.row_of), dict(expected.row_of))
+
+    def test_extent(self):
+        self.assertEqual(self.timeline.min, self.timeline.get_records()['before'].start.min)
+        self.assertEqual(self.timeline.max, self.timeline.get_records()['death'].end.max)
+
+    def test_visible_matches_contains(self):
+
+        # Arrange
+        view = Timeview(self.timeline)
+        view.zoom_in(self.timeline.get_records()['birth'].start.min.ordinal())
+
+        # Act
+        visible = view.get_visible()
+
+        # Assert
+        expected = [rec for rec in self.timeline.get_records().values() if view.contains(rec)]
+        self.assertEqual(visible, expected)
@@ -0,0 +1,144 @@
+import os
+import gzip
+import json
+import math
+import tempfile
+import unittest
+from unittest import mock
+
+from algorithms import loading
+from data_types import Timeline, TiledTimeline, TimePoint
+
+
+class TestTiledTimeline(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.timeline = Timeline(compact=True)
+        self.timeline.load_records("test/data/test_sample.yaml")
+        # Ten-year tiles, so the sample is split over several of them.
+        self.timeline.save_tiles(self.tmp.name, tile_days=3652)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_query_range_matches_timeline(self):
+
+        # Arrange
+        tiled = TiledTimeline(self.tmp.name)
+        ranges = [(TimePoint(year=1900, month=1, day=1), TimePoint(year=1975, month=6, day=29)),
+                  (TimePoint(year=1920, month=1, day=1), TimePoint(year=1930, month=1, day=1)),
+                  (TimePoint(year=1800, month=1, day=1), TimePoint(year=1801, month=1, day=1))]
+
+        for lo, hi in ranges:
+            # Act
+            found = {rec.id for rec in tiled.query_range(lo, hi)}
+
+            # Assert
+            expected = {rec.id for rec in self.timeline.query_range(lo, hi)}
+            self.assertEqual(found, expected)
+        self.assertEqual(tiled.min, self.timeline.min)
+        self.assertEqual(tiled.max, self.timeline.max)
+        tiled.close()
+
+    def test_cache_capacity(self):
+
+        # Arrange
+        tiled = TiledTimeline(self.tmp.name, cache_tiles=2)
+        tiled.close()  # Stop the prefetcher so only queries load tiles.
+
+        # Act
+        tiled.query_range(TimePoint(year=1900, month=1, day=1), TimePoint(year=1975, month=6, day=29))
+
+        # Assert
+        self.assertGreater(len(tiled.tile_files), 2)
+        self.assertEqual(len(tiled.cache), 2)
+        self.assertTrue(os.path.exists(os.path.join(self.tmp.name, "manifest.json")))
+
+    def test_round_trip(self):
+
+        # Arrange
+        tiled = TiledTimeline(self.tmp.name)
+
+        # Act
+        found = {rec.id: rec for rec in tiled.query_range(-math.inf, math.inf)}
+        tiled.close()
+
+        # Assert - Tiles are read back as data, with every bound, name and info string intact.
+        records = self.timeline.get_records()
+        self.assertEqual(found.keys(), records.keys())
+        for rec_id, rec in records.items():
+            tile_rec = found[rec_id]
+            self.assertEqual((tile_rec.name, tile_rec.info), (rec.name, self.timeline.get_info(rec_id)))
+            self.assertEqual((tile_rec.start.min, tile_rec.start.max, tile_rec.end.min, tile_rec.end.max),
+                             (rec.start.min, rec.start.max, rec.end.min, rec.end.max))
+
+    def test_older_format_refused(self):
+
+        # Arrange
+        path = os.path.join(self.tmp.name, "manifest.json")
+        with open(path) as file:
+            manifest = json.load(file)
+        del manifest['format']
+        with open(path, 'w') as file:
+            json.dump(manifest, file)
+
+        # Act / Assert
+        with self.assertRaises(ValueError):
+            TiledTimeline(self.tmp.name)
+
+
+class TestSaveTilesInfo(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "records.yaml.gz")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, count: int, note: str):
+        with gzip.open(self.path, 'wt', encoding='utf-8') as file:
+            file.write("Records:\n")
+            for index in range(count):
+                file.write(f"- name: R{index}\n  id: r{index}\n  start: {1 + index % 28} Jan 2000\n  info: {note} {index}\n")
+
+    def _read_tiles(self):
+        tiled = TiledTimeline(os.path.join(self.tmp.name, "tiles"))
+        tiled.close()
+        return {rec.id: rec.info for rec in tiled.query_range(-math.inf, math.inf)}
+
+    def test_compressed_read_once(self):
+
+        # Arrange
+        self._write(50, "Note")
+        timeline = Timeline(compact=True)
+        timeline.load_records(self.path)
+
+        # Act
+        with mock.patch("algorithms.loading.open_stream", wraps=loading.open_stream) as opened:
+            timeline.save_tiles(os.path.join(self.tmp.name, "tiles"))
+
+        # Assert - The file is decompressed once for all the records' info, not once per record.
+        self.assertEqual(opened.call_count, 1)
+        self.assertEqual(self._read_tiles()['r32'], ['Note 32'])
+
+    def test_edited_since_loading(self):
+
+        # Arrange
+        self._write(10, "Old")
+        timeline = Timeline(compact=True)
+        timeline.load_records(self.path)
+        self._write(10, "New note")
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))  # In case the clock is too coarse to tell.
+
+        # Act
+        timeline.save_tiles(os.path.join(self.tmp.name, "tiles"))
+
+        # Assert - The timeline was loaded again, rather than following offsets into the edited file.
+        self.assertEqual(self._read_tiles()['r3'], ['New note 3'])
+
+
+if __name__ == '__main__':
+    unittest.main()
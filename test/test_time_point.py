@@ -153,3 +153,22 @@ class TestTimePoint(unittest.TestCase):
         # Assert
         self.assertEqual(tp1, ans1)
         self.assertEqual(tp2, ans2)
+
+    def test_time_of_day(self):
+        # Arrange
+        tp = TimePoint(year=2024, month=2, day=28, seconds=36 * 3600 + 0.5)  # Carries into the next day.
+
+        # Act
+        later = tp + timedelta(hours=13)
+        earlier = tp - timedelta(hours=13)
+        round_trip = TimePoint.from_ordinal(tp.ordinal())
+
+        # Assert
+        self.assertEqual(tp, TimePoint(year=2024, month=2, day=29, seconds=12 * 3600 + 0.5))
+        self.assertEqual(later, TimePoint(year=2024, month=3, day=1, seconds=3600 + 0.5))
+        self.assertEqual(earlier, TimePoint(year=2024, month=2, day=28, seconds=23 * 3600 + 0.5))
+        self.assertEqual(round_trip, tp)
+        self.assertEqual(tp.ordinal(), TimePoint(year=2024, month=2, day=29).ordinal() + (12 * 3600 + 0.5) / 86400)
+        self.assertEqual(later - earlier, timedelta(hours=26))
+        self.assertLess(TimePoint(year=2024, month=2, day=29), tp)
+        self.assertEqual(TimePoint(year=2024, month=2, day=29, seconds=0), TimePoint(year=2024, month=2, day=29))
@@ -1,7 +1,12 @@
 
+import os
+import tempfile
 import unittest
+from unittest import mock
 
-from data_types import Timeline, TimePoint, EventData
+import algorithms
+from algorithms import loading
+from data_types import Timeline, TimePoint, EventData, TimeSpan, IncoherentTimelineError
 
 
 class TestTimeline(unittest.TestCase):
@@ -21,6 +26,23 @@ class TestTimeline(unittest.TestCase):
         self.assertEqual(tl.min, min_ans)
         self.assertEqual(tl.max, max_ans)
 
+    def test_load_records_keeps_documents_if_reloadable(self):
+
+        # Arrange
+        plain, reloadable = Timeline(), Timeline(reloadable=True)
+        path = os.path.realpath("test/data/test_sample.yaml")
+        algorithms.clear_document_cache()
+
+        # Act
+        plain.load_records("test/data/test_sample.yaml")
+        kept_by_plain = path in loading._document_cache
+        reloadable.load_records("test/data/test_sample.yaml")
+        kept_by_reloadable = path in loading._document_cache
+
+        # Assert - Only a timeline that may be reloaded holds on to the parsed file.
+        self.assertFalse(kept_by_plain)
+        self.assertTrue(kept_by_reloadable)
+
     def test_load_from_list(self):
 
         # Arrange
@@ -40,3 +62,206 @@ class TestTimeline(unittest.TestCase):
         self.assertEqual(len(tl.get_records()), 3)
         self.assertEqual(tl.min, min_ans)
         self.assertEqual(tl.max, max_ans)
+
+    def test_load_records_window(self):
+
+        # Arrange
+        tl = Timeline()
+        window = (TimePoint(year=1914, month=1, day=1), TimePoint(year=1916, month=1, day=1))
+
+        # Act
+        tl.load_records("test/data/test_sample.yaml", window=window)
+
+        # Assert - Records fixed outside the window are dropped; everything else is still resolved.
+        records = tl.get_records()
+        self.assertEqual(set(records.keys()), {'life', 'high_school', 'first_car', 'second_car', 'third_car', 'death'})
+        self.assertEqual(records['first_car'].end.min, TimePoint(year=1920, month=4, day=19))
+
+    def test_load_records_empty_window(self):
+
+        # Arrange
+        tl = Timeline()
+        evt_datas = [EventData.parse({'name': 'Decade', 'id': 'decade', 'start': '1900', 'end': '1910'})]
+        window = (TimePoint(year=2000, month=1, day=1), TimePoint(year=2010, month=1, day=1))
+
+        # Act / Assert
+        with self.assertRaisesRegex(IncoherentTimelineError, "No records fall within the window"):
+            tl.init_from_event_data(evt_datas, window=window)
+        self.assertEqual(evt_datas[0].start, ['1900'])  # Not anchored to 1 Jan 0 for a retry.
+
+    def test_load_records_progress(self):
+
+        # Arrange
+        tl = Timeline()
+        calls = []
+        partial_sizes = []
+
+        def progress(stage, done, total):
+            calls.append((stage, done, total))
+            if stage == 'resolving':
+                partial_sizes.append(len(tl.snapshot()))
+
+        # Act
+        with mock.patch('algorithms.construct.RESOLVED_BATCH_SIZE', 3):
+            tl.load_records("test/data/test_sample.yaml", progress=progress)
+
+        # Assert - Partial snapshots grow as records resolve, before the full one is published.
+        self.assertEqual(calls[0], ('reading', 1, 1))
+        self.assertEqual(calls[-1][0], 'resolving')
+        self.assertEqual(calls[-1][1:], (10, 10))
+        self.assertGreater(len(partial_sizes), 1)
+        self.assertEqual(partial_sizes, sorted(partial_sizes))
+        self.assertLess(partial_sizes[0], 10)
+        self.assertEqual(len(tl.snapshot()), 10)
+
+    def test_reload(self):
+
+        # Arrange
+        yaml_text = """
+Records:
+  - {name: Birth, id: birth, start: 17 Aug 1970, end: 17 Aug 1970}
+  - {name: Life, id: life, start: birth, end: death}
+  - {name: Death, id: death, start: 5 Jun 2040, end: 5 Jun 2040}
+  - {name: Unrelated, id: other, start: 1 Jan 1800, end: 1 Jan 1801}
+"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "records.yaml")
+            with open(path, 'w') as file:
+                file.write(yaml_text)
+            tl = Timeline(reloadable=True)
+            tl.load_records(path)
+            other = tl.get_records()['other']
+            with open(path, 'w') as file:
+                file.write(yaml_text.replace("5 Jun 2040", "9 Sep 2050").replace("Unrelated", "Renamed"))
+
+            # Act
+            changed = tl.reload()
+
+        # Assert - The dependent record is re-resolved; the unrelated one keeps its bounds.
+        records = tl.get_records()
+        self.assertEqual(changed, {'death'})
+        self.assertEqual(records['life'].end.max, TimePoint(year=2050, month=9, day=9))
+        self.assertEqual(tl.max, TimePoint(year=2050, month=9, day=9))
+        self.assertEqual(records['other'].name, "Renamed")
+        self.assertIs(records['other'].start, other.start)
+        self.assertEqual(other.name, "Unrelated")
+
+    def test_reload_unchanged_merged_record(self):
+
+        # Arrange - Life is defined across two entries.
+        yaml_text = """
+Records:
+  - {name: Life, id: life, start: 17 Aug 1970}
+  - {name: Life, id: life, end: 5 Jun 2040}
+"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "records.yaml")
+            with open(path, 'w') as file:
+                file.write(yaml_text)
+            tl = Timeline(reloadable=True)
+            tl.load_records(path)
+            with open(path, 'a') as file:
+                file.write("  - {name: Other, id: other, start: 1 Jan 1800, end: 1 Jan 1801}\n")
+
+            # Act
+            changed = tl.reload()
+
+        # Assert - Only the new record changed; the merged one is compared with all of its constraints.
+        self.assertEqual(changed, {'other'})
+
+    def test_reload_keeps_generated_ids(self):
+
+        # Arrange - Records without ids, so theirs are generated from their initials.
+        yaml_text = """
+Records:
+  - {name: Great War, start: 28 Jul 1914, end: 11 Nov 1918}
+  - {name: Gold War, start: 1 Jan 1920, end: 1 Jan 1930}
+"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "records.yaml")
+            with open(path, 'w') as file:
+                file.write(yaml_text)
+            tl = Timeline(reloadable=True)
+            tl.load_records(path)
+            before = {rec.name: rec_id for rec_id, rec in tl.get_records().items()}
+            with open(path, 'w') as file:
+                file.write(yaml_text.replace("Records:\n", "Records:\n  - {name: Grand Wedding, start: 1 Jun 1900}\n"))
+
+            # Act
+            changed = tl.reload()
+
+        # Assert - The inserted record gets a new id, rather than taking its place from the records after it.
+        after = {rec.name: rec_id for rec_id, rec in tl.get_records().items()}
+        self.assertEqual(before, {'Great War': 'gw', 'Gold War': 'gw2'})
+        self.assertEqual(after, {'Great War': 'gw', 'Gold War': 'gw2', 'Grand Wedding': 'gw3'})
+        self.assertEqual(changed, {'gw3'})
+
+    def test_reload_publishes_snapshot(self):
+
+        # Arrange
+        yaml_text = """
+Records:
+  - {name: Birth, id: birth, start: 17 Aug 1970, end: 17 Aug 1970}
+  - {name: Death, id: death, start: 5 Jun 2040, end: 5 Jun 2040}
+"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "records.yaml")
+            with open(path, 'w') as file:
+                file.write(yaml_text)
+            tl = Timeline(reloadable=True)
+            tl.load_records(path)
+            before = tl.snapshot()
+            with open(path, 'w') as file:
+                file.write(yaml_text.replace("5 Jun 2040", "9 Sep 2050"))
+
+            # Act
+            tl.reload()
+
+        # Assert - The old snapshot is untouched, and shares the unchanged record with the new one.
+        after = tl.snapshot()
+        self.assertEqual(after.version, before.version + 1)
+        self.assertEqual(before.max, TimePoint(year=2040, month=6, day=5))
+        self.assertEqual(after.max, TimePoint(year=2050, month=9, day=9))
+        self.assertEqual(before.records['death'].end.max, TimePoint(year=2040, month=6, day=5))
+        self.assertIs(after.records['birth'], before.records['birth'])
+        with self.assertRaises(TypeError):
+            after.records['birth'] = None
+
+    def test_ingest(self):
+
+        # Arrange
+        tl = Timeline()
+        tl.load_records("test/data/test_sample.yaml")
+        before = tl.snapshot()
+        batch = [{'name': 'Grandchild', 'start': 'child + 20y'},
+                 {'name': 'Child', 'id': 'child', 'start': 'death - 30y'},
+                 {'name': 'Life', 'id': 'life', 'start': '1 Jan 1000'}]
+
+        # Act
+        added = tl.ingest(batch)
+
+        # Assert - New records resolve against old ones; existing records are never replaced.
+        records = tl.get_records()
+        self.assertEqual(added, ['child', 'g'])
+        self.assertEqual(len(records), len(before.records) + 2)
+        self.assertIs(records['life'], before.records['life'])
+        self.assertEqual(records['g'].start.min, records['child'].start.min + TimeSpan.parse('20y'))
+        self.assertEqual(tl.snapshot().version, before.version + 1)
+        self.assertIn(records['child'], tl.query_point(records['child'].start.min))
+
+    def test_reload_failure_keeps_records(self):
+
+        # Arrange
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "records.yaml")
+            with open(path, 'w') as file:
+                file.write("Records:\n  - {name: Birth, id: birth, start: 17 Aug 1970}\n")
+            tl = Timeline(reloadable=True)
+            tl.load_records(path)
+            with open(path, 'w') as file:
+                file.write("Records:\n  - {name: Birth, id: birth, start: nobody}\n")
+
+            # Act / Assert
+            with self.assertRaises(Exception):
+                tl.reload()
+        self.assertEqual(tl.get_records()['birth'].start.min, TimePoint(year=1970, month=8, day=17))
@@ -0,0 +1,45 @@
+import time
+import unittest
+
+from data_types import Timeline, TimePoint
+from timeline_loader import TimelineLoader
+
+
+class TestTimelineLoader(unittest.TestCase):
+
+    def _wait(self, loader: TimelineLoader):
+        deadline = time.monotonic() + 10
+        while not loader.finished and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_load(self):
+
+        # Arrange
+        tl = Timeline()
+
+        # Act
+        loader = TimelineLoader(tl, ["test/data/test_sample.yaml"])
+        self._wait(loader)
+
+        # Assert
+        self.assertIsNone(loader.error)
+        self.assertEqual(loader.status(), ('resolving', 10, 10))
+        self.assertEqual(loader.fraction(), 1.0)
+        self.assertEqual(tl.min, TimePoint(year=1900, month=1, day=1))
+
+    def test_error(self):
+
+        # Arrange
+        tl = Timeline()
+
+        # Act
+        loader = TimelineLoader(tl, ["test/data/no_such_file.yaml"])
+        self._wait(loader)
+
+        # Assert
+        self.assertIsInstance(loader.error, OSError)
+        self.assertEqual(len(tl.snapshot()), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
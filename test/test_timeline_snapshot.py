@@ -0,0 +1,59 @@
+import unittest
+from unittest import mock
+
+from algorithms import construct_records, preprocess_event_data
+from data_types import TimelineSnapshot, EventData, TimePoint
+
+
+def make_records(first: int, count: int):
+    record_list = [{'name': f"Year {year}", 'id': f"y{year}", 'start': str(year), 'end': str(year + 2)}
+                   for year in range(first, first + count)]
+    return construct_records(preprocess_event_data([EventData.parse(rec) for rec in record_list]))
+
+
+class TestTimelineSnapshot(unittest.TestCase):
+
+    def test_appended(self):
+
+        # Arrange
+        snapshot = TimelineSnapshot(make_records(1900, 10), version=3)
+
+        # Act - The first append leaves rows unindexed; the second is large enough to rebuild the index.
+        with mock.patch.object(TimelineSnapshot, 'MAX_UNINDEXED_ROWS', 15):
+            small = snapshot.appended(make_records(1800, 3), version=4)
+            large = small.appended(make_records(2000, 10), version=5)
+
+        # Assert
+        self.assertEqual(len(snapshot), 10)
+        self.assertEqual(len(large), 23)
+        self.assertEqual(large.version, 5)
+        self.assertEqual(small.min, TimePoint(year=1800, month=1, day=1))
+        self.assertEqual(large.max, TimePoint(year=2011, month=12, day=31))
+        self.assertEqual(small._indexed[1], 0)
+        self.assertEqual(large._indexed[1], 23)
+        for snap in (small, large):
+            lo = TimePoint(year=1801, month=6, day=1).ordinal()
+            hi = TimePoint(year=1902, month=6, day=1).ordinal()
+            found = [rec.id for rec in snap.query_range(lo, hi)]
+            self.assertEqual(found, ['y1900', 'y1901', 'y1902', 'y1800', 'y1801', 'y1802'])
+
+    def test_appended_many(self):
+
+        # Arrange
+        snapshot = TimelineSnapshot(make_records(1000, 4))
+
+        # Act
+        for first in range(1004, 1100, 4):
+            snapshot = snapshot.appended(make_records(first, 4), version=snapshot.version + 1)
+
+        # Assert - Each append only adds a layer, but the records read as one mapping in the order they were added.
+        self.assertEqual(len(snapshot), 100)
+        self.assertEqual(len(snapshot.records), 100)
+        self.assertEqual(list(snapshot.records), [f"y{year}" for year in range(1000, 1100)])
+        self.assertEqual(snapshot.records['y1050'].name, "Year 1050")
+        self.assertNotIn('y1100', snapshot.records)
+        self.assertLess(len(snapshot.resolved._blocks), 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
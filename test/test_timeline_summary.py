@@ -0,0 +1,70 @@
+
+import math
+import unittest
+
+import numpy as np
+
+from data_types import TimelineSummary
+
+
+class TestTimelineSummary(unittest.TestCase):
+
+    def setUp(self):
+        # Two records over days 0-10, one over 20-30, and one that never ends.
+        self.summary = TimelineSummary(starts=np.array([0, 5, 20, 25.0]), ends=np.array([10, 10, 30, math.inf]))
+
+    def test_count(self):
+        self.assertEqual(self.summary.count(0, 30), 4)
+        self.assertEqual(self.summary.count(11, 19), 0)
+        self.assertEqual(self.summary.count(40, 50), 1)  # Only the endless record.
+        self.assertEqual(self.summary.count(26, 26), 2)
+
+    def test_columns(self):
+
+        # Arrange
+        # Act
+        counts = self.summary.columns(0, 30, 6)
+
+        # Assert
+        # Columns of five days are read from bins of 3.75 days, so the third column also counts the records
+        # ending on day 10, in the bin it shares with the second.
+        np.testing.assert_array_equal(counts, [1, 2, 2, 0, 1, 2])
+
+    def test_columns_outside(self):
+        np.testing.assert_array_equal(self.summary.columns(-100, -50, 4), [0, 0, 0, 0])
+
+    def test_empty(self):
+        summary = TimelineSummary(starts=np.empty(0), ends=np.empty(0))
+        self.assertEqual(summary.count(0, 10), 0)
+        np.testing.assert_array_equal(summary.columns(0, 10, 2), [0, 0])
+
+    def test_added(self):
+
+        # Arrange
+        summary = TimelineSummary(starts=np.array([0, 5, 20.0]), ends=np.array([10, 30, 30.0]))
+
+        # Act - The new record is within the days already covered, so its counts are added to the levels.
+        added = summary.added(starts=np.array([25.0]), ends=np.array([math.inf]))
+
+        # Assert
+        expected = TimelineSummary(starts=np.array([0, 5, 20, 25.0]), ends=np.array([10, 30, 30, math.inf]))
+        self.assertEqual(len(summary), 3)
+        self.assertEqual(len(added), 4)
+        self.assertEqual((added.origin, added.bin_days), (summary.origin, summary.bin_days))
+        self.assertEqual(len(added._sorted_starts), 2)  # Not sorted again.
+        for level, counts in enumerate(added.levels):
+            np.testing.assert_array_equal(counts, expected.levels[level])
+        self.assertEqual(added.count(26, 26), 3)
+        self.assertEqual(added.count(40, 50), 1)
+        np.testing.assert_array_equal(added.sorted_starts, [0, 5, 20, 25])
+
+    def test_added_outside(self):
+
+        # Act
+        added = self.summary.added(starts=np.array([40.0]), ends=np.array([50.0]))
+
+        # Assert - Rebuilt over twice the days covered before, so the next records past the end fit in.
+        self.assertEqual(added.origin, 0)
+        self.assertEqual(added.bin_days * 2 ** (len(added.levels) - 1), 60)
+        self.assertEqual(added.count(0, 50), 5)
+        np.testing.assert_array_equal(added.columns(40, 50, 1), [2])
@@ -1,8 +1,13 @@
 
 import unittest
 from datetime import timedelta
+from unittest import mock
 
-from data_types import Timeline, TimePoint, Timeview, EventRecord, EventData
+import pygame
+
+import numpy as np
+
+from data_types import Timeline, TimePoint, Timeview, EventRecord, EventData, ViewTransform, EventLog, StaleSourceError
 
 import algorithms
 
@@ -222,6 +227,170 @@ class TestTimeview(unittest.TestCase):
         self.assertTrue(view.contains(min_date), "Early date should still be in view")
         self.assertTrue(view.contains(max_date), "Late date should still be in view")
 
+    def test_is_animating(self):
+
+        # Arrange
+        view = Timeview(self.timeline)
+        view.render_min.snap(view.render_min.tgt)
+        view.render_max.snap(view.render_max.tgt)
+        settled = view.is_animating()
+
+        # Act
+        view.zoom_in(TimePoint(year=2005, month=5, day=7).ordinal())
+
+        # Assert
+        self.assertFalse(settled)
+        self.assertTrue(view.is_animating())
+        self.assertTrue(view.needs_render())
+
+    def test_calculate_record_positions(self):
+
+        # Arrange
+        pygame.font.init()
+        view = Timeview(self.timeline)
+        transform = ViewTransform(self.timeline.min.ordinal(), self.timeline.max.ordinal(), 800)
+
+        # Act
+        view.update_layout(800)
+        view.calculate_record_positions(transform, 600)
+
+        # Assert
+        # Birth's label overlaps the start of life, so needs a lane of its own. Death begins exactly where
+        # life ends, so can follow it in the same lane.
+        rects = {li.id: li.label_rect for li in view.label_infos}
+        self.assertEqual(rects['death'].top, rects['life'].top)
+        self.assertEqual(rects['birth'].top - rects['life'].top, rects['life'].height)
+        self.assertEqual(rects['life'].top + rects['birth'].bottom, 600)  # Centered.
+
+    def test_level_of_detail(self):
+
+        # Arrange
+        pygame.font.init()
+        starts = TimePoint(2000, 1, 1).ordinal() + np.arange(1000) / 10
+        view = Timeview(EventLog(starts, starts + 1, names=['event'] * 1000))
+        view.render_min.tgt, view.render_max.tgt = view.min.ordinal(), view.max.ordinal()
+
+        # Act
+        view.update_layout(400)
+        dense = view.lod, len(view.layout)
+        view.render_max.tgt = view.render_min.tgt + 10  # Zoom in to about a hundred records.
+        view.update_layout(400)
+
+        # Assert
+        self.assertEqual(dense, (True, 0))  # Too many records to lay out one by one.
+        self.assertFalse(view.lod)
+        self.assertGreater(len(view.layout), 0)
+
+    def test_pick_and_hover(self):
+
+        # Arrange
+        pygame.font.init()
+        timeline = Timeline()
+        timeline.init_from_event_data([EventData.parse({'name': 'Reign', 'id': 'reign', 'start': '1 Jan 2000',
+                                                        'end': '1 Jan 2040', 'info': ['Crowned in spring.']})])
+        view = Timeview(timeline)
+        transform = ViewTransform(timeline.min.ordinal(), timeline.max.ordinal(), 800)
+        view.update_layout(800)
+        view.calculate_record_positions(transform, 600)
+        reign = view.label_infos[0].label_rect
+
+        # Act
+        picked = view.pick(*reign.center)
+        missed = view.pick(reign.centerx, reign.bottom + 10)
+        view.hover(reign.center)
+
+        # Assert
+        self.assertEqual(picked, 'reign')
+        self.assertIsNone(missed)
+        self.assertEqual(view.pick_area(pygame.Rect(0, 0, 800, 600)), ['reign'])
+        self.assertEqual(view.hover_id, 'reign')
+        self.assertTrue(view.needs_render())
+        self.assertEqual(view.describe('reign'), ['Reign', 'Start: 1 Jan 2000', 'End: 1 Jan 2040', 'Crowned in spring.'])
+
+    def test_describe_unreadable_info(self):
+
+        # Arrange
+        timeline = Timeline()
+        timeline.init_from_event_data([EventData.parse({'name': 'Reign', 'id': 'reign', 'start': '1 Jan 2000',
+                                                        'end': '1 Jan 2040', 'info': ['Crowned in spring.']})])
+        view = Timeview(timeline)
+        view.update_layout(800)
+
+        # Act
+        with mock.patch('algorithms.expand_info', side_effect=StaleSourceError("reign.yaml changed")):
+            lines = view.describe('reign')
+
+        # Assert - A source that can't be read leaves out the info; a bug still surfaces.
+        self.assertEqual(lines, ['Reign', 'Start: 1 Jan 2000', 'End: 1 Jan 2040'])
+        with mock.patch('algorithms.expand_info', side_effect=TypeError("bug")):
+            with self.assertRaises(TypeError):
+                view.describe('reign')
+
+    def test_render_pan(self):
+
+        # Arrange
+        pygame.font.init()
+        surf = pygame.Surface((800, 600))
+        timeline = Timeline()
+        timeline.init_from_event_data([EventData.parse({'name': 'Reign', 'id': 'reign', 'start': '1 Jan 2000',
+                                                        'end': '1 Jan 2040'})])
+        view = Timeview(timeline)
+        # 20 days a pixel, with the end of the reign just past the right edge.
+        lo = TimePoint(2040, 1, 1).ordinal() - 16100
+        view.min, view.max = TimePoint.from_ordinal(lo), TimePoint.from_ordinal(lo + 16000)
+        view.render_min.snap(view.min.ordinal())
+        view.render_max.snap(view.max.ordinal())
+        view.render(surf)
+
+        # Act
+        view.pan(200)  # Ten pixels, scrolling the end of the reign into view.
+        view.render_min.snap(view.render_min.tgt)
+        view.render_max.snap(view.render_max.tgt)
+        panned_rects = view.render(surf)
+        panned = pygame.image.tobytes(surf, 'RGB')
+        unchanged_rects = view.render(surf)
+        view.force_redraw()
+        view.render(surf)
+
+        # Assert
+        self.assertEqual(panned_rects, [surf.get_rect()])
+        self.assertEqual(unchanged_rects, [])  # Nothing to update.
+        self.assertEqual(panned, pygame.image.tobytes(surf, 'RGB'))  # Scrolling drew the same as drawing afresh.
+
+    def test_render_scroll(self):
+
+        # Arrange
+        pygame.font.init()
+        surf = pygame.Surface((800, 200))
+        timeline = Timeline()
+        # A hundred records at the same time, each needing a lane of its own.
+        timeline.init_from_event_data([EventData.parse({'name': f'Reign {ii}', 'id': f'reign{ii}',
+                                                        'start': '1 Jan 2000', 'end': '1 Jan 2040'})
+                                       for ii in range(100)])
+        view = Timeview(timeline)
+        view.render_min.snap(view.min.ordinal())
+        view.render_max.snap(view.max.ordinal())
+        view.render(surf)
+        lane_height = view.lane_height
+        shown = len(view.label_infos)
+
+        # Act
+        view.scroll(45)
+        scrolled_needs_render = view.needs_render()
+        scrolled_rects = view.render(surf)
+        scrolled = pygame.image.tobytes(surf, 'RGB')
+        view.force_redraw()
+        view.render(surf)
+        view.scroll(100 * lane_height)  # Past the bottom lane.
+
+        # Assert
+        self.assertLessEqual(shown, 200 // lane_height + 1)  # Only lanes within the window are projected.
+        self.assertTrue(scrolled_needs_render)
+        self.assertEqual(scrolled_rects, [surf.get_rect()])
+        self.assertEqual(scrolled, pygame.image.tobytes(surf, 'RGB'))  # Scrolling drew the same as drawing afresh.
+        self.assertEqual(view.label_infos[0].label_rect.top, 45 // lane_height * lane_height - 45)
+        self.assertEqual(view.scroll_px, 100 * lane_height - 200)  # No further than the bottom lane.
+
     def test_pan_right(self):
 
         # Arrange
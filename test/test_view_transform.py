@@ -0,0 +1,37 @@
+
+import math
+import unittest
+
+import numpy as np
+
+from data_types import ViewTransform
+
+
+class TestViewTransform(unittest.TestCase):
+
+    def setUp(self):
+        self.transform = ViewTransform(min_ord=1000, max_ord=1100, width=500)
+
+    def test_scalar(self):
+        self.assertEqual(self.transform.scale, 5)
+        self.assertEqual(self.transform.to_x(1000), 0)
+        self.assertEqual(self.transform.to_x(1050.5), 252.5)
+        self.assertEqual(self.transform.to_ordinal(500), 1100)
+
+    def test_array(self):
+
+        # Arrange
+        ordinals = np.array([[990, 1000, 1100, math.inf], [-math.inf, 1020, 1040, 1060]])
+
+        # Act
+        xs = self.transform.to_x(ordinals)
+        round_trip = self.transform.to_ordinal(xs)
+
+        # Assert
+        self.assertEqual(xs.tolist(), [[-50, 0, 500, math.inf], [-math.inf, 100, 200, 300]])
+        np.testing.assert_allclose(round_trip, ordinals)
+
+    def test_empty_range(self):
+        transform = ViewTransform(min_ord=1000, max_ord=1000, width=500)
+        self.assertTrue(math.isfinite(transform.scale))
+        self.assertEqual(transform.to_x(1000), 0)
@@ -0,0 +1,56 @@
+import threading
+from typing import List, Optional, Tuple
+
+from data_types import Timeline, TimePoint
+from logs import get_logger
+
+
+class TimelineLoader:
+    """
+    Loads files into a Timeline on a background thread, so a window can keep drawing while they are read
+    and resolved. Progress can be polled from any thread, and the timeline publishes snapshots of the
+    records resolved so far as it goes.
+    """
+
+    def __init__(self, timeline: Timeline, inputs: List[str], window: Tuple[TimePoint, TimePoint] = None):
+        """
+        Args:
+            timeline: The timeline to load into.
+            inputs: The files to load, as for Timeline.load_records.
+            window: An optional (min, max) date range, as for Timeline.load_records.
+        """
+        self.timeline = timeline
+        self.error: Optional[Exception] = None  # Set if loading failed.
+        self._status: Tuple[str, int, int] = ('reading', 0, len(inputs))  # Replaced whole, never updated in place.
+        self._thread = threading.Thread(target=self._load, args=(inputs, window), daemon=True)
+        self._thread.start()
+
+    @property
+    def finished(self) -> bool:
+        return not self._thread.is_alive()
+
+    def status(self) -> Tuple[str, int, int]:
+        """
+        Returns:
+            The current (stage, done, total), with stage 'reading' (counting files) or 'resolving' (counting records).
+        """
+        return self._status
+
+    def fraction(self) -> float:
+        """
+        Returns:
+            Overall progress from 0 to 1. Reading files counts for the first tenth.
+        """
+        stage, done, total = self._status
+        stage_fraction = done / total if total else 1.0
+        return 0.1 * stage_fraction if stage == 'reading' else 0.1 + 0.9 * stage_fraction
+
+    def _progress(self, stage: str, done: int, total: int):
+        self._status = (stage, done, total)
+
+    def _load(self, inputs: List[str], window: Tuple[TimePoint, TimePoint]):
+        try:
+            self.timeline.load_records(inputs, window=window, progress=self._progress)
+        except Exception as err:
+            get_logger().error(f"Failed to load {inputs}: {err}")
+            self.error = err
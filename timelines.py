@@ -1,72 +1,276 @@
 
-import sys
-from typing import List
+import argparse
+from typing import List, Tuple
 import pygame
 from pygame_manager import PyGameManager as pgm
 from pygame.locals import *
 
-from data_types import Timeline, Timeview, TimePoint
-from algorithms import interpolate
+from data_types import Timeline, TiledTimeline, EventLog, Timeview, TimePoint
+from data_types.time_reference import parse_date
+from algorithms import read_event_log
+from file_watcher import FileWatcher
+from record_stream import RecordStream
+from timeline_loader import TimelineLoader
+from logs import get_logger
+import color
 
+# While nothing on screen is changing, the main loop sleeps on the event queue instead of redrawing.
+# This is the longest it sleeps before checking again for loaded, streamed or reloaded records.
+IDLE_WAIT_MS = 250
 
-def run(file_list: List[str] = None):
-    file_list = file_list or ["data/examples.yaml"]
+# While the window is being resized, the view isn't drawn again at each new size; it is redrawn once the size
+# has stopped changing for this long.
+RESIZE_DEBOUNCE_MS = 150
+
+# How many lanes one step of the mouse wheel scrolls, while shift is held.
+WHEEL_SCROLL_LANES = 3
+
+
+def wait_events(timeout_ms: int) -> List[pygame.event.Event]:
+    """
+    Collect the pending events, first sleeping until one arrives if there are none.
+
+    Args:
+        timeout_ms: The longest to wait for an event, in milliseconds. Zero returns at once.
+    """
+    if timeout_ms:
+        first = pygame.event.wait(timeout_ms)
+        if first.type == NOEVENT:
+            return []
+        return [first] + pygame.event.get()
+    return pygame.event.get()
+
+
+def reload_timeline(timeline: Timeline, timeview: Timeview, watcher: FileWatcher):
+    """
+    Bring the timeline up to date with its files after some of them changed, keeping the current view.
+    If the edited files can't be loaded, the previous records stay on screen until the next change.
+    """
+    try:
+        changed_ids = timeline.reload()
+    except Exception as err:
+        get_logger().error(f"Failed to reload timeline: {err}")
+        return
+    watcher.watch(timeline.sources)
+    timeview.refresh(changed_ids)
+
+
+def draw_progress(surf: pygame.Surface, loader: TimelineLoader) -> pygame.Rect:
+    """
+    Draw a progress bar for a background load along the bottom of the window.
+
+    Returns:
+        The area drawn on.
+    """
+    width, height = surf.get_size()
+    bar = pygame.Rect(width // 4, height - 40, width // 2, 12)
+    filled = bar.inflate(-4, -4)
+    filled.width = round(filled.width * loader.fraction())
+    stage, done, total = loader.status()
+    text = pgm.get_font().render(f"{stage.capitalize()} {done:,} / {total:,}", True, color.BLACK)
+    caption = text.get_rect(bottomleft=(bar.x, bar.y - 2))
+
+    # The caption sits above the bar's margin, and is cleared with it so earlier captions don't show through.
+    drawn = bar.inflate(8, 24).union(caption)
+    pygame.draw.rect(surf, color.WHITE, drawn)
+    pygame.draw.rect(surf, color.LIGHT_GRAY, bar, width=1)
+    pygame.draw.rect(surf, color.LIGHT_GRAY, filled)
+    surf.blit(text, caption)
+    return drawn
+
+
+def run(file_list: List[str] = None, window: Tuple[TimePoint, TimePoint] = None, tiles_dir: str = None,
+        watch: bool = True, ingest: str = None, event_log: EventLog = None):
+    if not ingest:
+        file_list = file_list or ["data/examples.yaml"]
     pgm.initialize()
     fps_clock = pygame.time.Clock()
 
-    timeline = Timeline()
-    timeline.load_records(file_list)
-    timeview = Timeview(timeline)
+    watcher = None
+    stream = None
+    loader = None
+    if tiles_dir:
+        timeline = TiledTimeline(tiles_dir)
+    elif event_log is not None:
+        timeline = event_log
+    else:
+        # A reload would drop streamed records, so files aren't watched while ingesting.
+        watch = watch and not ingest
+        timeline = Timeline(compact=True, reloadable=watch)
+        if file_list:
+            loader = TimelineLoader(timeline, file_list, window=window)
+        elif ingest:
+            stream = RecordStream(timeline, ingest)
+
+    # The view is created once the first dated records have been loaded or streamed in.
+    timeview = Timeview(timeline) if type(timeline.min) is TimePoint else None
+    shown_version = timeline.snapshot().version if type(timeline) is Timeline else None
+    shown_progress = None
 
     drag_anchor = None
+    dirty = True  # Whether something changed since the window was last drawn.
+    visible = True  # False while the window is minimized or hidden, when nothing is drawn.
+    resize_due = None  # When to redraw the view at the window's new size, in pygame ticks, while resizing.
 
     running = True
-    while running:
-
-        for event in pygame.event.get():
-            if event.type == QUIT or (event.type == KEYUP and event.key == K_ESCAPE):
-                running = False
-            elif event.type == MOUSEWHEEL:
-
-                mx, my = pygame.mouse.get_pos()
-                width, height = pgm.get_screen().get_size()
-                focus_date_ordinal = interpolate(mx, (0, width), (timeview.min.ordinal(), timeview.max.ordinal()))
-                focus_date_ordinal = round(focus_date_ordinal)
-                wheel_forward = event.y > 0
-                wheel_backward = event.y < 0
-                if wheel_forward:
-                    timeview.zoom_in(focus_date_ordinal)
-                if wheel_backward:
-                    timeview.zoom_out(focus_date_ordinal)
-            elif event.type == MOUSEBUTTONDOWN:
-                mousex, mousey = event.pos
-                width, height = pgm.get_screen().get_size()
-                anchor_ordinal = interpolate(mousex, (0, width),
-                                             (timeview.min.ordinal(), timeview.max.ordinal()))
-                drag_anchor = int(anchor_ordinal)
-
-            elif event.type == MOUSEBUTTONUP:
-                drag_anchor = None
-            elif event.type == MOUSEMOTION:
-                if drag_anchor is not None:
+    try:
+        while running:
+
+            busy = dirty or (timeview is not None and timeview.is_animating())
+            timeout = 0 if busy and visible else IDLE_WAIT_MS
+            if resize_due is not None and timeout:
+                timeout = max(1, min(timeout, resize_due - pygame.time.get_ticks()))
+            for event in wait_events(timeout):
+                if event.type == QUIT or (event.type == KEYUP and event.key == K_ESCAPE):
+                    running = False
+                elif event.type in (WINDOWMINIMIZED, WINDOWHIDDEN):
+                    visible = False
+                elif event.type in (WINDOWRESTORED, WINDOWSHOWN, WINDOWEXPOSED):
+                    visible = True
+                    dirty = True
+                    if timeview is not None:
+                        timeview.force_redraw()  # The window's contents may have been lost.
+                elif timeview is None:
+                    continue
+                elif event.type == MOUSEWHEEL and pygame.key.get_mods() & KMOD_SHIFT:
+                    timeview.scroll(-event.y * WHEEL_SCROLL_LANES * timeview.lane_height)
+                    dirty = True
+                elif event.type == MOUSEWHEEL:
+
+                    mx, my = pygame.mouse.get_pos()
+                    width, height = pgm.get_screen().get_size()
+                    focus_date_ordinal = timeview.target_transform(width).to_ordinal(mx)
+                    wheel_forward = event.y > 0
+                    wheel_backward = event.y < 0
+                    if wheel_forward:
+                        timeview.zoom_in(focus_date_ordinal)
+                    if wheel_backward:
+                        timeview.zoom_out(focus_date_ordinal)
+                    dirty = True
+                elif event.type == MOUSEBUTTONDOWN:
                     mousex, mousey = event.pos
+                    width, height = pgm.get_screen().get_size()
+                    drag_anchor = timeview.target_transform(width).to_ordinal(mousex)
+                    timeview.hover(None)  # Tooltips would only get in the way of a drag.
 
+                elif event.type == MOUSEBUTTONUP:
+                    drag_anchor = None
+                    timeview.hover(event.pos)
+                elif event.type == WINDOWLEAVE:
+                    timeview.hover(None)
+                elif event.type == MOUSEMOTION:
+                    if drag_anchor is None:
+                        timeview.hover(event.pos)
+                    else:
+                        mousex, mousey = event.pos
+
+                        width, height = pgm.get_screen().get_size()
+                        x_ordinal = timeview.target_transform(width).to_ordinal(mousex)
+                        x_offset = drag_anchor - x_ordinal
+                        timeview.pan(x_offset)
+                        timeview.scroll(-event.rel[1])  # The lanes follow the pointer up and down.
+                        dirty = True
+                elif event.type == KEYDOWN and event.key in (K_UP, K_DOWN, K_PAGEUP, K_PAGEDOWN):
                     width, height = pgm.get_screen().get_size()
-                    x_ordinal = interpolate(mousex, (0, width),
-                                            (timeview.min.ordinal(), timeview.max.ordinal()))
-                    x_offset = int(drag_anchor - x_ordinal)
-                    timeview.pan(x_offset)
-            elif event.type == WINDOWRESIZED:
-                timeview.force_redraw()
+                    step = timeview.lane_height if event.key in (K_UP, K_DOWN) else height - timeview.lane_height
+                    timeview.scroll(step if event.key in (K_DOWN, K_PAGEDOWN) else -step)
+                    dirty = True
+                elif event.type == WINDOWRESIZED:
+                    resize_due = pygame.time.get_ticks() + RESIZE_DEBOUNCE_MS
+                    dirty = True
+
+            if resize_due is not None and pygame.time.get_ticks() >= resize_due:
+                resize_due = None
+                if timeview is not None:
+                    timeview.force_redraw()
+                dirty = True
+
+            if loader and loader.finished:
+                if loader.error:
+                    raise loader.error
+                loader = None
+                dirty = True
+                if timeview:
+                    timeview.frame_timeline()  # Partial loads only framed the records resolved at the time.
+                    timeview.force_redraw()  # Clear away the progress bar.
+                if watch:
+                    watcher = FileWatcher(timeline.sources)
+                if ingest:
+                    stream = RecordStream(timeline, ingest)
+            if loader and loader.status() != shown_progress:
+                shown_progress = loader.status()
+                dirty = True
+            if watcher and watcher.poll():
+                reload_timeline(timeline, timeview, watcher)
+                dirty = True
+            if shown_version is not None and timeline.snapshot().version != shown_version:
+                shown_version = timeline.snapshot().version
+                if timeview is None and type(timeline.min) is TimePoint:
+                    timeview = Timeview(timeline)
+                elif timeview is not None:
+                    timeview.refresh()
+                dirty = True
 
-        surf = pgm.get_screen()
-        timeview.render(surf)
-        pygame.display.update()
-        fps_clock.tick(60)
+            if not visible or not (dirty or (timeview is not None and timeview.needs_render())):
+                continue
+            dirty = False
+            surf = pgm.get_screen()
+            if timeview is None:
+                surf.fill(color.WHITE)
+                rects = [surf.get_rect()]
+            elif resize_due is not None:
+                rects = timeview.present(surf)  # The view is redrawn at the new size once resizing stops.
+            else:
+                rects = timeview.render(surf)
+            if loader:
+                rects.append(draw_progress(surf, loader))
+            if rects:
+                pygame.display.update(rects)
+            fps_clock.tick(60)
+    finally:
+        # Also reached when the loader failed, so the threads and the display are never left behind.
+        if tiles_dir:
+            timeline.close()
+        if watcher:
+            watcher.close()
+        if stream:
+            stream.close()
+        pgm.terminate()
 
-    pgm.terminate()
+
+def save_tiles(file_list: List[str], tiles_dir: str, tile_years: int, window: Tuple[TimePoint, TimePoint] = None):
+    timeline = Timeline(compact=True)
+    timeline.load_records(file_list, window=window)
+    timeline.save_tiles(tiles_dir, tile_days=round(tile_years * 365.2425))
 
 
 if __name__ == "__main__":
-    file_list = [a for a in sys.argv][1:]
-    run(file_list)
+    parser = argparse.ArgumentParser(description="Display timelines of events.")
+    parser.add_argument("files", nargs="*", help="Timeline files or bundles to load.")
+    parser.add_argument("--window", nargs=2, metavar=("START", "END"),
+                        help="Only load records which may fall between these dates, e.g. --window -2000 -500")
+    parser.add_argument("--tiles", metavar="DIR", help="Browse era tiles previously written with --save-tiles.")
+    parser.add_argument("--save-tiles", metavar="DIR", help="Resolve the files, write them as era tiles to DIR, and exit.")
+    parser.add_argument("--no-watch", action="store_true", help="Don't reload the files when they change.")
+    parser.add_argument("--ingest", metavar="SOURCE",
+                        help="Add records streamed as JSON lines, from stdin ('-') or a Unix socket at this path.")
+    parser.add_argument("--tile-years", type=int, default=100, help="Width of each era tile in years (default 100).")
+    parser.add_argument("--event-log", metavar="FILE",
+                        help="Browse a CSV or JSON Lines log of timestamped events instead of timeline files.")
+    parser.add_argument("--log-columns", nargs=3, metavar=("START", "END", "NAME"), default=("start", "end", "name"),
+                        help="The event log fields holding each event's start, end and name (default: start end name).")
+    args = parser.parse_args()
+
+    date_window = None
+    if args.window:
+        window_start, window_end = args.window
+        date_window = (parse_date(window_start)[0], parse_date(window_end)[1])
+    if args.save_tiles:
+        save_tiles(args.files, args.save_tiles, args.tile_years, window=date_window)
+    elif args.event_log:
+        start_column, end_column, name_column = args.log_columns
+        log = read_event_log(args.event_log, start_column=start_column, end_column=end_column, name_column=name_column)
+        get_logger().info(f"Read {len(log):,} events from {args.event_log}")
+        run(event_log=log)
+    else:
+        run(args.files, window=date_window, tiles_dir=args.tiles, watch=not args.no_watch, ingest=args.ingest)